@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import BlogPost, Agent, Task, CrewConfig, OllamaSettings
+from . import search
+from .models import BlogPost, BlogPostContent, Agent, Task, CrewConfig, OllamaSettings, OllamaBackend, GenerationJob, GenerationCacheEntry, StageCacheEntry
 
 
 @admin.register(Agent)
@@ -30,12 +31,13 @@ class TaskAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description', 'agent__name']
     ordering = ['order', 'name']
     readonly_fields = ['created_at', 'updated_at']
+    filter_horizontal = ['extra_dependencies']
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'agent', 'is_active', 'order')
         }),
         ('Task Configuration', {
-            'fields': ('description', 'expected_output', 'depends_on')
+            'fields': ('description', 'expected_output', 'depends_on', 'extra_dependencies')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -76,7 +78,7 @@ class OllamaSettingsAdmin(admin.ModelAdmin):
             'fields': ('name', 'is_active')
         }),
         ('Ollama Configuration', {
-            'fields': ('base_url', 'model', 'temperature')
+            'fields': ('base_url', 'model', 'temperature', 'keep_alive')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -85,10 +87,53 @@ class OllamaSettingsAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(OllamaBackend)
+class OllamaBackendAdmin(admin.ModelAdmin):
+    list_display = ['name', 'base_url', 'weight', 'is_enabled', 'created_at']
+    list_filter = ['is_enabled']
+    search_fields = ['name', 'base_url']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+class BlogPostContentInline(admin.StackedInline):
+    model = BlogPostContent
+    can_delete = False
+
+
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
     list_display = ['topic', 'status', 'created_at']
     list_filter = ['status', 'created_at']
-    search_fields = ['topic', 'content']
+    search_fields = ['topic', 'title']
     readonly_fields = ['created_at', 'updated_at']
+    inlines = [BlogPostContentInline]
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Content is stored compressed; search it through the full-text index
+        if not search_term:
+            return queryset, False
+        return search.filter_posts(queryset, search_term), False
+
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    list_display = ['blog_post', 'status', 'attempts', 'worker_id', 'lease_expires_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['blog_post__topic', 'worker_id']
+    readonly_fields = ['created_at', 'updated_at', 'started_at', 'finished_at', 'heartbeat_at']
+
+
+@admin.register(GenerationCacheEntry)
+class GenerationCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['title', 'key', 'hit_count', 'last_used_at', 'created_at']
+    search_fields = ['title', 'key']
+    readonly_fields = ['key', 'hit_count', 'created_at', 'last_used_at']
+
 
+@admin.register(StageCacheEntry)
+class StageCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ['agent_role', 'task_summary', 'hit_count', 'last_used_at', 'created_at']
+    list_filter = ['agent_role']
+    search_fields = ['task_summary', 'key']
+    readonly_fields = ['key', 'hit_count', 'created_at', 'last_used_at']
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import OrderedDict
+import httpx
+import openai
+import requests
+from typing import Any
+from crewai import LLM
+from django.conf import settings
+from crewai.llms.base_llm import BaseLLM, call_stop_override, call_stream_override
+from crewai.types.usage_metrics import UsageMetrics
+from pydantic import PrivateAttr
+from ..ollama_pool import OllamaBackendPool, NoBackendAvailable
+
+# Errors meaning the backend could not be reached or stopped answering, as
+# opposed to errors about the request itself that another backend would repeat
+CONNECTION_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    httpx.TransportError,
+    openai.APIConnectionError,
+)
+
+
+# Most LLM instances kept; one per server, model and option combination in use
+MAX_SHARED_LLMS = 16
+
+_shared_llms = OrderedDict()
+_shared_llms_lock = threading.Lock()
+
+
+def get_backend_llm(model: str, base_url: str, temperature: float, stream: bool = False) -> BaseLLM:
+    """
+    Get the shared CrewAI LLM for one Ollama server.
+
+    Each LLM owns an HTTP client, so reusing it across agents and generations
+    keeps connections to the server alive instead of opening new ones for
+    every post. CrewAI LLMs are safe to share: per-call settings such as stop
+    words are scoped to the call.
+
+    Args:
+        model: Model name with ollama/ prefix
+        base_url: Ollama server URL
+        temperature: Sampling temperature
+        stream: Request streamed responses
+
+    Returns:
+        CrewAI LLM instance
+    """
+    key = (model, base_url, temperature, bool(stream))
+    with _shared_llms_lock:
+        llm = _shared_llms.get(key)
+        if llm is not None:
+            _shared_llms.move_to_end(key)
+            return llm
+        llm = LLM(
+            model=model,
+            base_url=base_url,
+            temperature=temperature,
+            stream=stream,
+            client_params={
+                'timeout': httpx.Timeout(
+                    getattr(settings, 'OLLAMA_REQUEST_TIMEOUT', 600),
+                    connect=getattr(settings, 'OLLAMA_CONNECT_TIMEOUT', 3),
+                ),
+            },
+        )
+        _shared_llms[key] = llm
+        while len(_shared_llms) > MAX_SHARED_LLMS:
+            _shared_llms.popitem(last=False)
+        return llm
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """Check an exception and the exceptions it was raised from for a connection failure."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, CONNECTION_ERRORS):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class BalancedOllamaLLM(BaseLLM):
+    """
+    CrewAI LLM that spreads its calls over the Ollama servers of a backend pool.
+
+    Every call is sent to the backend the pool picks (fewest outstanding
+    requests relative to weight, preferring servers with the model loaded). If that backend cannot be reached, it is
+    taken out of rotation and the call is retried on the next one, so a
+    generation survives a server going down halfway through. Each backend gets
+    its own shared CrewAI LLM with the same model and options.
+    """
+
+    provider: str = 'ollama'
+    _pool: OllamaBackendPool = PrivateAttr()
+    _llms: dict = PrivateAttr(default_factory=dict)
+    _llms_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, pool: OllamaBackendPool, **kwargs):
+        """
+        Initialize the LLM.
+
+        Args:
+            pool: Backend pool to route calls through
+            **kwargs: LLM options (model, temperature, stream, ...) used for every backend
+        """
+        super().__init__(**kwargs)
+        self._pool = pool
+
+    def _llm_for(self, base_url: str) -> BaseLLM:
+        with self._llms_lock:
+            llm = self._llms.get(base_url)
+            if llm is None:
+                llm = get_backend_llm(self.model, base_url, self.temperature, self.stream)
+                self._llms[base_url] = llm
+            return llm
+
+    def call(self, messages, *args, **kwargs):
+        failed = set()
+        last_error = None
+        while True:
+            try:
+                backend = self._pool.acquire(exclude=failed, model=self.model)
+            except NoBackendAvailable:
+                if last_error is None:
+                    raise
+                raise last_error
+            llm = self._llm_for(backend.base_url)
+            started = time.monotonic()
+            try:
+                # The agent sets stop words and streaming on this LLM; pass them to the backend's
+                with call_stop_override(llm, self.stop_sequences), \
+                        call_stream_override(llm, bool(self._effective_stream())):
+                    result = llm.call(messages, *args, **kwargs)
+            except Exception as e:
+                if not is_connection_error(e):
+                    self._pool.release(backend, time.monotonic() - started)
+                    raise
+                self._pool.release(backend, time.monotonic() - started, error=e)
+                print(f"Ollama backend {backend.base_url} failed ({e}); retrying on another backend")
+                failed.add(backend.base_url)
+                last_error = e
+                continue
+            self._pool.release(backend, time.monotonic() - started, model=self.model)
+            return result
+
+    def _any_llm(self) -> BaseLLM:
+        return self._llm_for(self.base_url)
+
+    def supports_function_calling(self) -> bool:
+        return self._any_llm().supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self._any_llm().supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self._any_llm().get_context_window_size()
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        usage = UsageMetrics()
+        with self._llms_lock:
+            llms = list(self._llms.values())
+        for llm in llms:
+            usage.add_usage_metrics(llm.get_token_usage_summary())
+        return usage
@@ -1,9 +1,19 @@
 import os
 import threading
-import time
+from datetime import datetime
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, Process, LLM
-from ..models import Agent as AgentModel, Task as TaskModel, CrewConfig, OllamaSettings, BlogPost
+from django.conf import settings
+from django.utils import timezone
+from crewai import Agent, Task, Crew, Process
+from crewai.utilities.constants import NOT_SPECIFIED
+from ..models import Agent as AgentModel, CrewConfig
+from .. import generation_cache
+from ..crew_plans import CrewPlan, TaskPlan, get_crew_plan, get_llm_config
+from ..progress_store import progress_store
+from ..ollama_pool import get_backend_pool
+from ..streaming import start_content_stream, activate_content_stream, finish_content_stream
+from .task_graph import TaskGraphCrew
+from .balanced_llm import BalancedOllamaLLM, get_backend_llm
 
 # Load environment variables
 load_dotenv()
@@ -14,52 +24,52 @@ if 'OPENAI_API_KEY' in os.environ:
     del os.environ['OPENAI_API_KEY']
 
 
-def get_ollama_llm():
+def get_ollama_config():
+    """
+    Resolve the Ollama connection settings from the database or fallback to environment variables.
+    Cached with the crew plans and refreshed when OllamaSettings change.
+    
+    Returns:
+        Dictionary with 'model' (with ollama/ prefix), 'base_url', 'temperature',
+        'keep_alive', 'source' ('database' or 'env') and 'backends' (list of (base_url, weight))
+    """
+    return get_llm_config()
+
+
+def get_ollama_llm(stream: bool = False):
     """
     Get CrewAI LLM instance configured for Ollama from database settings or fallback to environment variables.
     Uses CrewAI's LLM class with ollama/ prefix for the model name.
     
+    LLM instances are shared across generations so their connections to
+    Ollama stay open. When more than one Ollama server is configured
+    (OllamaBackend rows or OLLAMA_BASE_URLS), calls are balanced across the
+    healthy servers, preferring those that already have the model loaded.
+    
+    Args:
+        stream: Request a streamed response from Ollama so tokens can be shown as they arrive
+    
     Returns:
         LLM instance configured with active Ollama settings
     """
-    try:
-        # Try to get active Ollama settings from database
-        ollama_settings = OllamaSettings.objects.filter(is_active=True).first()
-        if ollama_settings:
-            # CrewAI LLM expects model name with "ollama/" prefix
-            model_name = ollama_settings.model
-            if not model_name.startswith('ollama/'):
-                model_name = f"ollama/{model_name}"
-            
-            llm = LLM(
-                model=model_name,
-                base_url=ollama_settings.base_url,
-                temperature=ollama_settings.temperature,
-            )
-            # Ensure the LLM is properly configured
-            print(f"Using Ollama LLM: {model_name} at {ollama_settings.base_url}")
-            return llm
-    except Exception as e:
-        print(f"Error loading Ollama settings from database: {e}")
-        import traceback
-        traceback.print_exc()
-        pass
-    
-    # Fallback to environment variables
-    base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
-    model = os.getenv('OLLAMA_MODEL', 'llama3')
-    temperature = float(os.getenv('OLLAMA_TEMPERATURE', '0.7'))
-    
-    # CrewAI LLM expects model name with "ollama/" prefix
-    if not model.startswith('ollama/'):
-        model = f"ollama/{model}"
-    
-    llm = LLM(
-        model=model,
-        base_url=base_url,
-        temperature=temperature,
-    )
-    print(f"Using Ollama LLM (env): {model} at {base_url}")
+    config = get_ollama_config()
+    pool = get_backend_pool()
+    pool.configure(config['backends'], model=config['model'], keep_alive=config['keep_alive'])
+    if len(config['backends']) > 1:
+        llm = BalancedOllamaLLM(
+            pool,
+            model=config['model'],
+            base_url=config['base_url'],
+            temperature=config['temperature'],
+            stream=stream,
+        )
+        print(f"Using Ollama LLM: {config['model']} balanced across {len(config['backends'])} servers")
+        return llm
+    llm = get_backend_llm(config['model'], config['base_url'], config['temperature'], stream)
+    if config['source'] == 'database':
+        print(f"Using Ollama LLM: {config['model']} at {config['base_url']}")
+    else:
+        print(f"Using Ollama LLM (env): {config['model']} at {config['base_url']}")
     return llm
 
 
@@ -70,9 +80,19 @@ def get_ollama_llm():
 class ProgressTracker:
     """
     Tracks and updates progress for blog post generation.
-    Updates BlogPost record with current agent, task, and progress information.
+    Reports current agent, task, and progress information to the progress store.
+    
+    Progress is driven by CrewAI callbacks: the crew's task_callback marks a task
+    as completed (and the next one as started) and its step_callback reports each
+    agent step, so the database is only written when the crew actually moves on.
+    For a TaskGraphCrew, tasks run concurrently on worker threads; each thread
+    remembers which task it runs so callbacks are attributed to the right task.
     """
     
+    # Share of the progress bar covered by task execution
+    BASE_PERCENTAGE = 15
+    END_PERCENTAGE = 85
+    
     def __init__(self, blog_post_id: int, total_tasks: int):
         """
         Initialize progress tracker.
@@ -85,11 +105,23 @@ class ProgressTracker:
         self.total_tasks = total_tasks
         self.completed_tasks = 0
         self.current_task_index = 0
+        self.current_step = 0
+        self.task_timings = []
+        self._tasks = []
+        self._reused_tasks = []
+        self._timings_changed = False
+        self._parallel = False  # Tasks run concurrently (TaskGraphCrew)
+        self._steps = {}  # task index -> agent steps taken so far
+        self._open_timings = {}  # task index -> its task_timings entry while it runs
+        self._lock = threading.RLock()
+        self._thread_state = threading.local()
+        self.content_buffer = None  # ContentStreamBuffer filled while the final task runs
     
     def update_progress(self, agent_name: str = '', task_description: str = '', 
                        message: str = '', percentage: int = None):
         """
-        Update progress in the database.
+        Update progress in the progress store; it publishes the change at once
+        and writes it to the database in coalesced batches.
         
         Args:
             agent_name: Name of currently active agent
@@ -98,8 +130,6 @@ class ProgressTracker:
             percentage: Progress percentage (0-100). If None, calculated automatically.
         """
         try:
-            blog_post = BlogPost.objects.get(id=self.blog_post_id)
-            
             if percentage is None:
                 # Calculate percentage based on completed tasks
                 if self.total_tasks > 0:
@@ -107,16 +137,27 @@ class ProgressTracker:
                 else:
                     percentage = 0
             
-            blog_post.current_agent = agent_name
-            blog_post.current_task = task_description
-            blog_post.progress_message = message
-            blog_post.progress_percentage = min(100, max(0, percentage))
-            blog_post.save(update_fields=['current_agent', 'current_task', 'progress_message', 'progress_percentage'])
-        except BlogPost.DoesNotExist:
-            pass
+            fields = {
+                'current_agent': agent_name,
+                'current_task': task_description,
+                'progress_message': message,
+                'progress_percentage': min(100, max(0, percentage)),
+            }
+            if self._timings_changed:
+                # Copy: entries of running tasks are still filled in later
+                fields['task_timings'] = [dict(timing) for timing in self.task_timings]
+                self._timings_changed = False
+            progress_store.update(self.blog_post_id, **fields)
         except Exception as e:
             print(f"Error updating progress: {e}")
     
+    def _task_percentage(self, task_index: int, fraction: float = 0.0) -> int:
+        """Progress percentage for a point inside the task at task_index (fraction 0-1)."""
+        if self.total_tasks <= 0:
+            return self.BASE_PERCENTAGE
+        per_task = (self.END_PERCENTAGE - self.BASE_PERCENTAGE) / self.total_tasks
+        return int(self.BASE_PERCENTAGE + (task_index + fraction) * per_task)
+    
     def task_started(self, agent_name: str, task_description: str, task_index: int = None):
         """
         Called when a task starts.
@@ -126,26 +167,107 @@ class ProgressTracker:
             task_description: Description of the task
             task_index: Index of the task (0-based). If None, uses current_task_index.
         """
-        if task_index is not None:
-            self.current_task_index = task_index
-        
-        message = f"{agent_name}: {task_description}"
-        percentage = int((self.current_task_index / self.total_tasks) * 100) if self.total_tasks > 0 else 0
-        self.update_progress(agent_name, task_description, message, percentage)
+        with self._lock:
+            if task_index is not None:
+                self.current_task_index = task_index
+            index = self.current_task_index
+            self.current_step = 0
+            self._steps[index] = 0
+            
+            timing = {
+                'task': task_description,
+                'agent': agent_name,
+                'started_at': timezone.now().isoformat(),
+                'finished_at': None,
+                'duration_seconds': None,
+            }
+            self.task_timings.append(timing)
+            self._open_timings[index] = timing
+            self._timings_changed = True
+            
+            if self.content_buffer is not None and index == self.total_tasks - 1:
+                # The final task's output becomes the post; stream its tokens
+                activate_content_stream(self.content_buffer)
+            
+            message = f"{agent_name} is working on: {task_description}"
+            if self._parallel and len(self._open_timings) > 1:
+                message += f" ({len(self._open_timings)} tasks running)"
+            self.update_progress(agent_name, task_description, message,
+                                 self._task_percentage(self.completed_tasks))
     
-    def task_completed(self, agent_name: str, task_description: str):
+    def step_completed(self, agent_name: str, task_description: str, task_index: int = None):
+        """
+        Called after each agent step (reasoning, tool use) within the current task.
+        
+        Args:
+            agent_name: Name of the agent executing the task
+            task_description: Description of the task
+            task_index: Index of the task (0-based). If None, uses current_task_index.
+        """
+        with self._lock:
+            index = self.current_task_index if task_index is None else task_index
+            steps = self._steps.get(index, 0) + 1
+            self._steps[index] = steps
+            self.current_step = steps
+            # Steps per task are unknown up front, so approach the task's end asymptotically
+            fraction = 1 - 0.5 ** steps
+            message = f"{agent_name} is working on: {task_description} (step {steps})"
+            self.update_progress(agent_name, task_description, message,
+                                 self._task_percentage(self.completed_tasks, fraction * 0.9))
+    
+    def task_completed(self, agent_name: str, task_description: str, task_index: int = None):
         """
         Called when a task completes.
         
         Args:
             agent_name: Name of the agent that completed the task
             task_description: Description of the completed task
+            task_index: Index of the task (0-based). If None, the current task
+                completed and current_task_index moves to the next one.
+        """
+        with self._lock:
+            index = self.current_task_index if task_index is None else task_index
+            self.completed_tasks += 1
+            if task_index is None:
+                self.current_task_index += 1
+            
+            timing = self._open_timings.pop(index, None)
+            if timing is not None:
+                finished_at = timezone.now()
+                started_at = datetime.fromisoformat(timing['started_at'])
+                timing['finished_at'] = finished_at.isoformat()
+                timing['duration_seconds'] = round((finished_at - started_at).total_seconds(), 2)
+                self._timings_changed = True
+            
+            message = f"{agent_name}: Completed {task_description}"
+            self.update_progress(agent_name, task_description, message,
+                                 self._task_percentage(self.completed_tasks))
+    
+    def task_reused(self, agent_name: str, task_description: str):
         """
-        self.completed_tasks += 1
-        self.current_task_index += 1
-        message = f"{agent_name}: Completed {task_description}"
-        percentage = int((self.completed_tasks / self.total_tasks) * 100) if self.total_tasks > 0 else 0
-        self.update_progress(agent_name, task_description, message, percentage)
+        Called for a task whose output was served from the stage cache instead of being run.
+        
+        Args:
+            agent_name: Name of the agent the task belongs to
+            task_description: Description of the task
+        """
+        with self._lock:
+            now = timezone.now().isoformat()
+            self.task_timings.append({
+                'task': task_description,
+                'agent': agent_name,
+                'started_at': now,
+                'finished_at': now,
+                'duration_seconds': 0.0,
+                'cached': True,
+            })
+            self._timings_changed = True
+            self.completed_tasks += 1
+            self.current_task_index += 1
+            
+            message = f"{agent_name}: Reused cached output for {task_description}"
+            self.update_progress(agent_name, task_description, message,
+                                 self._task_percentage(self.completed_tasks))
     
     def set_initializing(self, message: str = "Initializing crew..."):
         """Set initializing state."""
@@ -154,6 +276,81 @@ class ProgressTracker:
     def set_finalizing(self, message: str = "Finalizing blog post..."):
         """Set finalizing state."""
         self.update_progress('', '', message, 95)
+    
+    @staticmethod
+    def _describe_task(task):
+        """Get the agent name and a short description of a CrewAI task."""
+        agent_name = task.agent.role if getattr(task, 'agent', None) and hasattr(task.agent, 'role') else 'Agent'
+        description = task.description
+        task_desc = description[:150] + '...' if len(description) > 150 else description
+        return agent_name, task_desc
+    
+    def attach(self, crew, reused_tasks: list = None):
+        """
+        Register this tracker's callbacks on a crew before kickoff.
+        
+        Args:
+            crew: CrewAI Crew instance about to be executed
+            reused_tasks: Leading tasks served from the stage cache and removed from the crew
+        """
+        self._reused_tasks = list(reused_tasks or [])
+        self._tasks = self._reused_tasks + list(crew.tasks)
+        self.total_tasks = len(self._tasks)
+        crew.step_callback = self._on_step
+        crew.task_callback = self._on_task_completed
+        if hasattr(crew, 'task_started_callback'):
+            # TaskGraphCrew reports each task as it starts on its worker thread
+            self._parallel = True
+            crew.task_started_callback = self._on_task_started
+    
+    def start(self):
+        """Report reused tasks and mark the first task to run as started; call right before crew.kickoff()."""
+        for task in self._reused_tasks:
+            self.task_reused(*self._describe_task(task))
+        if not self._parallel and len(self._tasks) > len(self._reused_tasks):
+            next_index = len(self._reused_tasks)
+            self.task_started(*self._describe_task(self._tasks[next_index]), task_index=next_index)
+    
+    def _thread_task_index(self):
+        """Index of the task running on this thread in a parallel crew, else None."""
+        return getattr(self._thread_state, 'task_index', None)
+    
+    def _on_task_started(self, task):
+        """TaskGraphCrew callback: task is about to run on the current thread."""
+        try:
+            index = next(i for i, t in enumerate(self._tasks) if t is task)
+            self._thread_state.task_index = index
+            self.task_started(*self._describe_task(task), task_index=index)
+        except Exception as e:
+            print(f"Error in task start callback: {e}")
+    
+    def _on_step(self, step_output):
+        """CrewAI step_callback: an agent finished a step of the current task."""
+        try:
+            index = self._thread_task_index()
+            if index is None:
+                index = self.current_task_index
+            if index < len(self._tasks):
+                self.step_completed(*self._describe_task(self._tasks[index]), task_index=index)
+        except Exception as e:
+            print(f"Error in step callback: {e}")
+    
+    def _on_task_completed(self, task_output):
+        """CrewAI task_callback: the current task finished, so the next one starts."""
+        try:
+            index = self._thread_task_index()
+            if index is not None:
+                # Parallel crew: the crew itself starts the tasks that were waiting on this one
+                self._thread_state.task_index = None
+                self.task_completed(*self._describe_task(self._tasks[index]), task_index=index)
+                return
+            if self.current_task_index < len(self._tasks):
+                self.task_completed(*self._describe_task(self._tasks[self.current_task_index]))
+            if self.current_task_index < len(self._tasks):
+                next_task = self._tasks[self.current_task_index]
+                self.task_started(*self._describe_task(next_task), task_index=self.current_task_index)
+        except Exception as e:
+            print(f"Error in task callback: {e}")
 
 
 def create_agent_from_model(agent_model: AgentModel, llm_instance=None):
@@ -161,7 +358,7 @@ def create_agent_from_model(agent_model: AgentModel, llm_instance=None):
     Create a CrewAI Agent from a database Agent model.
     
     Args:
-        agent_model: Agent model instance
+        agent_model: Agent model instance or AgentPlan
         llm_instance: LLM instance to use (defaults to get_ollama_llm())
         
     Returns:
@@ -180,12 +377,12 @@ def create_agent_from_model(agent_model: AgentModel, llm_instance=None):
     )
 
 
-def create_task_from_model(task_model: TaskModel, crew_agent, dependent_tasks=None):
+def create_task_from_plan(task_plan: TaskPlan, crew_agent, dependent_tasks=None):
     """
-    Create a CrewAI Task from a database Task model.
+    Create a CrewAI Task from a compiled task plan.
     
     Args:
-        task_model: Task model instance
+        task_plan: TaskPlan from a CrewPlan
         crew_agent: CrewAI Agent instance to assign the task to
         dependent_tasks: Dictionary mapping task IDs to CrewAI Task instances
         
@@ -193,108 +390,88 @@ def create_task_from_model(task_model: TaskModel, crew_agent, dependent_tasks=No
         CrewAI Task instance
     """
     context = []
-    if task_model.depends_on and dependent_tasks:
-        dependent_task = dependent_tasks.get(task_model.depends_on.id)
-        if dependent_task:
-            context.append(dependent_task)
+    if dependent_tasks:
+        for dependency_id in task_plan.depends_on_ids:
+            dependent_task = dependent_tasks.get(dependency_id)
+            if dependent_task:
+                context.append(dependent_task)
     
     return Task(
-        description=task_model.description,
+        description=task_plan.description,
         agent=crew_agent,
-        expected_output=task_model.expected_output,
+        expected_output=task_plan.expected_output,
         context=context if context else None,
     )
 
 
-def create_crew_from_config(crew_config: CrewConfig, topic: str = '', subtitle: str = '',
-                           target_audience: list = None, key_points: str = '', 
-                           examples: str = '', tone: str = 'friendly', length: str = 'medium'):
+def create_crew_from_plan(plan: CrewPlan, topic: str = '', subtitle: str = '',
+                          target_audience: list = None, key_points: str = '',
+                          examples: str = '', tone: str = 'friendly', length: str = 'medium'):
     """
-    Create a CrewAI crew from a CrewConfig model.
+    Create a CrewAI crew from a compiled crew plan. Does not query the database.
     
     Args:
-        crew_config: CrewConfig model instance
+        plan: CrewPlan from get_crew_plan()
         topic: Blog post topic
         subtitle: Optional subtitle
         target_audience: List of target audience tags
         key_points: Key points to cover
         examples: Specific examples to include
         tone: Writing tone
+        length: Target length (short, medium, long)
         
     Returns:
-        Configured Crew instance
+        Configured Crew instance, or a TaskGraphCrew for parallel crew configurations
     """
     if target_audience is None:
         target_audience = []
     
-    # Get active agents from the config
-    agents_models = crew_config.agents.filter(is_active=True).order_by('order')
-    
-    if not agents_models.exists():
-        raise ValueError(f"No active agents found in crew config: {crew_config.name}")
+    if not plan.agents:
+        raise ValueError(f"No active agents found in crew config: {plan.name}")
     
-    # Create CrewAI agents
-    crew_agents = []
-    agent_map = {}  # Map agent model ID to CrewAI agent
-    
-    # Get LLM instance once for all agents to ensure consistency
+    # One LLM instance for all agents and the crew ensures consistent, offline Ollama usage
     current_llm = get_ollama_llm()
+    parallel = plan.process_type == 'parallel'
     
-    for agent_model in agents_models:
-        crew_agent = create_agent_from_model(agent_model, llm_instance=current_llm)
-        crew_agents.append(crew_agent)
-        agent_map[agent_model.id] = crew_agent
-    
-    # Get active tasks for these agents, ordered by dependencies
-    tasks_models = TaskModel.objects.filter(
-        agent__in=agents_models,
-        is_active=True
-    ).order_by('order', 'depends_on__order')
-    
-    # Build task dependency map
-    task_map = {}  # Map task model ID to CrewAI task
+    crew_agents = []
+    agent_map = {}  # Map agent ID to CrewAI agent
+    agent_plans = {}
+    for agent_plan in plan.agents:
+        agent_plans[agent_plan.id] = agent_plan
+        if not parallel:
+            crew_agent = create_agent_from_model(agent_plan, llm_instance=current_llm)
+            crew_agents.append(crew_agent)
+            agent_map[agent_plan.id] = crew_agent
+    
+    # Plan tasks are topologically sorted, so dependencies are always created first
+    task_map = {}  # Map task ID to CrewAI task
     crew_tasks = []
-    
-    # First pass: create tasks without dependencies
-    for task_model in tasks_models:
-        if task_model.depends_on is None:
-            crew_agent = agent_map[task_model.agent.id]
-            crew_task = create_task_from_model(task_model, crew_agent, task_map)
-            task_map[task_model.id] = crew_task
-            crew_tasks.append(crew_task)
-    
-    # Second pass: create tasks with dependencies
-    remaining_tasks = tasks_models.exclude(depends_on=None)
-    max_iterations = len(remaining_tasks)  # Prevent infinite loops
-    iteration = 0
-    
-    while remaining_tasks.exists() and iteration < max_iterations:
-        iteration += 1
-        for task_model in remaining_tasks:
-            if task_model.depends_on.id in task_map:
-                crew_agent = agent_map[task_model.agent.id]
-                crew_task = create_task_from_model(task_model, crew_agent, task_map)
-                task_map[task_model.id] = crew_task
-                crew_tasks.append(crew_task)
-                remaining_tasks = remaining_tasks.exclude(id=task_model.id)
-    
-    # Add remaining tasks (circular dependencies or missing dependencies)
-    for task_model in remaining_tasks:
-        crew_agent = agent_map[task_model.agent.id]
-        crew_task = create_task_from_model(task_model, crew_agent, task_map)
-        task_map[task_model.id] = crew_task
+    source_tasks = set()
+    for task_plan in plan.tasks:
+        if parallel:
+            # Tasks may run at the same time, and a CrewAI agent can only work on one task at once
+            crew_agent = create_agent_from_model(agent_plans[task_plan.agent_id], llm_instance=current_llm)
+            crew_agents.append(crew_agent)
+        else:
+            crew_agent = agent_map[task_plan.agent_id]
+        crew_task = create_task_from_plan(task_plan, crew_agent, task_map)
+        task_map[task_plan.id] = crew_task
         crew_tasks.append(crew_task)
+        if task_plan.is_source_stage:
+            source_tasks.add(id(crew_task))
     
     # Enhance task descriptions with blog post context
-    context_info = f"Topic: {topic}\n"
+    subject_info = f"Topic: {topic}\n"
     if subtitle:
-        context_info += f"Subtitle: {subtitle}\n"
-    if target_audience:
-        context_info += f"Target Audience: {', '.join(target_audience)}\n"
+        subject_info += f"Subtitle: {subtitle}\n"
     if key_points:
-        context_info += f"Key Points: {key_points}\n"
+        subject_info += f"Key Points: {key_points}\n"
     if examples:
-        context_info += f"Examples: {examples}\n"
+        subject_info += f"Examples: {examples}\n"
+    
+    context_info = subject_info
+    if target_audience:
+        context_info += f"Target Audience: {', '.join(target_audience)}\n"
     context_info += f"Tone: {tone}\n"
     
     # Add word count requirement based on length
@@ -306,14 +483,24 @@ def create_crew_from_config(crew_config: CrewConfig, topic: str = '', subtitle:
     word_count = length_requirements.get(length, '500-1000 words')
     context_info += f"Target Length: {word_count}\n"
     
+    # Source stages (no dependency, feeding other tasks) such as research only get the
+    # subject, like the fallback research task, so their output can be reused from the
+    # stage cache when just the audience, tone or length changes
     for task in crew_tasks:
-        task.description = f"{context_info}\n\n{task.description}"
+        info = subject_info if id(task) in source_tasks else context_info
+        task.description = f"{info}\n\n{task.description}"
+    
+    if parallel:
+        # Independent tasks run concurrently; each gets its dependencies' outputs as context
+        return TaskGraphCrew(
+            agents=crew_agents,
+            tasks=crew_tasks,
+            llm=current_llm,
+            max_workers=getattr(settings, 'GENERATION_PARALLEL_TASKS', 3),
+        )
     
     # Determine process type
-    process_type = Process.sequential if crew_config.process_type == 'sequential' else Process.hierarchical
-    
-    # Get LLM instance for the crew to ensure offline mode
-    current_llm = get_ollama_llm()
+    process_type = Process.sequential if plan.process_type == 'sequential' else Process.hierarchical
     
     # Create crew with explicit LLM to prevent OpenAI fallback
     crew = Crew(
@@ -327,6 +514,28 @@ def create_crew_from_config(crew_config: CrewConfig, topic: str = '', subtitle:
     return crew
 
 
+def create_crew_from_config(crew_config: CrewConfig, topic: str = '', subtitle: str = '',
+                           target_audience: list = None, key_points: str = '', 
+                           examples: str = '', tone: str = 'friendly', length: str = 'medium'):
+    """
+    Create a CrewAI crew from a CrewConfig model, using its cached plan.
+    
+    Args:
+        crew_config: CrewConfig model instance
+        topic: Blog post topic
+        subtitle: Optional subtitle
+        target_audience: List of target audience tags
+        key_points: Key points to cover
+        examples: Specific examples to include
+        tone: Writing tone
+        
+    Returns:
+        Configured Crew instance
+    """
+    plan = get_crew_plan(crew_config.id)
+    return create_crew_from_plan(plan, topic, subtitle, target_audience, key_points, examples, tone, length)
+
+
 def get_default_crew_config():
     """Get the default crew configuration or create one if none exists."""
     try:
@@ -356,20 +565,14 @@ def create_blog_post_crew(topic: str, subtitle: str = '', target_audience: list
     if target_audience is None:
         target_audience = []
     
-    # Get crew config
-    if crew_config_id:
-        try:
-            crew_config = CrewConfig.objects.get(id=crew_config_id)
-        except CrewConfig.DoesNotExist:
-            crew_config = get_default_crew_config()
-    else:
-        crew_config = get_default_crew_config()
+    # Get the compiled plan of the crew config (cached, no queries when warm)
+    plan = get_crew_plan(crew_config_id)
     
     # Fallback to hardcoded agents if no config exists
-    if not crew_config:
+    if not plan:
         return create_blog_post_crew_fallback(topic, subtitle, target_audience, key_points, examples, tone, length)
     
-    return create_crew_from_config(crew_config, topic, subtitle, target_audience, key_points, examples, tone, length)
+    return create_crew_from_plan(plan, topic, subtitle, target_audience, key_points, examples, tone, length)
 
 
 def create_blog_post_crew_fallback(topic: str, subtitle: str = '', target_audience: list = None, 
@@ -409,9 +612,131 @@ def create_blog_post_crew_fallback(topic: str, subtitle: str = '', target_audien
     return crew
 
 
+def _stage_upstream(crew_tasks: list, index: int) -> list:
+    """Get the tasks whose output the task at index receives as context."""
+    context = crew_tasks[index].context
+    if context is NOT_SPECIFIED:
+        # Sequential crews hand every earlier output to tasks without explicit context
+        return list(crew_tasks[:index])
+    return list(context or [])
+
+
+def _stage_key(crew_task, upstream: list, ollama_config: dict) -> str:
+    """Get the stage cache key of a CrewAI task; every upstream task must have an output."""
+    agent = getattr(crew_task, 'agent', None)
+    return generation_cache.get_stage_key(
+        {
+            'role': getattr(agent, 'role', ''),
+            'goal': getattr(agent, 'goal', ''),
+            'backstory': getattr(agent, 'backstory', ''),
+        },
+        crew_task.description,
+        crew_task.expected_output,
+        [task.output.raw for task in upstream],
+        ollama_config['model'],
+        ollama_config['temperature'],
+    )
+
+
+def memoize_stages(crew, reuse: bool = True) -> list:
+    """
+    Serve the leading tasks of a crew from the stage cache and cache the output of the rest.
+    
+    A stage is reused when its rendered prompt, agent, model and upstream outputs
+    match a cached one. Reuse stops at the first miss, since later stages depend
+    on that output. Reused tasks keep their cached output on the task (so
+    downstream context still includes it) and are removed from crew.tasks; every
+    task left to run stores its output in the stage cache when it completes.
+    
+    Args:
+        crew: Sequential CrewAI Crew or TaskGraphCrew about to be executed
+        reuse: Look up cached stages; with False outputs are only stored
+        
+    Returns:
+        List of reused CrewAI tasks, in order
+    """
+    from crewai.tasks.task_output import TaskOutput
+    
+    if crew.process == Process.hierarchical:
+        # A hierarchical manager decides the order at runtime, so stages have no stable inputs
+        return []
+    
+    tasks = list(crew.tasks)
+    upstream = [_stage_upstream(tasks, index) for index in range(len(tasks))]
+    ollama_config = get_ollama_config()
+    
+    reused = []
+    if reuse:
+        for index, task in enumerate(tasks):
+            if any(upstream_task.output is None for upstream_task in upstream[index]):
+                break
+            entry = generation_cache.lookup_stage(_stage_key(task, upstream[index], ollama_config))
+            if entry is None:
+                break
+            task.output = TaskOutput(
+                description=task.description,
+                name=task.name,
+                expected_output=task.expected_output,
+                raw=entry.output,
+                agent=entry.agent_role or getattr(task.agent, 'role', ''),
+            )
+            reused.append(task)
+    
+    remaining = tasks[len(reused):]
+    for index, task in enumerate(remaining, start=len(reused)):
+        if reused and task.context is NOT_SPECIFIED:
+            # Reused tasks no longer run in this crew; pass their outputs explicitly
+            task.context = upstream[index]
+        task.callback = _stage_store_callback(task, upstream[index], ollama_config, task.callback)
+    crew.tasks = remaining
+    return reused
+
+
+def _stage_store_callback(task, upstream: list, ollama_config: dict, previous_callback=None):
+    """Build a task callback that stores the task's output in the stage cache."""
+    def store_output(task_output):
+        try:
+            if task_output is not None and task_output.raw:
+                agent_name, task_desc = ProgressTracker._describe_task(task)
+                generation_cache.store_stage(
+                    _stage_key(task, upstream, ollama_config), task_output.raw, agent_name, task_desc
+                )
+        except Exception as e:
+            print(f"Error storing stage output: {e}")
+        if previous_callback:
+            return previous_callback(task_output)
+    
+    return store_output
+
+
+def use_streaming_llm(crew, crew_task):
+    """
+    Run a task of a crew on its own copy of its agent, with a streaming LLM.
+    
+    The agent can be shared with other tasks of the crew, which keep the
+    original agent and its non-streaming LLM.
+    
+    Args:
+        crew: CrewAI Crew or TaskGraphCrew about to be executed
+        crew_task: Task whose tokens should be streamed
+    """
+    agent = crew_task.agent
+    streaming_agent = agent.copy()
+    streaming_agent.llm = get_ollama_llm(stream=True)
+    crew_task.agent = streaming_agent
+    # Crew kickoff sets up only the agents it lists (step callback, executor)
+    shared = any(task.agent is agent for task in crew.tasks)
+    crew.agents = [
+        streaming_agent if member is agent and not shared else member for member in crew.agents
+    ]
+    if not any(member is streaming_agent for member in crew.agents):
+        crew.agents.append(streaming_agent)
+
+
 def generate_blog_post(topic: str, subtitle: str = '', target_audience: list = None,
                       key_points: str = '', examples: str = '', tone: str = 'friendly',
-                      length: str = 'medium', crew_config_id: int = None, blog_post_id: int = None) -> str:
+                      length: str = 'medium', crew_config_id: int = None, blog_post_id: int = None,
+                      reuse_stages: bool = True) -> str:
     """
     Generate a blog post for the given topic using CrewAI agents.
     
@@ -424,6 +749,7 @@ def generate_blog_post(topic: str, subtitle: str = '', target_audience: list = N
         tone: Writing tone
         crew_config_id: Optional crew configuration ID
         blog_post_id: Optional BlogPost ID for progress tracking
+        reuse_stages: Reuse cached stage outputs when the generation cache is enabled
         
     Returns:
         Generated blog post content
@@ -443,71 +769,27 @@ def generate_blog_post(topic: str, subtitle: str = '', target_audience: list = N
     
     # Count total tasks for progress tracking
     total_tasks = len(crew.tasks) if hasattr(crew, 'tasks') and crew.tasks else 3  # Default to 3 if unknown
-    if progress_tracker:
-        progress_tracker.total_tasks = total_tasks
-        progress_tracker.update_progress('', '', f'Crew ready with {total_tasks} tasks. Starting execution...', 10)
     
-    # Execute crew with progress tracking using threading
-    # Use a background thread to simulate progress updates during execution
-    execution_done = threading.Event()
-    execution_error = [None]
-    result = None  # Initialize result variable
-    
-    def execute_crew():
-        """Execute crew in a separate thread."""
-        nonlocal result
-        try:
-            result = crew.kickoff()
-        except Exception as e:
-            execution_error[0] = e
-        finally:
-            execution_done.set()
-    
-    # Start execution in background thread
-    exec_thread = threading.Thread(target=execute_crew)
-    exec_thread.start()
-    
-    # Update progress during execution
-    if progress_tracker and hasattr(crew, 'tasks') and crew.tasks:
-        task_list = list(crew.tasks)
-        base_percentage = 15
-        percentage_per_task = (85 - base_percentage) / total_tasks if total_tasks > 0 else 0
-        
-        task_index = 0
-        while not execution_done.is_set() and task_index < len(task_list):
-            # Update progress for current task
-            current_task = task_list[task_index]
-            agent_name = current_task.agent.role if hasattr(current_task, 'agent') and hasattr(current_task.agent, 'role') else 'Agent'
-            task_desc = current_task.description[:150] + '...' if len(current_task.description) > 150 else current_task.description
-            
-            # Calculate progress percentage
-            current_progress = base_percentage + (task_index * percentage_per_task)
-            progress_tracker.task_started(agent_name, task_desc, task_index)
-            progress_tracker.update_progress(agent_name, task_desc, 
-                                           f"{agent_name} is working on: {task_desc}", 
-                                           int(current_progress))
-            
-            # Wait a bit before moving to next task (simulate task progression)
-            # Check if execution is done every 2 seconds
-            for _ in range(10):  # Check 10 times (20 seconds max per task)
-                if execution_done.wait(timeout=2):
-                    break
-                # Gradually increase progress within task
-                if task_index < len(task_list) - 1:
-                    sub_progress = current_progress + (percentage_per_task * 0.1 * (_ + 1))
-                    progress_tracker.update_progress(agent_name, task_desc,
-                                                   f"{agent_name} is working on: {task_desc}",
-                                                   int(min(sub_progress, base_percentage + ((task_index + 1) * percentage_per_task))))
-            
-            # Mark task as completed
-            progress_tracker.task_completed(agent_name, task_desc)
-            task_index += 1
+    # Skip stages whose output is cached (e.g. research when only the tone changed)
+    reused_tasks = memoize_stages(crew, reuse=reuse_stages) if generation_cache.is_enabled() else []
     
-    # Wait for execution to complete
-    exec_thread.join()
+    if progress_tracker:
+        progress_tracker.attach(crew, reused_tasks)
+        if getattr(settings, 'GENERATION_STREAM_CONTENT', True) and crew.tasks:
+            # Stream the final task from Ollama so the post shows up while it is written
+            final_task = crew.tasks[-1]
+            if getattr(final_task, 'agent', None) is not None:
+                use_streaming_llm(crew, final_task)
+            progress_tracker.content_buffer = start_content_stream(blog_post_id, final_task)
+        progress_tracker.update_progress('', '', f'Crew ready with {total_tasks} tasks. Starting execution...', 10)
+        progress_tracker.start()
     
-    if execution_error[0]:
-        raise execution_error[0]
+    # Execute crew; progress is reported by the tracker's CrewAI callbacks
+    try:
+        result = crew.kickoff() if crew.tasks else reused_tasks[-1].output
+    finally:
+        if progress_tracker and progress_tracker.content_buffer is not None:
+            finish_content_stream(blog_post_id)
     
     # After kickoff completes, we know all tasks are done
     if progress_tracker:
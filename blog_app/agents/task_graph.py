@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from crewai import Crew, Process
+
+
+class TaskGraphCrew:
+    """
+    Crew that runs its tasks as a dependency graph instead of one after another.
+
+    A task starts as soon as every task in its context has finished, so tasks
+    without a dependency between them (e.g. several researchers covering
+    different angles) run at the same time, up to ``max_workers`` at once.
+    Each task runs in a single-task CrewAI crew on its own thread; the outputs
+    of its context tasks reach it through CrewAI's normal task context.
+
+    Offers the parts of the Crew interface blog generation uses: ``tasks``,
+    ``agents``, ``process``, ``step_callback``, ``task_callback`` and ``kickoff()``.
+    """
+
+    process = 'parallel'
+
+    def __init__(self, agents: list, tasks: list, llm=None, max_workers: int = 3, verbose: bool = True):
+        """
+        Initialize the crew.
+
+        Args:
+            agents: CrewAI agents; tasks that may run at the same time must not share an agent
+            tasks: CrewAI tasks, dependencies before dependents; the last one produces the result
+            llm: LLM passed to every single-task crew
+            max_workers: Maximum number of tasks running at the same time
+            verbose: Verbose CrewAI output
+        """
+        self.agents = agents
+        self.tasks = tasks
+        self.llm = llm
+        self.max_workers = max(1, max_workers)
+        self.verbose = verbose
+        self.step_callback = None
+        self.task_callback = None
+        self.task_started_callback = None  # Called with the task on its thread before it runs
+
+    def _run_task(self, task):
+        if self.task_started_callback:
+            self.task_started_callback(task)
+        crew = Crew(
+            agents=[task.agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=self.verbose,
+            llm=self.llm,
+            step_callback=self.step_callback,
+            task_callback=self.task_callback,
+        )
+        crew.kickoff()
+        return task.output
+
+    def kickoff(self):
+        """
+        Run every task once its dependencies are done.
+
+        Returns:
+            TaskOutput of the last task
+
+        Raises:
+            ValueError: If tasks depend on each other in a cycle
+        """
+        tasks = list(self.tasks)
+        scheduled = {id(task) for task in tasks}
+        waiting_on = {}
+        dependents = {id(task): [] for task in tasks}
+        for task in tasks:
+            # Context tasks outside this crew (e.g. reused from the stage cache) are already done
+            dependencies = [t for t in task.context if id(t) in scheduled] if isinstance(task.context, list) else []
+            waiting_on[id(task)] = len(dependencies)
+            for dependency in dependencies:
+                dependents[id(dependency)].append(task)
+
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='crew-task') as executor:
+            running = {
+                executor.submit(self._run_task, task): task
+                for task in tasks if waiting_on[id(task)] == 0
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    # Re-raises a failed task; leaving the executor waits for tasks still running
+                    future.result()
+                    finished += 1
+                    for dependent in dependents[id(task)]:
+                        waiting_on[id(dependent)] -= 1
+                        if waiting_on[id(dependent)] == 0:
+                            running[executor.submit(self._run_task, dependent)] = dependent
+
+        if finished < len(tasks):
+            raise ValueError("Crew tasks depend on each other in a cycle; fix the task dependencies")
+        return tasks[-1].output
@@ -0,0 +1,35 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+
+
+class BlogAppConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'blog_app'
+
+    def ready(self):
+        # Start in-process generation workers (and recover orphaned jobs) when the
+        # first request arrives, so management commands like migrate never start them
+        request_started.connect(_start_worker_pool, dispatch_uid='blog_app_start_worker_pool')
+        
+        from .crew_plans import connect_signals
+        connect_signals()
+        
+        from .ollama_pool import connect_signals as connect_warm_up_signals
+        connect_warm_up_signals()
+        
+        # The search index triggers on SQLite read compressed content through SQL functions
+        from django.db.backends.signals import connection_created
+        from .search import register_sqlite_functions
+        connection_created.connect(register_sqlite_functions, dispatch_uid='blog_app_sqlite_functions')
+        
+        from django.conf import settings
+        if getattr(settings, 'SQLITE_CONCURRENCY_MODE', False):
+            from .db_writer import configure_sqlite_connection
+            connection_created.connect(configure_sqlite_connection, dispatch_uid='blog_app_configure_sqlite')
+
+
+def _start_worker_pool(sender, **kwargs):
+    """Start the generation worker pool once, on the first request handled by this process."""
+    request_started.disconnect(dispatch_uid='blog_app_start_worker_pool')
+    from .workers import get_worker_pool
+    get_worker_pool().start()
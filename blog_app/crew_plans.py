@@ -0,0 +1,346 @@
+import heapq
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from django.conf import settings
+from .models import Agent as AgentModel, Task as TaskModel, CrewConfig, OllamaSettings, OllamaBackend
+
+
+@dataclass(frozen=True)
+class AgentPlan:
+    """Resolved settings of one active agent in a crew."""
+    id: int
+    role: str
+    goal: str
+    backstory: str
+    order: int
+
+
+@dataclass(frozen=True)
+class TaskPlan:
+    """Resolved settings of one active task in a crew."""
+    id: int
+    agent_id: int
+    description: str
+    expected_output: str
+    order: int
+    depends_on_ids: tuple = ()  # IDs of tasks in the same plan whose output this task receives
+    is_source_stage: bool = False  # No dependencies, but other tasks depend on it (e.g. research)
+
+
+@dataclass(frozen=True)
+class CrewPlan:
+    """
+    Everything needed to build a CrewAI crew for a CrewConfig without touching the database.
+
+    Tasks are topologically sorted: every task comes after the tasks it depends on.
+    """
+    crew_config_id: int
+    name: str
+    process_type: str
+    agents: tuple
+    tasks: tuple
+
+
+_plans = {}  # crew_config_id (None for the default config) -> (CrewPlan or None, expires at)
+_llm_config = None  # (config dict, expires at)
+_generation = 0  # Bumped on invalidation so a plan compiled meanwhile is not cached
+_lock = threading.Lock()
+
+
+def _cache_ttl() -> float:
+    return getattr(settings, 'GENERATION_PLAN_CACHE_TTL', 60)
+
+
+def _sort_tasks(task_plans: list) -> list:
+    """
+    Order tasks so that each one comes after its dependencies, in O(V+E).
+
+    Among tasks that are ready to run, lower (order, id) goes first. Cycles are
+    rejected when tasks are saved through the API; any that remain (e.g. edited
+    in the admin) are logged and their tasks appended in (order, id) order.
+    """
+    by_id = {task.id: task for task in task_plans}
+    waiting_on = {task.id: 0 for task in task_plans}
+    dependents = {task.id: [] for task in task_plans}
+    for task in task_plans:
+        for dependency_id in task.depends_on_ids:
+            waiting_on[task.id] += 1
+            dependents[dependency_id].append(task.id)
+
+    ready = [(task.order, task.id) for task in task_plans if waiting_on[task.id] == 0]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        _, task_id = heapq.heappop(ready)
+        ordered.append(by_id[task_id])
+        for dependent_id in dependents[task_id]:
+            waiting_on[dependent_id] -= 1
+            if waiting_on[dependent_id] == 0:
+                heapq.heappush(ready, (by_id[dependent_id].order, dependent_id))
+
+    if len(ordered) < len(task_plans):
+        placed = {task.id for task in ordered}
+        cyclic = sorted((task for task in task_plans if task.id not in placed), key=lambda t: (t.order, t.id))
+        print(f"Task dependency cycle involving tasks {[task.id for task in cyclic]}; running them last")
+        ordered += cyclic
+    return ordered
+
+
+def load_dependency_graph() -> dict:
+    """
+    Load the dependencies of every task with two queries.
+
+    Returns:
+        Dictionary mapping task ID to the list of task IDs it depends on
+    """
+    graph = {}
+    for task_id, depends_on_id in TaskModel.objects.values_list('id', 'depends_on_id'):
+        graph[task_id] = [depends_on_id] if depends_on_id else []
+    extra = TaskModel.extra_dependencies.through.objects.values_list('from_task_id', 'to_task_id')
+    for task_id, dependency_id in extra:
+        if dependency_id not in graph[task_id]:
+            graph[task_id].append(dependency_id)
+    return graph
+
+
+def find_dependency_cycle(task_id: int, dependency_ids: list, graph: dict = None):
+    """
+    Check whether giving a task these dependencies would create a cycle.
+
+    Searches breadth-first from the new dependencies back to the task, so every
+    task and dependency is visited at most once (O(V+E)).
+
+    Args:
+        task_id: ID of the task being saved
+        dependency_ids: IDs of the tasks it would depend on
+        graph: Dependency graph from load_dependency_graph() (loaded if not given)
+
+    Returns:
+        List of task IDs forming the cycle, starting and ending with task_id, or None
+    """
+    if graph is None:
+        graph = load_dependency_graph()
+    graph = dict(graph)
+    graph[task_id] = list(dependency_ids)
+
+    # parents[x] = the task that depends on x on the path from task_id
+    parents = {}
+    queue = deque()
+    for dependency_id in dependency_ids:
+        if dependency_id not in parents:
+            parents[dependency_id] = task_id
+            queue.append(dependency_id)
+    while queue:
+        current = queue.popleft()
+        if current == task_id:
+            path = [task_id]
+            node = parents[task_id]
+            while node != task_id:
+                path.append(node)
+                node = parents[node]
+            path.append(task_id)
+            # Each entry of path depends on the one before it; report it in "depends on" order
+            return path[::-1]
+        for dependency_id in graph.get(current, []):
+            if dependency_id not in parents:
+                parents[dependency_id] = current
+                queue.append(dependency_id)
+    return None
+
+
+def compile_crew_plan(crew_config: CrewConfig) -> CrewPlan:
+    """
+    Load the active agents and tasks of a crew configuration into a CrewPlan.
+
+    Args:
+        crew_config: CrewConfig model instance
+
+    Returns:
+        CrewPlan with agents in order and tasks topologically sorted
+    """
+    agent_rows = crew_config.agents.filter(is_active=True).order_by('order', 'id').values(
+        'id', 'role', 'goal', 'backstory', 'order'
+    )
+    agents = tuple(AgentPlan(**row) for row in agent_rows)
+    agent_ids = [agent.id for agent in agents]
+
+    task_rows = list(
+        TaskModel.objects.filter(agent_id__in=agent_ids, is_active=True).order_by('order', 'id').values(
+            'id', 'agent_id', 'description', 'expected_output', 'order', 'depends_on_id'
+        )
+    )
+    task_ids = {row['id'] for row in task_rows}
+    dependencies = {row['id']: [row['depends_on_id']] if row['depends_on_id'] else [] for row in task_rows}
+    extra = TaskModel.extra_dependencies.through.objects.filter(from_task_id__in=task_ids).order_by('id')
+    for task_id, dependency_id in extra.values_list('from_task_id', 'to_task_id'):
+        if dependency_id not in dependencies[task_id]:
+            dependencies[task_id].append(dependency_id)
+
+    # Dependencies on inactive tasks or tasks outside this crew are ignored
+    for task_id in dependencies:
+        dependencies[task_id] = tuple(d for d in dependencies[task_id] if d in task_ids and d != task_id)
+    feeding_ids = {d for depends_on_ids in dependencies.values() for d in depends_on_ids}
+    task_plans = []
+    for row in task_rows:
+        depends_on_ids = dependencies[row['id']]
+        task_plans.append(TaskPlan(
+            id=row['id'],
+            agent_id=row['agent_id'],
+            description=row['description'],
+            expected_output=row['expected_output'],
+            order=row['order'],
+            depends_on_ids=depends_on_ids,
+            is_source_stage=not depends_on_ids and row['id'] in feeding_ids,
+        ))
+
+    return CrewPlan(
+        crew_config_id=crew_config.id,
+        name=crew_config.name,
+        process_type=crew_config.process_type,
+        agents=agents,
+        tasks=tuple(_sort_tasks(task_plans)),
+    )
+
+
+def get_crew_plan(crew_config_id: int = None):
+    """
+    Get the compiled plan of a crew configuration, compiling it on first use.
+
+    Plans are cached per process until a crew, agent, task or Ollama setting is
+    saved or deleted, and for at most GENERATION_PLAN_CACHE_TTL seconds so that
+    changes made by other processes are picked up as well.
+
+    Args:
+        crew_config_id: Optional crew configuration ID (uses default if not provided or not found)
+
+    Returns:
+        CrewPlan, or None to use the hardcoded fallback crew
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _plans.get(crew_config_id)
+        if cached and cached[1] > now:
+            return cached[0]
+        generation = _generation
+
+    crew_config = None
+    if crew_config_id:
+        crew_config = CrewConfig.objects.filter(id=crew_config_id).first()
+    if crew_config is None:
+        crew_config = CrewConfig.objects.filter(is_default=True).first()
+    plan = compile_crew_plan(crew_config) if crew_config else None
+
+    with _lock:
+        if generation == _generation:
+            _plans[crew_config_id] = (plan, now + _cache_ttl())
+    return plan
+
+
+def _load_backends(base_url: str) -> list:
+    """
+    List the Ollama servers to balance requests across.
+
+    The server of the active settings always comes first, followed by servers
+    from OLLAMA_BASE_URLS (comma-separated) and enabled OllamaBackend rows.
+    """
+    backends = {base_url.rstrip('/'): 1}
+    for url in os.getenv('OLLAMA_BASE_URLS', '').split(','):
+        if url.strip():
+            backends.setdefault(url.strip().rstrip('/'), 1)
+    try:
+        for url, weight in OllamaBackend.objects.filter(is_enabled=True).values_list('base_url', 'weight'):
+            backends[url.rstrip('/')] = weight
+    except Exception as e:
+        print(f"Error loading Ollama backends from database: {e}")
+    return list(backends.items())
+
+
+def _load_llm_config() -> dict:
+    config = _load_ollama_settings()
+    config['backends'] = _load_backends(config['base_url'])
+    return config
+
+
+def _load_ollama_settings() -> dict:
+    try:
+        # Try to get active Ollama settings from database
+        ollama_settings = OllamaSettings.objects.filter(is_active=True).first()
+        if ollama_settings:
+            # CrewAI LLM expects model name with "ollama/" prefix
+            model_name = ollama_settings.model
+            if not model_name.startswith('ollama/'):
+                model_name = f"ollama/{model_name}"
+            return {
+                'model': model_name,
+                'base_url': ollama_settings.base_url,
+                'temperature': ollama_settings.temperature,
+                'keep_alive': ollama_settings.keep_alive,
+                'source': 'database',
+            }
+    except Exception as e:
+        print(f"Error loading Ollama settings from database: {e}")
+        import traceback
+        traceback.print_exc()
+
+    # Fallback to environment variables
+    base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+    model = os.getenv('OLLAMA_MODEL', 'llama3')
+    temperature = float(os.getenv('OLLAMA_TEMPERATURE', '0.7'))
+
+    # CrewAI LLM expects model name with "ollama/" prefix
+    if not model.startswith('ollama/'):
+        model = f"ollama/{model}"
+
+    return {
+        'model': model,
+        'base_url': base_url,
+        'temperature': temperature,
+        'keep_alive': getattr(settings, 'OLLAMA_KEEP_ALIVE', '30m'),
+        'source': 'env',
+    }
+
+
+def get_llm_config() -> dict:
+    """
+    Get the active Ollama settings, cached like crew plans.
+
+    Returns:
+        Dictionary with 'model' (with ollama/ prefix), 'base_url', 'temperature',
+        'keep_alive', 'source' ('database' or 'env') and 'backends' (list of (base_url, weight))
+    """
+    global _llm_config
+    now = time.monotonic()
+    with _lock:
+        if _llm_config and _llm_config[1] > now:
+            return dict(_llm_config[0])
+        generation = _generation
+    config = _load_llm_config()
+    with _lock:
+        if generation == _generation:
+            _llm_config = (config, now + _cache_ttl())
+    return dict(config)
+
+
+def invalidate_crew_plans(**kwargs):
+    """Drop every cached plan and the cached Ollama settings; connected to model signals."""
+    global _llm_config, _generation
+    with _lock:
+        _plans.clear()
+        _llm_config = None
+        _generation += 1
+
+
+def connect_signals():
+    """Invalidate cached plans whenever the models they are compiled from change."""
+    from django.db.models.signals import post_save, post_delete, m2m_changed
+
+    for model in (AgentModel, TaskModel, CrewConfig, OllamaSettings, OllamaBackend):
+        post_save.connect(invalidate_crew_plans, sender=model, dispatch_uid=f'crew_plans_save_{model.__name__}')
+        post_delete.connect(invalidate_crew_plans, sender=model, dispatch_uid=f'crew_plans_delete_{model.__name__}')
+    m2m_changed.connect(invalidate_crew_plans, sender=CrewConfig.agents.through,
+                        dispatch_uid='crew_plans_crew_agents')
+    m2m_changed.connect(invalidate_crew_plans, sender=TaskModel.extra_dependencies.through,
+                        dispatch_uid='crew_plans_task_dependencies')
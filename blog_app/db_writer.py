@@ -0,0 +1,136 @@
+import queue
+import threading
+from concurrent.futures import Future
+from django.conf import settings
+from django.db import close_old_connections
+
+
+def get_sqlite_pragmas() -> dict:
+    """
+    PRAGMA values of the SQLite concurrency mode (SQLITE_CONCURRENCY_MODE).
+
+    WAL lets readers run while a write is in progress, busy_timeout makes a
+    writer wait for the lock instead of failing, synchronous=NORMAL only syncs
+    the WAL at checkpoints (safe in WAL mode) and mmap_size lets reads come
+    straight from the page cache.
+    """
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': getattr(settings, 'SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': getattr(settings, 'SQLITE_BUSY_TIMEOUT', 5000),
+        'mmap_size': getattr(settings, 'SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'temp_store': 'MEMORY',
+    }
+
+
+def apply_sqlite_pragmas(cursor, pragmas: dict = None):
+    """Apply the concurrency-mode PRAGMAs (or the given ones) on a SQLite cursor."""
+    for name, value in (pragmas or get_sqlite_pragmas()).items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """connection_created handler: tune every new SQLite connection."""
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor)
+
+
+class DatabaseWriter:
+    """
+    Thread that performs database writes one at a time, in submission order.
+
+    SQLite allows a single writer at a time. When generation workers, their
+    progress flushes and streamed content all write concurrently, they contend
+    for that lock and some give up with "database is locked". Sending those
+    writes through one thread serializes them without lock contention between
+    them; requests and reads are not affected.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, write, *args, **kwargs) -> Future:
+        """
+        Queue a write.
+
+        Args:
+            write: Callable performing the write (ORM calls are fine)
+            *args, **kwargs: Arguments for write
+
+        Returns:
+            Future resolving to write's return value or exception
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            # Already on the writer thread (a write queueing another): run it now
+            self._execute(future, write, args, kwargs)
+            return future
+        self._ensure_started()
+        self._queue.put((future, write, args, kwargs))
+        return future
+
+    @staticmethod
+    def _execute(future, write, args, kwargs):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(write(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _run(self):
+        while True:
+            future, write, args, kwargs = self._queue.get()
+            self._execute(future, write, args, kwargs)
+            if self._queue.empty():
+                close_old_connections()
+
+    def pending(self) -> int:
+        """Number of queued writes."""
+        return self._queue.qsize()
+
+
+_writer = DatabaseWriter()
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'SQLITE_CONCURRENCY_MODE', False)
+
+
+def run_write(write, *args, wait: bool = True, **kwargs):
+    """
+    Perform a write through the single writer thread when the SQLite concurrency mode is on.
+
+    Without it, the write runs in the calling thread as before.
+
+    Args:
+        write: Callable performing the write
+        *args, **kwargs: Arguments for write
+        wait: Block until the write is done and return its result (or raise its
+            exception). Otherwise return at once; failures are logged.
+
+    Returns:
+        write's return value when waiting, else None
+    """
+    if not is_enabled():
+        return write(*args, **kwargs)
+    future = _writer.submit(write, *args, **kwargs)
+    if wait:
+        return future.result()
+    future.add_done_callback(_log_failure)
+    return None
+
+
+def _log_failure(future: Future):
+    error = future.exception()
+    if error is not None:
+        print(f"Error in queued database write: {error}")
@@ -0,0 +1,251 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from .models import BlogPost
+
+
+# Post fields pushed to progress subscribers. Deliberately excludes content,
+# key_points and examples so progress updates stay small.
+PROGRESS_FIELDS = ['id', 'status', 'title', 'current_agent', 'current_task',
+                   'progress_message', 'progress_percentage']
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+def progress_event(blog_post: BlogPost) -> dict:
+    """Build a progress event payload from a BlogPost instance."""
+    event = {field: getattr(blog_post, field) for field in PROGRESS_FIELDS}
+    event['queue_position'] = None
+    return event
+
+
+class _Subscription:
+    """Events for a set of posts, delivered to one blocking (WSGI) stream."""
+
+    def __init__(self, post_ids):
+        self.post_ids = set(post_ids)
+        self._queue = queue.Queue()
+
+    def deliver(self, event: dict):
+        self._queue.put_nowait(event)
+
+    def get(self, timeout: float):
+        """Return the next event, or None if none arrived within timeout seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class _AsyncSubscription(_Subscription):
+    """Events for a set of posts, delivered to one asyncio (ASGI) stream."""
+
+    def __init__(self, post_ids):
+        self.post_ids = set(post_ids)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+
+    def deliver(self, event: dict):
+        # Publishers run in worker threads; hand the event to the subscriber's loop
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+
+    async def get(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class ProgressBroadcaster:
+    """
+    In-process publish/subscribe hub for blog post progress.
+
+    Generation workers publish an event whenever a post's progress or status
+    changes, and every open progress stream watching that post receives it.
+    Events do not cross process boundaries; streams fall back to a periodic
+    lightweight query to pick up changes made by external workers.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, post_ids, use_asyncio: bool = False) -> _Subscription:
+        """
+        Start receiving events for the given posts.
+
+        Args:
+            post_ids: IDs of the posts to watch
+            use_asyncio: Deliver events to an asyncio queue on the running loop
+
+        Returns:
+            Subscription to read events from; pass it to unsubscribe() when done
+        """
+        subscription = _AsyncSubscription(post_ids) if use_asyncio else _Subscription(post_ids)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: _Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict):
+        """
+        Send a progress event to every subscription watching its post.
+
+        Args:
+            event: Payload built by progress_event(); must include 'id'
+        """
+        with self._lock:
+            targets = [s for s in self._subscriptions if event['id'] in s.post_ids]
+        for subscription in targets:
+            try:
+                subscription.deliver(event)
+            except Exception as e:
+                # Subscriber's event loop already closed; it will unsubscribe itself
+                print(f"Error delivering progress event: {e}")
+
+
+broadcaster = ProgressBroadcaster()
+
+
+def publish_progress(blog_post: BlogPost):
+    """Publish the current progress of a post to open progress streams."""
+    broadcaster.publish(progress_event(blog_post))
+
+
+def get_progress_snapshot(post_ids) -> dict:
+    """
+    Read the current progress of several posts with one narrow query, plus one for queue positions.
+
+    Returns:
+        Dictionary mapping post ID to its progress event payload
+    """
+    from .workers import get_queue_positions
+    from .progress_store import progress_store, HOT_FIELDS
+
+    snapshot = {}
+    for row in BlogPost.objects.filter(id__in=post_ids).values(*PROGRESS_FIELDS):
+        # Posts being generated in this process have newer progress in memory
+        state = progress_store.get(row['id'])
+        if state is not None:
+            row.update((field, state[field]) for field in HOT_FIELDS if field in row)
+        row['queue_position'] = None
+        snapshot[row['id']] = row
+    # Queue positions of all waiting posts in one query
+    pending = [post_id for post_id, row in snapshot.items() if row['status'] == 'pending']
+    for post_id, position in get_queue_positions(pending).items():
+        snapshot[post_id]['queue_position'] = position
+    return snapshot
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class ProgressStream:
+    """
+    Server-Sent Events stream of progress for one or more posts.
+
+    Sends the current state first, then an event for every change, until all
+    watched posts reach a terminal status or disappear. Iterate synchronously
+    under WSGI or asynchronously under ASGI.
+    """
+
+    def __init__(self, post_ids, poll_interval: float = 5.0, keepalive_interval: float = 15.0):
+        """
+        Initialize the stream.
+
+        Args:
+            post_ids: IDs of the posts to watch
+            poll_interval: Seconds between database checks for changes made by other processes
+            keepalive_interval: Seconds between keep-alive comments on an idle stream
+        """
+        self.post_ids = list(dict.fromkeys(post_ids))
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+        self._last_sent = {}
+        self._finished = set()
+
+    def _changed_messages(self, events) -> list:
+        """Turn events into SSE messages, skipping ones that repeat what was already sent."""
+        messages = []
+        for event in events:
+            post_id = event['id']
+            if post_id in self._finished:
+                continue
+            if self._last_sent.get(post_id) != event:
+                self._last_sent[post_id] = event
+                messages.append(format_sse('progress', event))
+            if event['status'] in TERMINAL_STATUSES:
+                self._finished.add(post_id)
+        return messages
+
+    def _snapshot_messages(self) -> list:
+        """Load the current state of all unfinished posts and return messages for changes."""
+        pending_ids = [post_id for post_id in self.post_ids if post_id not in self._finished]
+        snapshot = get_progress_snapshot(pending_ids)
+        for post_id in pending_ids:
+            if post_id not in snapshot:
+                # Deleted posts end their part of the stream
+                self._finished.add(post_id)
+        return self._changed_messages(snapshot.values())
+
+    @property
+    def done(self) -> bool:
+        return len(self._finished) >= len(self.post_ids)
+
+    def _closing_message(self) -> str:
+        return format_sse('done', {'ids': self.post_ids})
+
+    def __iter__(self):
+        subscription = broadcaster.subscribe(self.post_ids)
+        try:
+            yield from self._snapshot_messages()
+            close_old_connections()
+            last_poll = last_write = time.monotonic()
+            while not self.done:
+                event = subscription.get(timeout=min(self.poll_interval, self.keepalive_interval))
+                now = time.monotonic()
+                messages = self._changed_messages([event]) if event else []
+                if now - last_poll >= self.poll_interval:
+                    messages += self._snapshot_messages()
+                    close_old_connections()
+                    last_poll = now
+                if not messages and now - last_write >= self.keepalive_interval:
+                    messages = [': keep-alive\n\n']
+                if messages:
+                    last_write = now
+                    yield from messages
+            yield self._closing_message()
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    async def __aiter__(self):
+        subscription = broadcaster.subscribe(self.post_ids, use_asyncio=True)
+        snapshot_messages = sync_to_async(self._snapshot_messages)
+        try:
+            for message in await snapshot_messages():
+                yield message
+            last_poll = last_write = time.monotonic()
+            while not self.done:
+                event = await subscription.get(timeout=min(self.poll_interval, self.keepalive_interval))
+                now = time.monotonic()
+                messages = self._changed_messages([event]) if event else []
+                if now - last_poll >= self.poll_interval:
+                    messages += await snapshot_messages()
+                    last_poll = now
+                if not messages and now - last_write >= self.keepalive_interval:
+                    messages = [': keep-alive\n\n']
+                for message in messages:
+                    last_write = now
+                    yield message
+            yield self._closing_message()
+        finally:
+            broadcaster.unsubscribe(subscription)
@@ -0,0 +1,52 @@
+import zlib
+from django.db import models
+
+# First byte of a stored value: how the rest of it is encoded
+_PLAIN = b'\x00'
+_ZLIB = b'\x01'
+
+
+def compress_text(text: str, level: int = 6) -> bytes:
+    """
+    Encode text for a CompressedTextField column.
+
+    Text that zlib can't shrink (short strings) is stored as plain UTF-8.
+    """
+    raw = text.encode('utf-8')
+    packed = zlib.compress(raw, level)
+    return _ZLIB + packed if len(packed) < len(raw) else _PLAIN + raw
+
+
+def decompress_text(data) -> str:
+    """Decode a value stored by compress_text()."""
+    data = bytes(data)
+    if not data:
+        return ''
+    if data[:1] == _ZLIB:
+        return zlib.decompress(data[1:]).decode('utf-8')
+    return data[1:].decode('utf-8')
+
+
+class CompressedTextField(models.TextField):
+    """
+    Text stored zlib-compressed in a binary column.
+
+    Reads and writes plain str like a TextField; only the stored bytes are
+    compressed. The database can't look inside the values, so the field
+    can't be filtered on (beyond isnull) or used in database functions.
+    """
+    description = 'Text stored compressed'
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return decompress_text(value)
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from .crew_plans import get_crew_plan, get_llm_config
+from .models import GenerationCacheEntry, StageCacheEntry
+
+
+# Bump when prompts or crew construction change in code, so old results stop matching
+CACHE_KEY_VERSION = 2
+
+_counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0,
+             'stage_hits': 0, 'stage_misses': 0, 'stage_stores': 0}
+_counters_lock = threading.Lock()
+
+
+def _count(name: str, amount: int = 1):
+    with _counters_lock:
+        _counters[name] += amount
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'GENERATION_CACHE_ENABLED', False)
+
+
+def _normalize_text(value) -> str:
+    """Collapse whitespace and case so trivially different inputs share a key."""
+    return ' '.join(str(value or '').split()).casefold()
+
+
+def normalize_inputs(params: dict) -> dict:
+    """
+    Normalize validated BlogPostCreateSerializer data for hashing.
+
+    Args:
+        params: Validated BlogPostCreateSerializer data
+
+    Returns:
+        Dictionary of the fields that affect the generated post
+    """
+    audience = sorted({_normalize_text(tag) for tag in params.get('target_audience') or [] if _normalize_text(tag)})
+    return {
+        'topic': _normalize_text(params.get('topic')),
+        'subtitle': _normalize_text(params.get('subtitle')),
+        'target_audience': audience,
+        'key_points': _normalize_text(params.get('key_points')),
+        'examples': _normalize_text(params.get('examples')),
+        'tone': params.get('tone') or 'friendly',
+        'length': params.get('length') or 'medium',
+    }
+
+
+def describe_crew_config(plan) -> dict:
+    """
+    Describe everything about a crew configuration that changes its output.
+
+    Args:
+        plan: CrewPlan, or None for the hardcoded fallback crew
+
+    Returns:
+        JSON-serializable description of agents, tasks and process type
+    """
+    if plan is None:
+        return {'fallback': True}
+    return {
+        'process_type': plan.process_type,
+        'agents': [
+            [agent.id, agent.role, agent.goal, agent.backstory, agent.order]
+            for agent in plan.agents
+        ],
+        'tasks': [
+            [task.id, task.agent_id, task.description, task.expected_output, list(task.depends_on_ids), task.order]
+            for task in plan.tasks
+        ],
+    }
+
+
+def get_cache_key(params: dict) -> str:
+    """
+    Build the cache key for a generation request.
+
+    The key hashes the normalized inputs, the resolved crew configuration
+    (agents, tasks and prompts) and the Ollama model and temperature.
+
+    Args:
+        params: Validated BlogPostCreateSerializer data
+
+    Returns:
+        SHA-256 hex digest
+    """
+    ollama_config = get_llm_config()
+    payload = {
+        'version': CACHE_KEY_VERSION,
+        'inputs': normalize_inputs(params),
+        'crew': describe_crew_config(get_crew_plan(params.get('crew_config_id'))),
+        'model': ollama_config['model'],
+        'temperature': ollama_config['temperature'],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get_stage_key(agent: dict, description: str, expected_output: str, upstream_outputs: list,
+                  model: str, temperature: float) -> str:
+    """
+    Build the cache key for one stage (crew task) of a generation.
+
+    The key hashes the stage's rendered prompt, the agent running it, the
+    outputs of the stages it reads from and the Ollama model and temperature,
+    so a stage is only reused when it would see exactly the same input.
+
+    Args:
+        agent: Agent 'role', 'goal' and 'backstory'
+        description: Rendered task description
+        expected_output: Task expected output
+        upstream_outputs: Raw outputs of the stages passed to this one as context, in order
+        model: Ollama model name
+        temperature: Ollama temperature
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = {
+        'version': CACHE_KEY_VERSION,
+        'agent': [agent.get('role', ''), agent.get('goal', ''), agent.get('backstory', '')],
+        'description': description,
+        'expected_output': expected_output,
+        'upstream': list(upstream_outputs),
+        'model': model,
+        'temperature': temperature,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def lookup(key: str):
+    """
+    Get a cached generation if it exists and has not expired.
+
+    Args:
+        key: Key from get_cache_key()
+
+    Returns:
+        GenerationCacheEntry, or None on a miss
+    """
+    ttl = getattr(settings, 'GENERATION_CACHE_TTL', 7 * 24 * 3600)
+    now = timezone.now()
+    entry = GenerationCacheEntry.objects.filter(key=key, created_at__gte=now - timedelta(seconds=ttl)).first()
+    if entry is None:
+        _count('misses')
+        return None
+    # Touch for LRU eviction
+    GenerationCacheEntry.objects.filter(id=entry.id).update(hit_count=F('hit_count') + 1, last_used_at=now)
+    _count('hits')
+    return entry
+
+
+def store(key: str, content: str, title: str):
+    """
+    Store a completed generation, then evict expired and least recently used entries.
+
+    Args:
+        key: Key from get_cache_key()
+        content: Generated blog post content
+        title: Title extracted from the content
+    """
+    now = timezone.now()
+    try:
+        GenerationCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={'content': content, 'title': title[:500], 'last_used_at': now, 'created_at': now},
+        )
+    except IntegrityError:
+        # Stored concurrently by another worker with the same inputs
+        return
+    _count('stores')
+    evict()
+
+
+def lookup_stage(key: str):
+    """
+    Get a cached stage output if it exists and has not expired.
+
+    Args:
+        key: Key from get_stage_key()
+
+    Returns:
+        StageCacheEntry, or None on a miss
+    """
+    ttl = getattr(settings, 'GENERATION_CACHE_TTL', 7 * 24 * 3600)
+    now = timezone.now()
+    entry = StageCacheEntry.objects.filter(key=key, created_at__gte=now - timedelta(seconds=ttl)).first()
+    if entry is None:
+        _count('stage_misses')
+        return None
+    StageCacheEntry.objects.filter(id=entry.id).update(hit_count=F('hit_count') + 1, last_used_at=now)
+    _count('stage_hits')
+    return entry
+
+
+def store_stage(key: str, output: str, agent_role: str = '', task_summary: str = ''):
+    """
+    Store the output of a completed stage, then evict expired and least recently used entries.
+
+    Args:
+        key: Key from get_stage_key()
+        output: Raw output of the stage
+        agent_role: Role of the agent that produced it
+        task_summary: Short description of the task
+    """
+    now = timezone.now()
+    try:
+        StageCacheEntry.objects.update_or_create(
+            key=key,
+            defaults={'output': output, 'agent_role': agent_role[:200], 'task_summary': task_summary[:200],
+                      'last_used_at': now, 'created_at': now},
+        )
+    except IntegrityError:
+        return
+    _count('stage_stores')
+    evict()
+
+
+def _evict_model(model, ttl: int, max_entries: int) -> int:
+    deleted, _ = model.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=ttl)).delete()
+    overflow_ids = list(model.objects.order_by('-last_used_at').values_list('id', flat=True)[max_entries:])
+    if overflow_ids:
+        deleted += model.objects.filter(id__in=overflow_ids).delete()[0]
+    return deleted
+
+
+def evict() -> int:
+    """
+    Delete expired entries and keep at most GENERATION_CACHE_MAX_ENTRIES
+    generations and as many stage outputs.
+
+    Returns:
+        Number of entries deleted
+    """
+    ttl = getattr(settings, 'GENERATION_CACHE_TTL', 7 * 24 * 3600)
+    max_entries = getattr(settings, 'GENERATION_CACHE_MAX_ENTRIES', 500)
+    deleted = _evict_model(GenerationCacheEntry, ttl, max_entries)
+    deleted += _evict_model(StageCacheEntry, ttl, max_entries)
+    if deleted:
+        _count('evictions', deleted)
+    return deleted
+
+
+def clear() -> int:
+    """Delete every cached generation and stage output. Returns the number of entries deleted."""
+    return GenerationCacheEntry.objects.all().delete()[0] + StageCacheEntry.objects.all().delete()[0]
+
+
+def stats() -> dict:
+    """Get cache hit/miss counters for this process and the current cache size."""
+    with _counters_lock:
+        counters = dict(_counters)
+    lookups = counters['hits'] + counters['misses']
+    return {
+        'enabled': is_enabled(),
+        'entries': GenerationCacheEntry.objects.count(),
+        'stage_entries': StageCacheEntry.objects.count(),
+        'max_entries': getattr(settings, 'GENERATION_CACHE_MAX_ENTRIES', 500),
+        'ttl_seconds': getattr(settings, 'GENERATION_CACHE_TTL', 7 * 24 * 3600),
+        'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0,
+        **counters,
+    }
@@ -0,0 +1,165 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from django.core.management.base import BaseCommand
+from blog_app.db_writer import DatabaseWriter, apply_sqlite_pragmas, get_sqlite_pragmas
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare "database is locked" errors and write latency of the default SQLite setup '
+        'with SQLITE_CONCURRENCY_MODE, on a scratch database under a generation-like load'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent generation workers writing progress and results')
+        parser.add_argument('--writes', type=int, default=200, help='Writes per worker')
+        parser.add_argument('--readers', type=int, default=4,
+                            help='Threads continuously reading, like progress polls and list pages')
+        parser.add_argument('--posts', type=int, default=2000, help='Posts in the scratch database')
+        parser.add_argument('--timeout', type=float, default=5.0,
+                            help="Seconds a default connection waits for a lock (Django's SQLite default is 5)")
+
+    def handle(self, *args, **options):
+        results = []
+        for mode in ('default', 'wal', 'concurrency'):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self._create_database(path, options['posts'])
+                self.stdout.write(f'Running {mode} mode...')
+                results.append((mode, _Benchmark(path, mode, options).run()))
+
+        self.stdout.write('')
+        self.stdout.write(f"{'mode':<12} {'writes':>7} {'locked':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'reads/s':>8}")
+        for mode, result in results:
+            self.stdout.write(
+                f"{mode:<12} {result['writes']:>7} {result['locked']:>7} {result['p50']:>8.1f} "
+                f"{result['p99']:>8.1f} {result['max']:>8.1f} {result['reads_per_second']:>8.0f}"
+            )
+        pragmas = ', '.join(f'{name}={value}' for name, value in get_sqlite_pragmas().items())
+        self.stdout.write(f'\nwal: {pragmas}, IMMEDIATE transactions')
+        self.stdout.write('concurrency: wal plus the single writer thread (SQLITE_CONCURRENCY_MODE)')
+
+    @staticmethod
+    def _create_database(path: str, posts: int):
+        connection = sqlite3.connect(path)
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, status TEXT, content TEXT, '
+            'progress_message TEXT, progress_percentage INTEGER, created_at REAL)'
+        )
+        connection.execute('CREATE INDEX post_status_created ON post (status, created_at)')
+        connection.executemany(
+            'INSERT INTO post (status, content, progress_message, progress_percentage, created_at) '
+            'VALUES (?, ?, ?, 0, ?)',
+            (('completed', 'word ' * 800, '', index) for index in range(posts)),
+        )
+        connection.commit()
+        connection.close()
+
+
+class _Benchmark:
+    """One run: generation workers writing progress and results while readers poll."""
+
+    def __init__(self, path: str, mode: str, options: dict):
+        self.path = path
+        # 'wal': PRAGMAs and IMMEDIATE transactions only; 'concurrency': also the single writer thread
+        self.tuned = mode != 'default'
+        self.options = options
+        self.latencies = []
+        self.locked = 0
+        self.reads = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._writer = DatabaseWriter() if mode == 'concurrency' else None
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            timeout = get_sqlite_pragmas()['busy_timeout'] / 1000 if self.tuned else self.options['timeout']
+            connection = sqlite3.connect(self.path, timeout=timeout, isolation_level=None, check_same_thread=False)
+            if self.tuned:
+                apply_sqlite_pragmas(connection)
+            self._local.connection = connection
+        return connection
+
+    def _write(self, post_id: int, step: int):
+        connection = self._connection()
+        if step % 10 == 9:
+            # Result: read the post and save it with its content, in one transaction
+            connection.execute('BEGIN IMMEDIATE' if self.tuned else 'BEGIN')
+            try:
+                connection.execute('SELECT status FROM post WHERE id = ?', (post_id,)).fetchone()
+                connection.execute(
+                    "UPDATE post SET status = 'completed', content = ?, progress_percentage = 100 WHERE id = ?",
+                    ('word ' * 1500, post_id),
+                )
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        else:
+            # Progress: read the row, then save the new progress
+            connection.execute('SELECT id FROM post WHERE id = ?', (post_id,)).fetchone()
+            connection.execute(
+                "UPDATE post SET status = 'processing', progress_message = ?, progress_percentage = ? WHERE id = ?",
+                (f'step {step}', step % 100, post_id),
+            )
+
+    def _worker(self, index: int):
+        post_id = index + 1
+        for step in range(self.options['writes']):
+            started = time.perf_counter()
+            try:
+                if self._writer is not None:
+                    self._writer.submit(self._write, post_id, step).result()
+                else:
+                    self._write(post_id, step)
+            except sqlite3.OperationalError as e:
+                if 'locked' not in str(e) and 'busy' not in str(e):
+                    raise
+                with self._lock:
+                    self.locked += 1
+                continue
+            with self._lock:
+                self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def _reader(self):
+        connection = self._connection()
+        while not self._stop.is_set():
+            try:
+                connection.execute(
+                    "SELECT id, status, progress_message, substr(content, 1, 500) FROM post "
+                    "WHERE status = 'completed' ORDER BY created_at DESC LIMIT 24"
+                ).fetchall()
+                connection.execute('SELECT status, COUNT(*) FROM post GROUP BY status').fetchall()
+            except sqlite3.OperationalError:
+                continue
+            with self._lock:
+                self.reads += 1
+
+    def run(self) -> dict:
+        readers = [threading.Thread(target=self._reader, daemon=True) for _ in range(self.options['readers'])]
+        workers = [threading.Thread(target=self._worker, args=(index,)) for index in range(self.options['workers'])]
+        started = time.perf_counter()
+        for thread in readers + workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        self._stop.set()
+        for thread in readers:
+            thread.join()
+
+        latencies = sorted(self.latencies) or [0.0]
+        return {
+            'writes': len(self.latencies),
+            'locked': self.locked,
+            'p50': latencies[len(latencies) // 2],
+            'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            'max': latencies[-1],
+            'reads_per_second': self.reads / elapsed if elapsed else 0,
+        }
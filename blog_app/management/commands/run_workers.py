@@ -0,0 +1,51 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from blog_app.workers import GenerationWorkerPool
+
+
+class Command(BaseCommand):
+    help = 'Run blog post generation workers outside the web process'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'GENERATION_MAX_WORKERS', 2),
+            help='Number of blog posts to generate concurrently',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds between checks for newly queued jobs',
+        )
+
+    def handle(self, *args, **options):
+        pool = GenerationWorkerPool(
+            max_workers=options['workers'],
+            max_queue_size=getattr(settings, 'GENERATION_QUEUE_SIZE', 50),
+            lease_seconds=getattr(settings, 'GENERATION_LEASE_SECONDS', 60),
+            max_attempts=getattr(settings, 'GENERATION_MAX_ATTEMPTS', 2),
+            poll_interval=options['poll_interval'],
+        )
+        stop_requested = threading.Event()
+
+        def request_stop(signum, frame):
+            stop_requested.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        pool.start()
+        self.stdout.write(self.style.SUCCESS(
+            f'Started {pool.max_workers} generation worker(s) ({pool.pool_id}). Press Ctrl+C to stop.'
+        ))
+
+        while not stop_requested.wait(timeout=1):
+            pass
+
+        self.stdout.write('Stopping: waiting for running generations to finish...')
+        pool.shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS('Generation workers stopped'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0006_generationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='task_timings',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
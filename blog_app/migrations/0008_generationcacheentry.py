@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:35
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0007_blogpost_task_timings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenerationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('content', models.TextField()),
+                ('title', models.CharField(blank=True, max_length=500)),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Generation Cache Entry',
+                'verbose_name_plural': 'Generation Cache Entries',
+                'ordering': ['-last_used_at'],
+            },
+        ),
+    ]
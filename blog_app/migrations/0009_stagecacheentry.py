@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0008_generationcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StageCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('agent_role', models.CharField(blank=True, max_length=200)),
+                ('task_summary', models.CharField(blank=True, max_length=200)),
+                ('output', models.TextField()),
+                ('hit_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Stage Cache Entry',
+                'verbose_name_plural': 'Stage Cache Entries',
+                'ordering': ['-last_used_at'],
+            },
+        ),
+    ]
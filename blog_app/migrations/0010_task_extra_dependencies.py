@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0009_stagecacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='extra_dependencies',
+            field=models.ManyToManyField(blank=True, related_name='extra_dependent_tasks', to='blog_app.task'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:52
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0010_task_extra_dependencies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OllamaBackend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+                ('base_url', models.URLField(unique=True)),
+                ('weight', models.PositiveIntegerField(default=1, help_text='Relative share of requests; a server with weight 2 takes twice the load of one with weight 1', validators=[django.core.validators.MinValueValidator(1)])),
+                ('is_enabled', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0011_ollamabackend'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ollamasettings',
+            name='keep_alive',
+            field=models.CharField(default='30m', help_text="How long Ollama keeps the model loaded after use, e.g. '30m', '2h' or '-1' for forever", max_length=20),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:04
+
+from django.db import migrations, models
+
+
+def backfill_word_count(apps, schema_editor):
+    BlogPost = apps.get_model('blog_app', 'BlogPost')
+    batch = []
+    for post in BlogPost.objects.only('id', 'content').iterator(chunk_size=500):
+        post.word_count = len(post.content.split()) if post.content else 0
+        batch.append(post)
+        if len(batch) >= 500:
+            BlogPost.objects.bulk_update(batch, ['word_count'])
+            batch = []
+    if batch:
+        BlogPost.objects.bulk_update(batch, ['word_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0012_ollamasettings_keep_alive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_word_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:06
+
+from django.db import migrations, models
+
+
+def backfill_reading_time(apps, schema_editor):
+    BlogPost = apps.get_model('blog_app', 'BlogPost')
+    batch = []
+    for post in BlogPost.objects.only('id', 'word_count').iterator(chunk_size=500):
+        post.reading_time = max(1, round(post.word_count / 200))
+        batch.append(post)
+        if len(batch) >= 500:
+            BlogPost.objects.bulk_update(batch, ['reading_time'])
+            batch = []
+    if batch:
+        BlogPost.objects.bulk_update(batch, ['reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0013_blogpost_word_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveIntegerField(db_index=True, default=1, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_reading_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+from django.db import migrations
+
+# SQLite: an FTS5 index over the post table ("external content"), kept in step by triggers
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE blog_app_blogpost_fts USING fts5(
+        topic, title, content,
+        content='blog_app_blogpost', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_insert AFTER INSERT ON blog_app_blogpost BEGIN
+        INSERT INTO blog_app_blogpost_fts(rowid, topic, title, content)
+        VALUES (new.id, new.topic, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_delete AFTER DELETE ON blog_app_blogpost BEGIN
+        INSERT INTO blog_app_blogpost_fts(blog_app_blogpost_fts, rowid, topic, title, content)
+        VALUES ('delete', old.id, old.topic, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_update AFTER UPDATE OF topic, title, content ON blog_app_blogpost
+    WHEN old.topic IS NOT new.topic OR old.title IS NOT new.title OR old.content IS NOT new.content BEGIN
+        INSERT INTO blog_app_blogpost_fts(blog_app_blogpost_fts, rowid, topic, title, content)
+        VALUES ('delete', old.id, old.topic, old.title, old.content);
+        INSERT INTO blog_app_blogpost_fts(rowid, topic, title, content)
+        VALUES (new.id, new.topic, new.title, new.content);
+    END
+    """,
+    "INSERT INTO blog_app_blogpost_fts(blog_app_blogpost_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_update',
+    'DROP TABLE IF EXISTS blog_app_blogpost_fts',
+]
+
+# PostgreSQL: a generated tsvector column with a GIN index; topic and title weigh more than content
+POSTGRES_CREATE = [
+    """
+    ALTER TABLE blog_app_blogpost ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(topic, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX blog_app_blogpost_search_vector ON blog_app_blogpost USING GIN (search_vector)',
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS blog_app_blogpost_search_vector',
+    'ALTER TABLE blog_app_blogpost DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _has_fts5(schema_editor) -> bool:
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.blog_app_fts5_probe USING fts5(text)')
+        except Exception:
+            return False
+        cursor.execute('DROP TABLE temp.blog_app_fts5_probe')
+        return True
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        if not _has_fts5(schema_editor):
+            print('SQLite was built without FTS5; post search falls back to substring matching')
+            return
+        statements = SQLITE_CREATE
+    elif vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0014_blogpost_reading_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0015_blogpost_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', 'created_at'], name='blogpost_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['is_saved', 'created_at'], name='blogpost_saved_created'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['tone', 'created_at'], name='blogpost_tone_created'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['created_at'], name='blogpost_created'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['updated_at'], name='blogpost_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', 'tone', 'is_saved', 'word_count', 'created_at'], name='blogpost_stats'),
+        ),
+    ]
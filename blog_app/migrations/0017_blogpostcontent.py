@@ -0,0 +1,194 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:25
+
+import importlib
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The search index of 0015 reads content from the post table, so it is dropped before the column moves
+search_index_0015 = importlib.import_module('blog_app.migrations.0015_blogpost_search_index')
+
+# SQLite: an FTS5 table holding its own copy of topic, title and content, kept in
+# step by triggers on both tables. Each trigger only touches the FTS table: SQLite
+# refuses to rebuild a table (as Django does to alter one) while a view or trigger
+# refers to another table. A rebuild drops the table's own triggers, so a migration
+# that rebuilds blog_app_blogpost or blog_app_blogpostcontent has to recreate them.
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE blog_app_blogpost_fts USING fts5(
+        topic, title, content,
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_insert AFTER INSERT ON blog_app_blogpost BEGIN
+        INSERT INTO blog_app_blogpost_fts(rowid, topic, title, content)
+        VALUES (new.id, new.topic, new.title, '');
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_delete AFTER DELETE ON blog_app_blogpost BEGIN
+        DELETE FROM blog_app_blogpost_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_update AFTER UPDATE OF topic, title ON blog_app_blogpost
+    WHEN old.topic IS NOT new.topic OR old.title IS NOT new.title BEGIN
+        UPDATE blog_app_blogpost_fts SET topic = new.topic, title = new.title WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_insert AFTER INSERT ON blog_app_blogpostcontent BEGIN
+        UPDATE blog_app_blogpost_fts SET content = new.content WHERE rowid = new.blog_post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_delete AFTER DELETE ON blog_app_blogpostcontent BEGIN
+        UPDATE blog_app_blogpost_fts SET content = '' WHERE rowid = old.blog_post_id;
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_update AFTER UPDATE OF content ON blog_app_blogpostcontent
+    WHEN old.content IS NOT new.content BEGIN
+        UPDATE blog_app_blogpost_fts SET content = new.content WHERE rowid = new.blog_post_id;
+    END
+    """,
+    """
+    INSERT INTO blog_app_blogpost_fts(rowid, topic, title, content)
+    SELECT p.id, p.topic, p.title, coalesce(c.content, '')
+    FROM blog_app_blogpost p LEFT JOIN blog_app_blogpostcontent c ON c.blog_post_id = p.id
+    """,
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_update',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_update',
+    'DROP TABLE IF EXISTS blog_app_blogpost_fts',
+]
+
+# PostgreSQL: a weighted tsvector column with a GIN index on the content table. A
+# generated column can't read the post's topic and title, so triggers maintain it.
+POSTGRES_CREATE = [
+    'ALTER TABLE blog_app_blogpostcontent ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION blog_app_blogpostcontent_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        SELECT setweight(to_tsvector('english', coalesce(p.topic, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B')
+        INTO NEW.search_vector
+        FROM blog_app_blogpost p WHERE p.id = NEW.blog_post_id;
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_search_vector
+    BEFORE INSERT OR UPDATE OF content ON blog_app_blogpostcontent
+    FOR EACH ROW EXECUTE FUNCTION blog_app_blogpostcontent_search_vector()
+    """,
+    """
+    CREATE FUNCTION blog_app_blogpost_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE blog_app_blogpostcontent SET content = content WHERE blog_post_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_search_vector
+    AFTER UPDATE OF topic, title ON blog_app_blogpost
+    FOR EACH ROW WHEN (OLD.topic IS DISTINCT FROM NEW.topic OR OLD.title IS DISTINCT FROM NEW.title)
+    EXECUTE FUNCTION blog_app_blogpost_search_vector()
+    """,
+    'UPDATE blog_app_blogpostcontent SET content = content',
+    'CREATE INDEX blog_app_blogpostcontent_search_vector ON blog_app_blogpostcontent USING GIN (search_vector)',
+]
+
+POSTGRES_DROP = [
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_search_vector ON blog_app_blogpost',
+    'DROP FUNCTION IF EXISTS blog_app_blogpost_search_vector()',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_search_vector ON blog_app_blogpostcontent',
+    'DROP FUNCTION IF EXISTS blog_app_blogpostcontent_search_vector()',
+    'DROP INDEX IF EXISTS blog_app_blogpostcontent_search_vector',
+    'ALTER TABLE blog_app_blogpostcontent DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def move_to_content_table(apps, schema_editor):
+    schema_editor.execute(
+        'INSERT INTO blog_app_blogpostcontent (blog_post_id, key_points, examples, content) '
+        'SELECT id, key_points, examples, content FROM blog_app_blogpost'
+    )
+
+
+def move_to_post_table(apps, schema_editor):
+    for column in ('key_points', 'examples', 'content'):
+        schema_editor.execute(
+            f'UPDATE blog_app_blogpost SET {column} = coalesce(('
+            f'SELECT c.{column} FROM blog_app_blogpostcontent c WHERE c.blog_post_id = blog_app_blogpost.id'
+            f"), '')"
+        )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        if not search_index_0015._has_fts5(schema_editor):
+            print('SQLite was built without FTS5; post search falls back to substring matching')
+            return
+        statements = SQLITE_CREATE
+    elif vendor == 'postgresql':
+        statements = POSTGRES_CREATE
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0016_blogpost_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(search_index_0015.drop_search_index, search_index_0015.create_search_index),
+        migrations.CreateModel(
+            name='BlogPostContent',
+            fields=[
+                ('blog_post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='body', serialize=False, to='blog_app.blogpost')),
+                ('key_points', models.TextField(blank=True, max_length=1000)),
+                ('examples', models.TextField(blank=True, max_length=1000)),
+                ('content', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Blog Post Content',
+                'verbose_name_plural': 'Blog Post Contents',
+            },
+        ),
+        migrations.RunPython(move_to_content_table, move_to_post_table),
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='content',
+        ),
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='examples',
+        ),
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='key_points',
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,190 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:32
+
+import importlib
+import blog_app.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+search_index_0017 = importlib.import_module('blog_app.migrations.0017_blogpostcontent')
+
+PREVIEW_CHARS = 500
+BATCH_SIZE = 500
+
+# Content becomes compressed, so database triggers can no longer index it. The
+# application indexes it instead (search.index_content()); the triggers on the
+# post table keep indexing topic and title.
+SQLITE_CONTENT_TRIGGERS = [
+    'blog_app_blogpostcontent_fts_insert',
+    'blog_app_blogpostcontent_fts_delete',
+    'blog_app_blogpostcontent_fts_update',
+]
+
+# PostgreSQL: the application sets content_vector; the trigger combines it with the
+# post's topic and title into search_vector
+POSTGRES_CREATE = [
+    'ALTER TABLE blog_app_blogpostcontent ADD COLUMN content_vector tsvector',
+    "UPDATE blog_app_blogpostcontent SET content_vector = to_tsvector('english', coalesce(content, ''))",
+    'DROP TRIGGER blog_app_blogpostcontent_search_vector ON blog_app_blogpostcontent',
+    """
+    CREATE OR REPLACE FUNCTION blog_app_blogpostcontent_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        SELECT setweight(to_tsvector('english', coalesce(p.topic, '')), 'A') ||
+               setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+               setweight(coalesce(NEW.content_vector, ''::tsvector), 'B')
+        INTO NEW.search_vector
+        FROM blog_app_blogpost p WHERE p.id = NEW.blog_post_id;
+        RETURN NEW;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_search_vector
+    BEFORE INSERT OR UPDATE OF content_vector ON blog_app_blogpostcontent
+    FOR EACH ROW EXECUTE FUNCTION blog_app_blogpostcontent_search_vector()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION blog_app_blogpost_search_vector() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE blog_app_blogpostcontent SET content_vector = content_vector WHERE blog_post_id = NEW.id;
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+
+def _fts_table_exists(schema_editor) -> bool:
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'blog_app_blogpost_fts'")
+        return cursor.fetchone() is not None
+
+
+def index_content_in_application(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for trigger in SQLITE_CONTENT_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    elif vendor == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            schema_editor.execute(statement)
+
+
+def index_content_in_database(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        if not _fts_table_exists(schema_editor):
+            return
+        for statement in search_index_0017.SQLITE_CREATE:
+            if any(trigger in statement for trigger in SQLITE_CONTENT_TRIGGERS):
+                schema_editor.execute(statement)
+        schema_editor.execute(
+            "UPDATE blog_app_blogpost_fts SET content = coalesce(("
+            "SELECT c.content FROM blog_app_blogpostcontent c WHERE c.blog_post_id = blog_app_blogpost_fts.rowid"
+            "), '')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER blog_app_blogpostcontent_search_vector ON blog_app_blogpostcontent')
+        # The functions and triggers of 0017, which read content
+        for statement in search_index_0017.POSTGRES_CREATE[1:5]:
+            schema_editor.execute(statement.replace('CREATE FUNCTION', 'CREATE OR REPLACE FUNCTION'))
+        schema_editor.execute('ALTER TABLE blog_app_blogpostcontent DROP COLUMN content_vector')
+        schema_editor.execute('UPDATE blog_app_blogpostcontent SET content = content')
+
+
+def compress_content(apps, schema_editor):
+    BlogPostContent = apps.get_model('blog_app', 'BlogPostContent')
+    batch = []
+    for body in BlogPostContent.objects.only('blog_post_id', 'content').iterator(chunk_size=BATCH_SIZE):
+        body.compressed_content = body.content
+        body.preview = body.content[:PREVIEW_CHARS]
+        batch.append(body)
+        if len(batch) >= BATCH_SIZE:
+            BlogPostContent.objects.bulk_update(batch, ['compressed_content', 'preview'])
+            batch = []
+    if batch:
+        BlogPostContent.objects.bulk_update(batch, ['compressed_content', 'preview'])
+
+
+def decompress_content(apps, schema_editor):
+    BlogPostContent = apps.get_model('blog_app', 'BlogPostContent')
+    batch = []
+    for body in BlogPostContent.objects.only('blog_post_id', 'compressed_content').iterator(chunk_size=BATCH_SIZE):
+        body.content = body.compressed_content
+        batch.append(body)
+        if len(batch) >= BATCH_SIZE:
+            BlogPostContent.objects.bulk_update(batch, ['content'])
+            batch = []
+    if batch:
+        BlogPostContent.objects.bulk_update(batch, ['content'])
+
+
+def record_initial_revisions(apps, schema_editor):
+    # Start the history of every generated post with its current content
+    BlogPostContent = apps.get_model('blog_app', 'BlogPostContent')
+    BlogPostRevision = apps.get_model('blog_app', 'BlogPostRevision')
+    rows = BlogPostContent.objects.filter(blog_post__status='completed').values_list(
+        'blog_post_id', 'content', 'blog_post__title', 'blog_post__word_count'
+    )
+    batch = []
+    for post_id, content, title, word_count in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(BlogPostRevision(
+            blog_post_id=post_id, number=1, source='generated', title=title,
+            word_count=word_count, is_snapshot=True, data=content,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            BlogPostRevision.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        BlogPostRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0017_blogpostcontent'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_content_in_application, index_content_in_database),
+        migrations.AddField(
+            model_name='blogpostcontent',
+            name='preview',
+            field=models.CharField(blank=True, editable=False, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='blogpostcontent',
+            name='compressed_content',
+            field=blog_app.fields.CompressedTextField(blank=True),
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+        migrations.RemoveField(
+            model_name='blogpostcontent',
+            name='content',
+        ),
+        migrations.RenameField(
+            model_name='blogpostcontent',
+            old_name='compressed_content',
+            new_name='content',
+        ),
+        migrations.CreateModel(
+            name='BlogPostRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('source', models.CharField(choices=[('generated', 'Generated'), ('edited', 'Edited')], max_length=20)),
+                ('title', models.CharField(blank=True, max_length=500)),
+                ('word_count', models.PositiveIntegerField(default=0)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', blog_app.fields.CompressedTextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blog_post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='blog_app.blogpost')),
+            ],
+            options={
+                'verbose_name': 'Blog Post Revision',
+                'verbose_name_plural': 'Blog Post Revisions',
+                'ordering': ['blog_post', 'number'],
+                'constraints': [models.UniqueConstraint(fields=('blog_post', 'number'), name='blogpostrevision_unique_number')],
+            },
+        ),
+        migrations.RunPython(record_initial_revisions, migrations.RunPython.noop),
+    ]
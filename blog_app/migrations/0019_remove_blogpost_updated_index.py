@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0018_compressed_content_revisions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blogpost',
+            name='blogpost_updated',
+        ),
+    ]
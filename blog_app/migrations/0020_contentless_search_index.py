@@ -0,0 +1,131 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:51
+
+import importlib
+from django.db import migrations
+from blog_app.search import register_sqlite_functions
+
+search_index_0017 = importlib.import_module('blog_app.migrations.0017_blogpostcontent')
+search_index_0018 = importlib.import_module('blog_app.migrations.0018_compressed_content_revisions')
+
+# SQLite: contentless FTS5 tables (content=''), so the index holds no copy of the
+# text. Rows of a contentless table can only be removed with the 'delete' command
+# and the exact values they were indexed with, which the triggers have at hand;
+# content is indexed by triggers on its own table, through blog_app_decompress()
+# (search.register_sqlite_functions()). Topic and title are a separate table, as
+# each trigger may only touch the FTS tables (see 0017).
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE blog_app_blogpost_fts USING fts5(
+        topic, title, content='',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE blog_app_blogpostcontent_fts USING fts5(
+        content, content='',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_insert AFTER INSERT ON blog_app_blogpost BEGIN
+        INSERT INTO blog_app_blogpost_fts(rowid, topic, title) VALUES (new.id, new.topic, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_delete AFTER DELETE ON blog_app_blogpost BEGIN
+        INSERT INTO blog_app_blogpost_fts(blog_app_blogpost_fts, rowid, topic, title)
+        VALUES ('delete', old.id, old.topic, old.title);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpost_fts_update AFTER UPDATE OF topic, title ON blog_app_blogpost
+    WHEN old.topic IS NOT new.topic OR old.title IS NOT new.title BEGIN
+        INSERT INTO blog_app_blogpost_fts(blog_app_blogpost_fts, rowid, topic, title)
+        VALUES ('delete', old.id, old.topic, old.title);
+        INSERT INTO blog_app_blogpost_fts(rowid, topic, title) VALUES (new.id, new.topic, new.title);
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_insert AFTER INSERT ON blog_app_blogpostcontent BEGIN
+        INSERT INTO blog_app_blogpostcontent_fts(rowid, content)
+        VALUES (new.blog_post_id, blog_app_decompress(new.content));
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_delete AFTER DELETE ON blog_app_blogpostcontent BEGIN
+        INSERT INTO blog_app_blogpostcontent_fts(blog_app_blogpostcontent_fts, rowid, content)
+        VALUES ('delete', old.blog_post_id, blog_app_decompress(old.content));
+    END
+    """,
+    """
+    CREATE TRIGGER blog_app_blogpostcontent_fts_update AFTER UPDATE OF content ON blog_app_blogpostcontent
+    WHEN old.content IS NOT new.content BEGIN
+        INSERT INTO blog_app_blogpostcontent_fts(blog_app_blogpostcontent_fts, rowid, content)
+        VALUES ('delete', old.blog_post_id, blog_app_decompress(old.content));
+        INSERT INTO blog_app_blogpostcontent_fts(rowid, content)
+        VALUES (new.blog_post_id, blog_app_decompress(new.content));
+    END
+    """,
+    'INSERT INTO blog_app_blogpost_fts(rowid, topic, title) SELECT id, topic, title FROM blog_app_blogpost',
+    """
+    INSERT INTO blog_app_blogpostcontent_fts(rowid, content)
+    SELECT blog_post_id, blog_app_decompress(content) FROM blog_app_blogpostcontent
+    """,
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_app_blogpost_fts_update',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_insert',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_app_blogpostcontent_fts_update',
+    'DROP TABLE IF EXISTS blog_app_blogpost_fts',
+    'DROP TABLE IF EXISTS blog_app_blogpostcontent_fts',
+]
+
+
+def _fts_table_exists(schema_editor) -> bool:
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'blog_app_blogpost_fts'")
+        return cursor.fetchone() is not None
+
+
+def _register_functions(schema_editor):
+    # The connection may predate the app's connection_created handler
+    schema_editor.connection.ensure_connection()
+    register_sqlite_functions(connection=schema_editor.connection)
+
+
+def create_contentless_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite' or not _fts_table_exists(schema_editor):
+        return
+    _register_functions(schema_editor)
+    for statement in SQLITE_DROP + SQLITE_CREATE:
+        schema_editor.execute(statement)
+
+
+def create_content_index(apps, schema_editor):
+    # Back to the index of 0018: one FTS5 table holding topic, title and content
+    if schema_editor.connection.vendor != 'sqlite' or not _fts_table_exists(schema_editor):
+        return
+    _register_functions(schema_editor)
+    for statement in SQLITE_DROP:
+        schema_editor.execute(statement)
+    for statement in search_index_0017.SQLITE_CREATE:
+        if any(trigger in statement for trigger in search_index_0018.SQLITE_CONTENT_TRIGGERS):
+            continue
+        if statement.lstrip().startswith('INSERT'):
+            statement = statement.replace('c.content', 'blog_app_decompress(c.content)')
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0019_remove_blogpost_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_contentless_index, create_content_index),
+    ]
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import threading
+from django.conf import settings
+from django.utils import timezone
+from .ollama_client import ollama_get, aollama_get
+
+
+# Read timeouts: a request waiting for the first list gives up quickly, background refreshes may take longer
+FETCH_TIMEOUT = 5
+REFRESH_TIMEOUT = 10
+
+
+class CatalogEntry:
+    """Model list of one Ollama server as of its last successful fetch."""
+
+    def __init__(self, models: list):
+        self.models = models
+        self.fetched_at = timezone.now()
+        self.etag = '"%s"' % hashlib.sha256(
+            json.dumps(models, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:32]
+        self.error = ''  # Error of the last failed refresh, while the old list is served
+
+
+_entries = {}  # base_url -> CatalogEntry
+_refreshing = set()  # base URLs with a background refresh running
+_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return getattr(settings, 'OLLAMA_MODEL_CATALOG_TTL', 300)
+
+
+def _describe_model(model: dict) -> dict:
+    details = model.get('details') or {}
+    return {
+        'name': model.get('name', ''),
+        'size': model.get('size', 0),
+        'modified_at': model.get('modified_at', ''),
+        'digest': model.get('digest', ''),
+        'family': details.get('family', ''),
+        'families': details.get('families') or [],
+        'parameter_size': details.get('parameter_size', ''),
+        'quantization_level': details.get('quantization_level', ''),
+    }
+
+
+def fetch_models(base_url: str, timeout: float) -> CatalogEntry:
+    """
+    Fetch the model list from an Ollama server and cache it.
+
+    Args:
+        base_url: Ollama server URL
+        timeout: Read timeout in seconds
+
+    Returns:
+        The new CatalogEntry
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached or returns an error
+    """
+    response = ollama_get(base_url, '/api/tags', timeout=timeout)
+    response.raise_for_status()
+    return _store(base_url, response.json())
+
+
+async def afetch_models(base_url: str, timeout: float) -> CatalogEntry:
+    """
+    Async version of fetch_models().
+
+    Raises:
+        httpx.HTTPError: If the server cannot be reached or returns an error
+    """
+    response = await aollama_get(base_url, '/api/tags', timeout=timeout)
+    response.raise_for_status()
+    return _store(base_url, response.json())
+
+
+def _store(base_url: str, data: dict) -> CatalogEntry:
+    entry = CatalogEntry([_describe_model(model) for model in data.get('models', [])])
+    with _lock:
+        _entries[base_url] = entry
+    return entry
+
+
+def _refresh(base_url: str):
+    try:
+        fetch_models(base_url, timeout=REFRESH_TIMEOUT)
+    except Exception as e:
+        print(f"Error refreshing Ollama models from {base_url}: {e}")
+        with _lock:
+            if base_url in _entries:
+                _entries[base_url].error = str(e)
+    finally:
+        with _lock:
+            _refreshing.discard(base_url)
+
+
+def get_models(base_url: str, refresh: bool = False):
+    """
+    Get the model list of an Ollama server, serving stale data while it is refreshed.
+
+    A list younger than OLLAMA_MODEL_CATALOG_TTL seconds is returned as is. An
+    older one is still returned immediately while a background thread fetches
+    a new one, so a slow or unreachable server does not hold up the caller.
+    Only the very first request for a server (or refresh=True) waits for Ollama,
+    with a short timeout.
+
+    Args:
+        base_url: Ollama server URL
+        refresh: Fetch the list now instead of using the cache
+
+    Returns:
+        Tuple of (CatalogEntry, stale) where stale is True if a refresh is pending or failed
+
+    Raises:
+        requests.exceptions.RequestException: If nothing is cached and the server cannot be reached
+    """
+    with _lock:
+        entry = _entries.get(base_url)
+    if entry is None or refresh:
+        return fetch_models(base_url, timeout=FETCH_TIMEOUT), False
+    return entry, _revalidate(base_url, entry)
+
+
+async def aget_models(base_url: str, refresh: bool = False):
+    """
+    Async version of get_models().
+
+    Raises:
+        httpx.HTTPError: If nothing is cached and the server cannot be reached
+    """
+    with _lock:
+        entry = _entries.get(base_url)
+    if entry is None or refresh:
+        return await afetch_models(base_url, timeout=FETCH_TIMEOUT), False
+    return entry, _revalidate(base_url, entry)
+
+
+def _revalidate(base_url: str, entry: CatalogEntry) -> bool:
+    """Start a background refresh if the entry is older than the TTL; returns whether it is stale."""
+    if (timezone.now() - entry.fetched_at).total_seconds() < _ttl():
+        return False
+
+    with _lock:
+        start = base_url not in _refreshing
+        _refreshing.add(base_url)
+    if start:
+        threading.Thread(
+            target=_refresh, args=(base_url,), name='ollama-model-catalog', daemon=True
+        ).start()
+    return True
+
+
+def clear():
+    """Drop every cached model list."""
+    with _lock:
+        _entries.clear()
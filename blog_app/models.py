@@ -1,6 +1,49 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from .fields import CompressedTextField
+from .search import index_content
+
+# Characters of content stored uncompressed for card previews (about 20 words are shown)
+PREVIEW_CHARS = 500
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words, as shown on posts and summed on the dashboard."""
+    return len(text.split()) if text else 0
+
+
+def reading_time_for(word_count: int) -> int:
+    """Minutes needed to read a post, at 200 words per minute."""
+    return max(1, round(word_count / 200))
+
+
+def update_content(posts, content: str, **fields) -> int:
+    """
+    Set new content on posts, for writes that bypass save() such as QuerySet.update().
+
+    The content and its preview go to their BlogPostContent rows and the
+    search index; the word count, reading time and any other given fields to
+    the posts, in one transaction.
+
+    Args:
+        posts: BlogPost queryset selecting the posts to update
+        content: New content
+        **fields: Further BlogPost field values
+
+    Returns:
+        Number of posts updated
+    """
+    word_count = count_words(content)
+    with transaction.atomic(using=posts.db):
+        post_ids = list(posts.values_list('id', flat=True))
+        BlogPostContent.objects.using(posts.db).filter(blog_post_id__in=post_ids).update(
+            content=content, preview=content[:PREVIEW_CHARS]
+        )
+        index_content(post_ids, content, using=posts.db)
+        return posts.filter(id__in=post_ids).update(
+            word_count=word_count, reading_time=reading_time_for(word_count), **fields
+        )
 
 
 class Agent(models.Model):
@@ -30,6 +73,8 @@ class Task(models.Model):
     agent = models.ForeignKey(Agent, on_delete=models.CASCADE, related_name='tasks')
     expected_output = models.TextField()
     depends_on = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='dependent_tasks')
+    # Further tasks whose output this task needs, in addition to depends_on
+    extra_dependencies = models.ManyToManyField('self', symmetrical=False, blank=True, related_name='extra_dependent_tasks')
     order = models.IntegerField(default=0, validators=[MinValueValidator(0)])
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -42,6 +87,12 @@ class Task(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.agent.name})"
+    
+    def dependency_ids(self) -> list:
+        """IDs of every task this task depends on: depends_on first, then extra_dependencies."""
+        ids = [self.depends_on_id] if self.depends_on_id else []
+        ids += [task_id for task_id in self.extra_dependencies.values_list('id', flat=True) if task_id not in ids]
+        return ids
 
 
 class CrewConfig(models.Model):
@@ -80,6 +131,7 @@ class OllamaSettings(models.Model):
     base_url = models.URLField(default='http://localhost:11434')
     model = models.CharField(max_length=100, default='llama3')
     temperature = models.FloatField(default=0.7, validators=[MinValueValidator(0.0), MaxValueValidator(2.0)])
+    keep_alive = models.CharField(max_length=20, default='30m', help_text="How long Ollama keeps the model loaded after use, e.g. '30m', '2h' or '-1' for forever")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -99,6 +151,22 @@ class OllamaSettings(models.Model):
         super().save(*args, **kwargs)
 
 
+class OllamaBackend(models.Model):
+    """Additional Ollama server that generation requests are balanced across"""
+    name = models.CharField(max_length=200, unique=True)
+    base_url = models.URLField(unique=True)
+    weight = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)], help_text="Relative share of requests; a server with weight 2 takes twice the load of one with weight 1")
+    is_enabled = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.base_url})"
+
+
 class BlogPost(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -119,10 +187,11 @@ class BlogPost(models.Model):
     topic = models.CharField(max_length=500)
     subtitle = models.CharField(max_length=500, blank=True, default='')
     target_audience = models.JSONField(default=list, blank=True)  # List of tags
-    key_points = models.TextField(blank=True, max_length=1000)
-    examples = models.TextField(blank=True, max_length=1000)
     tone = models.CharField(max_length=20, choices=TONE_CHOICES, default='friendly')
-    content = models.TextField(blank=True)
+    # content, key_points and examples live in BlogPostContent (see BODY_FIELDS)
+    # Stored so totals and sorting don't have to load and split every post's content
+    word_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+    reading_time = models.PositiveIntegerField(default=1, editable=False, db_index=True)  # Minutes
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     is_saved = models.BooleanField(default=False)
     title = models.CharField(max_length=500, blank=True)
@@ -131,23 +200,232 @@ class BlogPost(models.Model):
     current_task = models.CharField(max_length=200, blank=True, default='')
     progress_message = models.TextField(blank=True, default='')
     progress_percentage = models.IntegerField(default=0)
+    # Per-task timings recorded from CrewAI callbacks: [{task, agent, started_at, finished_at, duration_seconds}]
+    task_timings = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Filtered lists sorted by date: dashboard feeds, history and /api/posts/ filters
+            models.Index(fields=['status', 'created_at'], name='blogpost_status_created'),
+            models.Index(fields=['is_saved', 'created_at'], name='blogpost_saved_created'),
+            models.Index(fields=['tone', 'created_at'], name='blogpost_tone_created'),
+            # Unfiltered lists by creation date. Not updated_at: progress flushes and content
+            # saves rewrite it, and an index would have to be updated with every one of them
+            models.Index(fields=['created_at'], name='blogpost_created'),
+            # Covers the dashboard and history statistics, so they read this index instead of the posts
+            models.Index(fields=['status', 'tone', 'is_saved', 'word_count', 'created_at'], name='blogpost_stats'),
+        ]
     
     def __str__(self):
         return f"{self.topic} - {self.status}"
     
+    def _get_body(self) -> 'BlogPostContent':
+        try:
+            return self.body
+        except BlogPostContent.DoesNotExist:
+            # New post: the body row is created when the post is saved
+            return BlogPostContent(blog_post=self)
+    
+    def _set_body_field(self, name: str, value: str):
+        setattr(self._get_body(), name, value)
+        self._changed_body_fields = {*getattr(self, '_changed_body_fields', ()), name}
+    
+    # The body fields read and write the BlogPostContent row, loading it on first
+    # access; load it up front with select_related('body') where they are used
+    @property
+    def content(self) -> str:
+        return self._get_body().content
+    
+    @content.setter
+    def content(self, value: str):
+        self._set_body_field('content', value)
+    
     @property
-    def word_count(self):
-        if self.content:
-            return len(self.content.split())
-        return 0
+    def key_points(self) -> str:
+        return self._get_body().key_points
+    
+    @key_points.setter
+    def key_points(self, value: str):
+        self._set_body_field('key_points', value)
     
     @property
-    def reading_time(self):
-        words = self.word_count
-        return max(1, round(words / 200))  # 200 words per minute
+    def examples(self) -> str:
+        return self._get_body().examples
+    
+    @examples.setter
+    def examples(self, value: str):
+        self._set_body_field('examples', value)
+    
+    def save(self, *args, **kwargs):
+        # Body fields are saved to the BlogPostContent row: with a new post, when
+        # named in update_fields, or otherwise when they were changed
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            body_fields = set(update_fields) & set(BODY_FIELDS)
+            kwargs['update_fields'] = [field for field in update_fields if field not in BODY_FIELDS]
+        else:
+            body_fields = getattr(self, '_changed_body_fields', set())
+        adding = self._state.adding
+        using = kwargs.get('using') or router.db_for_write(BlogPost, instance=self)
+        
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if adding or body_fields:
+                body = self._get_body()
+                if body._state.adding:
+                    body.save(using=using, force_insert=True)
+                else:
+                    body.save(using=using, update_fields=sorted(body_fields))
+        self._changed_body_fields = set()
+
+
+# BlogPost fields stored in BlogPostContent
+BODY_FIELDS = ('content', 'key_points', 'examples')
+
+
+class BlogPostContent(models.Model):
+    """Body and prompt inputs of a BlogPost, kept apart from its frequently updated status and progress columns"""
+    blog_post = models.OneToOneField(BlogPost, on_delete=models.CASCADE, primary_key=True, related_name='body')
+    key_points = models.TextField(blank=True, max_length=1000)
+    examples = models.TextField(blank=True, max_length=1000)
+    content = CompressedTextField(blank=True)
+    # Start of the content, uncompressed so lists can show it without loading the content
+    preview = models.CharField(max_length=PREVIEW_CHARS, blank=True, editable=False)
+    
+    class Meta:
+        verbose_name = 'Blog Post Content'
+        verbose_name_plural = 'Blog Post Contents'
+    
+    def __str__(self):
+        return f"Content of post {self.blog_post_id}"
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        content_changed = update_fields is None or 'content' in update_fields
+        if content_changed:
+            self.preview = self.content[:PREVIEW_CHARS]
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'preview'}
+        super().save(*args, **kwargs)
+        # Keep the search index and the post's stored word count and reading time in step with the content
+        if content_changed:
+            index_content([self.blog_post_id], self.content, using=self._state.db)
+            word_count = count_words(self.content)
+            counts = {'word_count': word_count, 'reading_time': reading_time_for(word_count)}
+            BlogPost.objects.using(self._state.db).filter(pk=self.blog_post_id).update(**counts)
+            if BlogPostContent.blog_post.is_cached(self):
+                for field, value in counts.items():
+                    setattr(self.blog_post, field, value)
+
+
+class BlogPostRevision(models.Model):
+    """
+    Append-only history of a post's content: one revision per generation and per edit.
+
+    Every REVISION_SNAPSHOT_INTERVAL-th revision stores the full content; the
+    others store a delta against the previous revision (see revisions.py).
+    Both are compressed.
+    """
+    SOURCE_CHOICES = [
+        ('generated', 'Generated'),
+        ('edited', 'Edited'),
+    ]
+    
+    blog_post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()  # 1-based, per post
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    title = models.CharField(max_length=500, blank=True)
+    word_count = models.PositiveIntegerField(default=0)
+    is_snapshot = models.BooleanField(default=False)
+    data = CompressedTextField()  # Full content if is_snapshot, else a JSON delta
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['blog_post', 'number']
+        constraints = [
+            models.UniqueConstraint(fields=['blog_post', 'number'], name='blogpostrevision_unique_number'),
+        ]
+        verbose_name = 'Blog Post Revision'
+        verbose_name_plural = 'Blog Post Revisions'
+    
+    def __str__(self):
+        return f"Revision {self.number} of post {self.blog_post_id} ({self.source})"
+    
+    def save(self, *args, **kwargs):
+        # Later revisions are deltas against this one, so it must never change
+        if not self._state.adding:
+            raise ValueError('Blog post revisions are append-only')
+        super().save(*args, **kwargs)
+
+
+class GenerationJob(models.Model):
+    """Durable generation job for a BlogPost, claimed by workers under a renewable lease"""
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    blog_post = models.OneToOneField(BlogPost, on_delete=models.CASCADE, related_name='generation_job')
+    params = models.JSONField(default=dict)  # Validated BlogPostCreateSerializer data
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    worker_id = models.CharField(max_length=200, blank=True, default='')
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='generationjob_status_created'),
+        ]
+        verbose_name = 'Generation Job'
+        verbose_name_plural = 'Generation Jobs'
+    
+    def __str__(self):
+        return f"Job for post {self.blog_post_id} - {self.status}"
+
 
+class GenerationCacheEntry(models.Model):
+    """Completed generation stored under a hash of its normalized inputs, crew config and model"""
+    key = models.CharField(max_length=64, unique=True)  # SHA-256 hex digest
+    content = models.TextField()
+    title = models.CharField(max_length=500, blank=True)
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        ordering = ['-last_used_at']
+        verbose_name = 'Generation Cache Entry'
+        verbose_name_plural = 'Generation Cache Entries'
+    
+    def __str__(self):
+        return f"{self.title or self.key[:12]} ({self.hit_count} hits)"
+
+
+class StageCacheEntry(models.Model):
+    """Output of one crew task stored under a hash of its rendered prompt, agent, model and upstream outputs"""
+    key = models.CharField(max_length=64, unique=True)  # SHA-256 hex digest
+    agent_role = models.CharField(max_length=200, blank=True)
+    task_summary = models.CharField(max_length=200, blank=True)
+    output = models.TextField()
+    hit_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        ordering = ['-last_used_at']
+        verbose_name = 'Stage Cache Entry'
+        verbose_name_plural = 'Stage Cache Entries'
+    
+    def __str__(self):
+        return f"{self.agent_role or 'Stage'}: {self.task_summary or self.key[:12]} ({self.hit_count} hits)"
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+_session = None
+_session_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+_share_async_clients = False
+
+
+def get_timeout(read_timeout: float) -> tuple:
+    """
+    Build a requests timeout that fails fast on unreachable servers.
+
+    Args:
+        read_timeout: Seconds to wait for the server's response once connected
+
+    Returns:
+        (connect timeout, read timeout) tuple
+    """
+    return (getattr(settings, 'OLLAMA_CONNECT_TIMEOUT', 3), read_timeout)
+
+
+def get_session() -> requests.Session:
+    """
+    Get the HTTP session shared by all direct calls to Ollama servers.
+
+    Connections are kept alive and reused across requests, generations and
+    health probes, with at most OLLAMA_HTTP_POOL_SIZE open connections per
+    server; requests beyond that wait for a free connection.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            pool_size = getattr(settings, 'OLLAMA_HTTP_POOL_SIZE', 10)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def ollama_get(base_url: str, path: str, timeout: float = 10) -> requests.Response:
+    """
+    Send a GET request to an Ollama server over the shared session.
+
+    Args:
+        base_url: Ollama server URL
+        path: API path, e.g. '/api/tags'
+        timeout: Read timeout in seconds
+
+    Returns:
+        requests.Response
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached
+    """
+    return get_session().get(f"{base_url.rstrip('/')}{path}", timeout=get_timeout(timeout))
+
+
+def ollama_post(base_url: str, path: str, payload: dict, timeout: float = None) -> requests.Response:
+    """
+    Send a JSON POST request to an Ollama server over the shared session.
+
+    Args:
+        base_url: Ollama server URL
+        path: API path, e.g. '/api/chat'
+        payload: JSON body
+        timeout: Read timeout in seconds (defaults to OLLAMA_REQUEST_TIMEOUT)
+
+    Returns:
+        requests.Response
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'OLLAMA_REQUEST_TIMEOUT', 600)
+    return get_session().post(f"{base_url.rstrip('/')}{path}", json=payload, timeout=get_timeout(timeout))
+
+
+def share_async_clients():
+    """
+    Keep one async client per event loop for the life of the process.
+
+    Called by the ASGI entry point (blog_builder/asgi.py), whose event loop
+    lives as long as the server.
+    """
+    global _share_async_clients
+    _share_async_clients = True
+
+
+def _new_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(limits=httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=getattr(settings, 'OLLAMA_HTTP_POOL_SIZE', 10),
+    ))
+
+
+@asynccontextmanager
+async def async_client():
+    """
+    Get an async HTTP client for Ollama calls from async views.
+
+    httpx clients are bound to an event loop. Under ASGI there is one per loop,
+    i.e. one per server process, shared by every request and kept open. Under
+    WSGI (including runserver) Django runs each async view on a new event loop,
+    so the client is opened for the call and closed again when it is done.
+    """
+    if not _share_async_clients:
+        async with _new_async_client() as client:
+            yield client
+        return
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _new_async_client()
+        _async_clients[loop] = client
+    yield client
+
+
+def get_async_timeout(read_timeout: float) -> httpx.Timeout:
+    """Async counterpart of get_timeout()."""
+    return httpx.Timeout(read_timeout, connect=getattr(settings, 'OLLAMA_CONNECT_TIMEOUT', 3))
+
+
+async def aollama_get(base_url: str, path: str, timeout: float = 10) -> httpx.Response:
+    """
+    Async version of ollama_get().
+
+    Raises:
+        httpx.HTTPError: If the server cannot be reached
+    """
+    async with async_client() as client:
+        return await client.get(f"{base_url.rstrip('/')}{path}", timeout=get_async_timeout(timeout))
+
+
+async def aollama_post(base_url: str, path: str, payload: dict, timeout: float = None) -> httpx.Response:
+    """
+    Async version of ollama_post().
+
+    Raises:
+        httpx.HTTPError: If the server cannot be reached
+    """
+    if timeout is None:
+        timeout = getattr(settings, 'OLLAMA_REQUEST_TIMEOUT', 600)
+    async with async_client() as client:
+        return await client.post(f"{base_url.rstrip('/')}{path}", json=payload, timeout=get_async_timeout(timeout))
@@ -0,0 +1,387 @@
+import threading
+import time
+import requests
+from django.conf import settings
+from .ollama_client import ollama_get, ollama_post, aollama_get
+
+
+class NoBackendAvailable(Exception):
+    """Raised when every Ollama backend has failed for a request."""
+
+
+def check_ollama(base_url: str, timeout: float = 5):
+    """
+    Request the model list of an Ollama server, the cheapest call that proves it is up.
+
+    Args:
+        base_url: Ollama server URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        requests.Response of GET /api/tags
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached
+    """
+    return ollama_get(base_url, '/api/tags', timeout=timeout)
+
+
+async def acheck_ollama(base_url: str, timeout: float = 5):
+    """
+    Async version of check_ollama().
+
+    Raises:
+        httpx.HTTPError: If the server cannot be reached
+    """
+    return await aollama_get(base_url, '/api/tags', timeout=timeout)
+
+
+def normalize_model_name(model: str) -> str:
+    """Name of a model as Ollama reports it, e.g. 'ollama/llama3' -> 'llama3:latest'."""
+    if model.startswith('ollama/'):
+        model = model[len('ollama/'):]
+    return model if ':' in model else f'{model}:latest'
+
+
+def warm_up_model(base_url: str, model: str, keep_alive: str):
+    """
+    Load a model into an Ollama server's memory and keep it there.
+
+    Sends a generate request with an empty prompt, which makes Ollama load the
+    model without generating anything, and sets how long it stays loaded.
+
+    Args:
+        base_url: Ollama server URL
+        model: Model name, with or without ollama/ prefix
+        keep_alive: Ollama keep_alive duration, e.g. '30m' or '-1' to never unload
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached or cannot load the model
+    """
+    keep_alive = int(keep_alive) if keep_alive.lstrip('-').isdigit() else keep_alive
+    response = ollama_post(base_url, '/api/generate', {
+        'model': normalize_model_name(model),
+        'prompt': '',
+        'stream': False,
+        'keep_alive': keep_alive,
+    })
+    response.raise_for_status()
+
+
+def loaded_models(base_url: str, timeout: float = 5) -> set:
+    """
+    Get the models an Ollama server currently holds in memory.
+
+    Returns:
+        Set of model names as Ollama reports them, e.g. {'llama3:latest'}
+
+    Raises:
+        requests.exceptions.RequestException: If the server cannot be reached
+    """
+    response = ollama_get(base_url, '/api/ps', timeout=timeout)
+    response.raise_for_status()
+    return {model.get('name') or model.get('model', '') for model in response.json().get('models', [])}
+
+
+class Backend:
+    """One Ollama server in the pool, with its health and traffic statistics."""
+
+    # Weight of the newest sample in the latency moving average
+    LATENCY_SMOOTHING = 0.2
+
+    def __init__(self, base_url: str, weight: int = 1):
+        self.base_url = base_url
+        self.weight = max(1, weight)
+        self.healthy = True  # Optimistic until a probe or request says otherwise
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.latency_ms = None  # Moving average of successful request latency
+        self.probe_latency_ms = None
+        self.last_checked = None
+        self.last_error = ''
+        self.loaded_models = set()  # Models resident in the server's memory, from /api/ps
+        self.warming = False
+        self.last_warmup_ms = None
+
+    def record_latency(self, seconds: float):
+        sample = seconds * 1000
+        if self.latency_ms is None:
+            self.latency_ms = sample
+        else:
+            self.latency_ms += self.LATENCY_SMOOTHING * (sample - self.latency_ms)
+
+    def load(self) -> float:
+        """Outstanding requests relative to the backend's weight; lower is better."""
+        return (self.in_flight + 1) / self.weight
+
+    def to_dict(self) -> dict:
+        return {
+            'base_url': self.base_url,
+            'weight': self.weight,
+            'healthy': self.healthy,
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'failures': self.failures,
+            'latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            'probe_latency_ms': round(self.probe_latency_ms, 1) if self.probe_latency_ms is not None else None,
+            'last_checked': self.last_checked,
+            'last_error': self.last_error,
+            'loaded_models': sorted(self.loaded_models),
+            'warming': self.warming,
+            'last_warmup_ms': round(self.last_warmup_ms, 1) if self.last_warmup_ms is not None else None,
+        }
+
+
+class OllamaBackendPool:
+    """
+    Load balancer over several Ollama servers.
+
+    Each request goes to the healthy backend with the fewest outstanding
+    requests relative to its weight, preferring backends that already hold the
+    model in memory. A backend that fails a request or a health probe is taken
+    out of rotation until a later probe succeeds; callers retry the request on
+    another backend. A daemon thread probes every backend's /api/tags and
+    /api/ps endpoints periodically and warms up the configured model on
+    healthy backends that do not have it loaded, so generations do not pay
+    Ollama's model load time.
+    """
+
+    def __init__(self, probe_interval: float = 30.0, probe_timeout: float = 5.0):
+        """
+        Initialize the pool.
+
+        Args:
+            probe_interval: Seconds between health probes of every backend
+            probe_timeout: Timeout of one health probe in seconds
+        """
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._backends = {}  # base_url -> Backend
+        self._lock = threading.Lock()
+        self._probe_thread = None
+        self._stop_event = threading.Event()
+        self.model = None  # Model kept warm on every backend
+        self.keep_alive = None
+        self.warmup_enabled = getattr(settings, 'OLLAMA_WARMUP_ENABLED', True)
+
+    def configure(self, backends: list, model: str = None, keep_alive: str = None):
+        """
+        Set the backends of the pool, keeping the statistics of ones that stay.
+
+        Args:
+            backends: List of (base_url, weight) tuples
+            model: Model to keep warm on every backend; a new model is warmed up right away
+            keep_alive: Ollama keep_alive duration for the model
+        """
+        with self._lock:
+            configured = {}
+            for base_url, weight in backends:
+                backend = self._backends.get(base_url) or Backend(base_url, weight)
+                backend.weight = max(1, weight)
+                configured[base_url] = backend
+            self._backends = configured
+            model_changed = model is not None and (model, keep_alive) != (self.model, self.keep_alive)
+            if model is not None:
+                self.model, self.keep_alive = model, keep_alive
+        self._start_probing()
+        if model_changed:
+            self.warm_up(force=True)
+
+    def _start_probing(self):
+        with self._lock:
+            if self._probe_thread is not None or self.probe_interval <= 0:
+                return
+            self._probe_thread = threading.Thread(
+                target=self._probe_loop, name='ollama-health-probe', daemon=True
+            )
+            self._probe_thread.start()
+
+    def _probe_loop(self):
+        while not self._stop_event.wait(self.probe_interval):
+            self.check_health()
+
+    def check_health(self) -> dict:
+        """
+        Probe every backend now and update its health.
+
+        Returns:
+            Dictionary mapping base URL to whether it is healthy
+        """
+        with self._lock:
+            backends = list(self._backends.values())
+        results = {}
+        for backend in backends:
+            started = time.monotonic()
+            probe_latency = None
+            loaded = set()
+            try:
+                response = check_ollama(backend.base_url, timeout=self.probe_timeout)
+                healthy = response.status_code == 200
+                error = '' if healthy else f'Ollama server returned status code {response.status_code}'
+                probe_latency = time.monotonic() - started
+                if healthy:
+                    loaded = loaded_models(backend.base_url, timeout=self.probe_timeout)
+            except requests.exceptions.RequestException as e:
+                healthy, error = False, str(e)
+            with self._lock:
+                backend.healthy = healthy
+                backend.last_error = error
+                backend.last_checked = time.time()
+                backend.probe_latency_ms = probe_latency * 1000 if probe_latency is not None else None
+                backend.loaded_models = loaded
+            results[backend.base_url] = healthy
+        self.warm_up()
+        return results
+
+    def warm_up(self, force: bool = False):
+        """
+        Load the configured model on healthy backends that do not hold it, in the background.
+
+        Args:
+            force: Also warm up backends that report the model as loaded, to renew its keep_alive
+        """
+        if not self.warmup_enabled:
+            return
+        with self._lock:
+            model, keep_alive = self.model, self.keep_alive
+            if model is None:
+                return
+            name = normalize_model_name(model)
+            pending = [
+                backend for backend in self._backends.values()
+                if backend.healthy and not backend.warming and (force or name not in backend.loaded_models)
+            ]
+            for backend in pending:
+                backend.warming = True
+        for backend in pending:
+            threading.Thread(
+                target=self._warm_backend, args=(backend, model, keep_alive),
+                name='ollama-warm-up', daemon=True,
+            ).start()
+
+    def _warm_backend(self, backend: Backend, model: str, keep_alive: str):
+        started = time.monotonic()
+        try:
+            warm_up_model(backend.base_url, model, keep_alive or getattr(settings, 'OLLAMA_KEEP_ALIVE', '30m'))
+        except requests.exceptions.RequestException as e:
+            print(f"Error warming up {model} on {backend.base_url}: {e}")
+            with self._lock:
+                backend.warming = False
+                backend.last_error = f'Warm-up failed: {e}'
+            return
+        with self._lock:
+            backend.warming = False
+            backend.last_warmup_ms = (time.monotonic() - started) * 1000
+            backend.loaded_models.add(normalize_model_name(model))
+        print(f"Warmed up {model} on {backend.base_url} in {backend.last_warmup_ms / 1000:.1f}s")
+
+    def acquire(self, exclude=(), model: str = None) -> Backend:
+        """
+        Pick a backend for one request and count it as in flight; pair with release().
+
+        Args:
+            exclude: Base URLs that already failed this request
+            model: Model the request needs; backends holding it in memory are preferred
+
+        Returns:
+            The chosen Backend
+
+        Raises:
+            NoBackendAvailable: If every backend is excluded
+        """
+        with self._lock:
+            candidates = [b for b in self._backends.values() if b.base_url not in exclude]
+            if not candidates:
+                raise NoBackendAvailable('All Ollama backends failed')
+            # If every backend looks down, still try one: probes may be stale
+            candidates = [b for b in candidates if b.healthy] or candidates
+            if model is not None:
+                # Avoid making a request wait for Ollama to load the model
+                name = normalize_model_name(model)
+                candidates = [b for b in candidates if name in b.loaded_models] or candidates
+            backend = min(candidates, key=lambda b: (b.load(), b.latency_ms or 0))
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: Backend, seconds: float, error: Exception = None, model: str = None):
+        """
+        Finish a request started with acquire().
+
+        Args:
+            backend: Backend returned by acquire()
+            seconds: Duration of the request
+            error: Connection error if the backend failed; takes it out of rotation
+            model: Model the request used; a successful request leaves it loaded
+        """
+        with self._lock:
+            backend.in_flight = max(0, backend.in_flight - 1)
+            if error is None:
+                backend.record_latency(seconds)
+                if model is not None:
+                    backend.loaded_models.add(normalize_model_name(model))
+            else:
+                backend.failures += 1
+                backend.healthy = False
+                backend.last_error = str(error)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._backends)
+
+    def stats(self) -> dict:
+        """Get health, in-flight requests and latency of every backend."""
+        with self._lock:
+            backends = [backend.to_dict() for backend in self._backends.values()]
+        return {
+            'backends': backends,
+            'model': self.model,
+            'keep_alive': self.keep_alive,
+            'healthy': sum(1 for backend in backends if backend['healthy']),
+            'in_flight': sum(backend['in_flight'] for backend in backends),
+            'probe_interval': self.probe_interval,
+        }
+
+    def shutdown(self):
+        self._stop_event.set()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_backend_pool() -> OllamaBackendPool:
+    """Get the process-wide Ollama backend pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaBackendPool(
+                probe_interval=getattr(settings, 'OLLAMA_HEALTH_CHECK_INTERVAL', 30),
+            )
+        return _pool
+
+
+def warm_up_active_model(instance=None, **kwargs):
+    """Warm up the model of newly saved active Ollama settings once the transaction commits."""
+    from django.db import transaction
+    from .crew_plans import get_llm_config
+
+    if instance is not None and not instance.is_active:
+        return
+
+    def warm_up():
+        config = get_llm_config()
+        pool = get_backend_pool()
+        pool.configure(config['backends'], model=config['model'], keep_alive=config['keep_alive'])
+        pool.warm_up(force=True)
+
+    transaction.on_commit(warm_up)
+
+
+def connect_signals():
+    """Warm up the model of Ollama settings as soon as they are saved."""
+    from django.db.models.signals import post_save
+    from .models import OllamaSettings
+
+    post_save.connect(warm_up_active_model, sender=OllamaSettings, dispatch_uid='ollama_pool_warm_up')
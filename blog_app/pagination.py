@@ -0,0 +1,123 @@
+import base64
+import binascii
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Largest page any listing returns, whatever page size is requested
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset."""
+
+    def __init__(self, items: list, next_cursor: str = None, previous_cursor: str = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def get_page_size(value, default: int) -> int:
+    """
+    Parse a requested page size, clamped to 1..MAX_PAGE_SIZE.
+
+    Args:
+        value: Requested page size (query parameter), or None
+        default: Page size used when none or an invalid one is requested
+
+    Returns:
+        Page size
+    """
+    try:
+        size = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _encode_cursor(obj, field) -> str:
+    raw = json.dumps([field.value_to_string(obj), obj.pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str, field) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        value = field.to_python(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError, ValidationError) as e:
+        raise InvalidCursor('Invalid pagination cursor') from e
+    if value is None:
+        raise InvalidCursor('Invalid pagination cursor')
+    return value, pk
+
+
+def paginate(queryset, sort: str, page_size: int, after: str = None, before: str = None) -> KeysetPage:
+    """
+    Fetch one page of a queryset ordered by a single column, with the id as tie-breaker.
+
+    Pages are found by seeking past the last row of the previous page
+    (WHERE (sort, id) > cursor) instead of by OFFSET, so every page costs the
+    same however far into the table it is, and rows inserted or deleted
+    meanwhile don't shift later pages. Only page_size + 1 rows are read.
+
+    Args:
+        queryset: Queryset to paginate; its own ordering is replaced
+        sort: Model field to order by, '-' prefixed for descending; must not be nullable
+        page_size: Rows per page
+        after: Cursor of the page's preceding row (next_cursor of the previous page)
+        before: Cursor of the page's following row (previous_cursor of the next page)
+
+    Returns:
+        KeysetPage with the rows and the cursors of the neighbouring pages
+
+    Raises:
+        InvalidCursor: If after or before is not a cursor for this sort
+    """
+    descending = sort.startswith('-')
+    name = sort.lstrip('-')
+    field = queryset.model._meta.get_field(name)
+    cursor = before or after
+    backwards = bool(before)
+
+    # Walking backwards reads the rows in reverse order, then flips them
+    seek_down = descending != backwards
+    if cursor:
+        value, pk = _decode_cursor(cursor, field)
+        lookup = 'lt' if seek_down else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'{name}__{lookup}': value}) | Q(**{name: value, f'id__{lookup}': pk})
+        )
+    prefix = '-' if seek_down else ''
+    rows = list(queryset.order_by(f'{prefix}{name}', f'{prefix}id')[:page_size + 1])
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    has_next = more if not backwards else True
+    has_previous = more if backwards else bool(cursor)
+    return KeysetPage(
+        rows,
+        next_cursor=_encode_cursor(rows[-1], field) if rows and has_next else None,
+        previous_cursor=_encode_cursor(rows[0], field) if rows and has_previous else None,
+    )
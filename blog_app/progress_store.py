@@ -0,0 +1,137 @@
+import threading
+import time
+from django.conf import settings
+from django.utils import timezone
+from .db_writer import run_write
+from .events import PROGRESS_FIELDS, broadcaster
+from .models import BlogPost
+
+# Progress columns kept in memory while a post is generated
+HOT_FIELDS = ('current_agent', 'current_task', 'progress_message', 'progress_percentage', 'task_timings')
+
+
+class ProgressStore:
+    """
+    In-memory progress of the posts being generated in this process.
+
+    Progress changes several times per task, so instead of writing every
+    change to the BlogPost row they are kept here and published to progress
+    streams straight away. The row is updated at most once every
+    PROGRESS_FLUSH_INTERVAL seconds per post with the latest values (one
+    UPDATE, no read), and the final state is saved with the post's result.
+    Reads in this process (post detail, lists, progress streams) overlay the
+    in-memory values, so they never lag behind; other processes see the row.
+    External workers flush every PROGRESS_EXTERNAL_INTERVAL seconds instead,
+    since the row is all the web server sees. update() flushes a post when a
+    change arrives after the interval; the worker pool also flushes every
+    interval, so a post's last change doesn't wait for another one.
+    """
+
+    def __init__(self):
+        self._states = {}  # post id -> {field: value} for PROGRESS_FIELDS and HOT_FIELDS
+        self._dirty = {}  # post id -> HOT_FIELDS changed since the last flush
+        self._flushed_at = {}  # post id -> time.monotonic() of the last flush
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def flush_interval() -> float:
+        """Seconds between database writes of a post's progress (0: only the final state)."""
+        if getattr(settings, 'GENERATION_WORKER_MODE', 'thread') == 'external':
+            return getattr(settings, 'PROGRESS_EXTERNAL_INTERVAL', 1)
+        return getattr(settings, 'PROGRESS_FLUSH_INTERVAL', 10)
+
+    def begin(self, blog_post: BlogPost):
+        """Start keeping the progress of a post in memory and publish its current state."""
+        state = {field: getattr(blog_post, field) for field in (*PROGRESS_FIELDS, *HOT_FIELDS)}
+        with self._lock:
+            self._states[blog_post.id] = state
+            self._dirty[blog_post.id] = set()
+            self._flushed_at[blog_post.id] = time.monotonic()
+        self._publish(state)
+
+    def update(self, post_id: int, **fields):
+        """
+        Record new progress values of a post and publish them.
+
+        Args:
+            post_id: ID of a post passed to begin()
+            **fields: New values of HOT_FIELDS
+        """
+        with self._lock:
+            state = self._states.get(post_id)
+            if state is None:
+                return
+            state.update(fields)
+            self._dirty[post_id].update(fields)
+            event = dict(state)
+            interval = self.flush_interval()
+            due = interval > 0 and time.monotonic() - self._flushed_at[post_id] >= interval
+        self._publish(event)
+        if due:
+            self.flush(post_id)
+
+    def get(self, post_id: int):
+        """Current in-memory progress of a post, or None if it isn't being generated here."""
+        with self._lock:
+            state = self._states.get(post_id)
+            return dict(state) if state is not None else None
+
+    def apply(self, blog_post: BlogPost) -> BlogPost:
+        """Overlay the in-memory progress of a post on an instance loaded from the database."""
+        state = self.get(blog_post.id)
+        if state is not None:
+            for field in HOT_FIELDS:
+                setattr(blog_post, field, state[field])
+        return blog_post
+
+    def flush(self, post_id: int = None):
+        """
+        Write changed progress values to the database.
+
+        Args:
+            post_id: Post to flush, or None for every post with unwritten changes
+        """
+        with self._lock:
+            post_ids = [post_id] if post_id is not None else list(self._dirty)
+            writes = {}
+            for pid in post_ids:
+                dirty = self._dirty.get(pid)
+                if dirty:
+                    writes[pid] = {field: self._states[pid][field] for field in dirty}
+                    dirty.clear()
+                if pid in self._flushed_at:
+                    self._flushed_at[pid] = time.monotonic()
+        for pid, values in writes.items():
+            try:
+                run_write(_write_progress, pid, values, wait=False)
+            except Exception as e:
+                print(f"Error flushing progress of post {pid}: {e}")
+
+    def finish(self, post_id: int) -> dict:
+        """
+        Stop keeping the progress of a post in memory.
+
+        Returns:
+            Its final HOT_FIELDS values, to be saved with the post's result ({} if unknown)
+        """
+        with self._lock:
+            state = self._states.pop(post_id, None)
+            self._dirty.pop(post_id, None)
+            self._flushed_at.pop(post_id, None)
+        if state is None:
+            return {}
+        return {field: state[field] for field in HOT_FIELDS}
+
+    @staticmethod
+    def _publish(state: dict):
+        event = {field: state[field] for field in PROGRESS_FIELDS}
+        event['queue_position'] = None
+        broadcaster.publish(event)
+
+
+def _write_progress(post_id: int, values: dict):
+    # Only while generating: never overwrite a result or an error
+    BlogPost.objects.filter(id=post_id, status='processing').update(**values, updated_at=timezone.now())
+
+
+progress_store = ProgressStore()
@@ -0,0 +1,120 @@
+import json
+from difflib import SequenceMatcher
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from .models import BlogPost, BlogPostRevision, count_words
+
+
+def make_delta(old: str, new: str) -> list:
+    """
+    Line-based delta turning old text into new text.
+
+    Returns:
+        List of operations: ['=', n] copies the next n lines of the old text,
+        ['-', n] skips them and ['+', text] inserts text
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            delta.append(['=', i2 - i1])
+            continue
+        if i2 > i1:
+            delta.append(['-', i2 - i1])
+        if j2 > j1:
+            delta.append(['+', ''.join(new_lines[j1:j2])])
+    return delta
+
+
+def apply_delta(old: str, delta: list) -> str:
+    """Rebuild the new text from the old text and a delta made by make_delta()."""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    position = 0
+    for operation, value in delta:
+        if operation == '=':
+            parts.extend(old_lines[position:position + value])
+            position += value
+        elif operation == '-':
+            position += value
+        else:
+            parts.append(value)
+    return ''.join(parts)
+
+
+def get_revision_content(revision: BlogPostRevision) -> str:
+    """
+    Rebuild the content of a revision.
+
+    Starts from the closest snapshot at or before it and applies the deltas
+    after that, at most REVISION_SNAPSHOT_INTERVAL - 1 of them.
+    """
+    if revision.is_snapshot:
+        return revision.data
+    chain = list(
+        BlogPostRevision.objects.using(revision._state.db).filter(
+            blog_post_id=revision.blog_post_id,
+            number__lte=revision.number,
+            number__gte=BlogPostRevision.objects.using(revision._state.db).filter(
+                blog_post_id=revision.blog_post_id, number__lte=revision.number, is_snapshot=True,
+            ).order_by('-number').values('number')[:1],
+        ).order_by('number').values_list('is_snapshot', 'data')
+    )
+    content = ''
+    for is_snapshot, data in chain:
+        content = data if is_snapshot else apply_delta(content, json.loads(data))
+    return content
+
+
+def record_revision(blog_post: BlogPost, source: str):
+    """
+    Append the current content and title of a post to its revision history.
+
+    Nothing is recorded if both are unchanged since the last revision.
+
+    Args:
+        blog_post: Post whose content was just saved
+        source: 'generated' or 'edited'
+
+    Returns:
+        The new BlogPostRevision, or None if nothing changed
+    """
+    content = blog_post.content
+    interval = max(1, getattr(settings, 'REVISION_SNAPSHOT_INTERVAL', 20))
+    with transaction.atomic():
+        _lock_post(blog_post)
+        previous = blog_post.revisions.order_by('-number').first()
+        number = previous.number + 1 if previous else 1
+        is_snapshot = (number - 1) % interval == 0
+        data = content
+        if previous is not None:
+            previous_content = get_revision_content(previous)
+            if previous_content == content and previous.title == blog_post.title:
+                return None
+            if not is_snapshot:
+                data = json.dumps(make_delta(previous_content, content), separators=(',', ':'))
+                # A rewrite can make the delta larger than the text itself
+                if len(data) >= len(content):
+                    data, is_snapshot = content, True
+        return BlogPostRevision.objects.create(
+            blog_post=blog_post,
+            number=number,
+            source=source,
+            title=blog_post.title,
+            word_count=count_words(content),
+            is_snapshot=is_snapshot,
+            data=data,
+        )
+
+
+def _lock_post(blog_post: BlogPost):
+    # Number a post's revisions one transaction at a time (a generation finishing
+    # while the post is edited), else both take the same number. SQLite has no row
+    # locks; any write takes its database-wide write lock, so the row is touched.
+    posts = BlogPost.objects.filter(pk=blog_post.pk)
+    if connection.features.has_select_for_update:
+        list(posts.select_for_update().values_list('pk', flat=True))
+    else:
+        posts.update(updated_at=F('updated_at'))
@@ -0,0 +1,248 @@
+import html
+import re
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from .fields import decompress_text
+
+# Full-text index of topic, title and content (see migrations 0017, 0018 and 0020).
+# SQLite: two contentless FTS5 tables, one of topic and title and one of content,
+# kept in step by triggers; the content triggers read the compressed content
+# through the SQLITE_DECOMPRESS function. The index holds no copy of the text, so
+# snippets are made from the content here. PostgreSQL: a tsvector column of the
+# content table with a GIN index; content is compressed, so the database can't
+# read it and index_content() indexes it whenever it is written.
+FTS_TABLE = 'blog_app_blogpost_fts'
+CONTENT_FTS_TABLE = 'blog_app_blogpostcontent_fts'
+SQLITE_DECOMPRESS = 'blog_app_decompress'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+CONTENT_VECTOR_COLUMN = 'content_vector'
+CONTENT_TABLE = 'blog_app_blogpostcontent'
+
+# Search terms beyond this are ignored
+MAX_TERMS = 16
+# Approximate words around the matches in a snippet
+SNIPPET_WORDS = 24
+
+# Private-use characters marking matches in snippets until they are escaped and turned into <mark>
+_MARK_START = '\ue000'
+_MARK_END = '\ue001'
+
+_fts_tables = {}  # database alias -> whether the FTS5 table exists
+
+
+class SearchHit:
+    """One search result: a post id, its relevance and the matching text."""
+
+    def __init__(self, post_id: int, rank: float, snippet: str):
+        self.post_id = post_id
+        self.rank = rank
+        self.snippet = snippet
+
+
+def get_terms(query: str) -> list:
+    """Split a search query into the words that are searched for."""
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def get_backend(using: str = 'default') -> str:
+    """
+    Get the full-text search backend of a database.
+
+    Returns:
+        'sqlite' (FTS5), 'postgresql' (tsvector), or '' when only substring search is available
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        return 'postgresql'
+    if connection.vendor == 'sqlite':
+        if using not in _fts_tables:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                _fts_tables[using] = cursor.fetchone() is not None
+        return 'sqlite' if _fts_tables[using] else ''
+    return ''
+
+
+def register_sqlite_functions(sender=None, connection=None, **kwargs):
+    """
+    connection_created handler: add the SQL functions the search triggers use.
+
+    Every SQLite connection that writes post content needs them, so the content
+    table can't be written outside the application (e.g. from dbshell).
+    """
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(SQLITE_DECOMPRESS, 1, _sqlite_decompress, deterministic=True)
+
+
+def _sqlite_decompress(data) -> str:
+    return decompress_text(data) if data is not None else ''
+
+
+def index_content(post_ids: list, content: str, using: str = 'default'):
+    """
+    Update the full-text index with new content of posts.
+
+    Only needed on PostgreSQL; on SQLite the content triggers index it.
+
+    Args:
+        post_ids: IDs of the posts whose content is now `content`
+        content: Their new content
+        using: Database alias
+    """
+    if not post_ids or get_backend(using) != 'postgresql':
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {CONTENT_TABLE} SET {CONTENT_VECTOR_COLUMN} = to_tsvector('english', %s) "
+            f"WHERE blog_post_id IN ({placeholders})",
+            [content, *post_ids],
+        )
+
+
+def _fts_query(terms: list) -> str:
+    # Every term must match, each also as the prefix of a longer word
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _sqlite_matches(terms: list) -> tuple:
+    """
+    SQL selecting (id, score) of the posts with every term in their topic, title or content.
+
+    Each term is looked up in both FTS5 tables. The score adds up the bm25() of
+    the matches, weighting topic and title 10 times the content; lower is better.
+
+    Returns:
+        (sql, params)
+    """
+    lookup = (
+        f'SELECT rowid AS id, %s AS term, bm25({FTS_TABLE}, 10.0, 10.0) AS score '
+        f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+        f'UNION ALL SELECT rowid, %s, bm25({CONTENT_FTS_TABLE}) '
+        f'FROM {CONTENT_FTS_TABLE} WHERE {CONTENT_FTS_TABLE} MATCH %s'
+    )
+    sql = (
+        f"SELECT id, sum(score) AS score FROM ({' UNION ALL '.join([lookup] * len(terms))}) "
+        f"GROUP BY id HAVING count(DISTINCT term) = %s"
+    )
+    params = []
+    for index, term in enumerate(terms):
+        params += [index, _fts_query([term])] * 2
+    return sql, [*params, len(terms)]
+
+
+def _ts_query(terms: list) -> str:
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def highlight(snippet: str) -> str:
+    """Escape a snippet for HTML and wrap its matches in <mark> tags."""
+    return html.escape(snippet).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def filter_posts(queryset, query: str):
+    """
+    Restrict a BlogPost queryset to posts matching a search query.
+
+    Every word of the query has to appear in the topic, title or content,
+    as a whole word or as the start of one. The queryset's own filters and
+    ordering are kept.
+
+    Args:
+        queryset: BlogPost queryset
+        query: Search text as typed by the user
+
+    Returns:
+        Filtered queryset
+    """
+    terms = get_terms(query)
+    if not terms:
+        return queryset.none()
+
+    backend = get_backend(queryset.db)
+    if backend == 'sqlite':
+        sql, params = _sqlite_matches(terms)
+        return queryset.filter(id__in=RawSQL(f'SELECT id FROM ({sql})', params))
+    if backend == 'postgresql':
+        return queryset.filter(id__in=RawSQL(
+            f"SELECT blog_post_id FROM {CONTENT_TABLE} "
+            f"WHERE {SEARCH_VECTOR_COLUMN} @@ to_tsquery('english', %s)",
+            [_ts_query(terms)],
+        ))
+
+    # No full-text index: scan the posts. Content is compressed, so it is matched here.
+    matching = [
+        post_id
+        for post_id, topic, title, content in queryset.values_list('id', 'topic', 'title', 'body__content')
+        if all(term in f'{topic} {title} {content}'.lower() for term in terms)
+    ]
+    return queryset.filter(id__in=matching)
+
+
+def search(query: str, limit: int, using: str = 'default') -> list:
+    """
+    Find the posts best matching a search query.
+
+    Matches in the topic and title count more than matches in the content.
+
+    Args:
+        query: Search text as typed by the user
+        limit: Maximum number of results
+        using: Database alias
+
+    Returns:
+        List of SearchHit, most relevant first, with HTML snippets of the matching text
+    """
+    terms = get_terms(query)
+    if not terms:
+        return []
+
+    backend = get_backend(using)
+    if backend == 'sqlite':
+        matches, params = _sqlite_matches(terms)
+        sql = f'{matches} ORDER BY score, id DESC LIMIT %s'
+        params = [*params, limit]
+    elif backend == 'postgresql':
+        sql = (
+            f"SELECT blog_post_id, ts_rank_cd({SEARCH_VECTOR_COLUMN}, query) AS score "
+            f"FROM {CONTENT_TABLE}, to_tsquery('english', %s) query "
+            f"WHERE {SEARCH_VECTOR_COLUMN} @@ query ORDER BY score DESC, blog_post_id DESC LIMIT %s"
+        )
+        params = [_ts_query(terms), limit]
+    else:
+        return _search_without_index(terms, limit, using)
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if backend == 'sqlite':
+        # bm25() scores better matches lower
+        rows = [(post_id, -score) for post_id, score in rows]
+    # Neither index keeps the content readable (it is compressed), so snippets are made here
+    contents = _load_contents([post_id for post_id, score in rows], using)
+    return [SearchHit(post_id, score, _snippet(contents.get(post_id, ''), terms)) for post_id, score in rows]
+
+
+def _load_contents(post_ids: list, using: str) -> dict:
+    from .models import BlogPostContent
+
+    return dict(BlogPostContent.objects.using(using).filter(blog_post_id__in=post_ids).values_list('blog_post_id', 'content'))
+
+
+def _snippet(content: str, terms: list) -> str:
+    # About SNIPPET_WORDS words of content around the first match, matches highlighted
+    pattern = re.compile('|'.join(rf'\b{re.escape(term)}\w*' for term in terms), re.IGNORECASE)
+    match = pattern.search(content)
+    start = max(0, match.start() - 80) if match else 0
+    text = content[start:start + SNIPPET_WORDS * 8]
+    text = pattern.sub(lambda m: f'{_MARK_START}{m.group(0)}{_MARK_END}', text)
+    return highlight(('…' if start else '') + text + ('…' if start + SNIPPET_WORDS * 8 < len(content) else ''))
+
+
+def _search_without_index(terms: list, limit: int, using: str) -> list:
+    from .models import BlogPost
+
+    posts = filter_posts(BlogPost.objects.using(using), ' '.join(terms)).order_by('-created_at')
+    post_ids = list(posts.values_list('id', flat=True)[:limit])
+    contents = _load_contents(post_ids, using)
+    return [SearchHit(post_id, 0.0, _snippet(contents.get(post_id, ''), terms)) for post_id in post_ids]
@@ -1,15 +1,88 @@
 from rest_framework import serializers
-from .models import BlogPost, Agent, Task, CrewConfig, OllamaSettings
+from .models import BODY_FIELDS, BlogPost, BlogPostRevision, Agent, Task, CrewConfig, OllamaSettings, OllamaBackend
+from .crew_plans import find_dependency_cycle
+from .progress_store import progress_store
 
 
 class BlogPostSerializer(serializers.ModelSerializer):
     word_count = serializers.ReadOnlyField()
     reading_time = serializers.ReadOnlyField()
+    queue_position = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
-        fields = ['id', 'topic', 'subtitle', 'target_audience', 'key_points', 'examples', 'tone', 'content', 'status', 'is_saved', 'title', 'word_count', 'reading_time', 'current_agent', 'current_task', 'progress_message', 'progress_percentage', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at', 'word_count', 'reading_time', 'current_agent', 'current_task', 'progress_message', 'progress_percentage']
+        fields = ['id', 'topic', 'subtitle', 'target_audience', 'key_points', 'examples', 'tone', 'content', 'status', 'is_saved', 'title', 'word_count', 'reading_time', 'current_agent', 'current_task', 'progress_message', 'progress_percentage', 'queue_position', 'task_timings', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'word_count', 'reading_time', 'current_agent', 'current_task', 'progress_message', 'progress_percentage', 'queue_position', 'task_timings']
+    
+    def to_representation(self, instance):
+        # Posts being generated in this process have newer progress in memory
+        return super().to_representation(progress_store.apply(instance))
+    
+    def get_queue_position(self, obj):
+        if obj.status != 'pending':
+            return None
+        if 'queue_position' in self.context:
+            # Looked up by the caller, e.g. asynchronously by an async view
+            return self.context['queue_position']
+        if 'queue_positions' in self.context:
+            # Looked up for a whole page at once by the caller
+            return self.context['queue_positions'].get(obj.id)
+        from .workers import get_worker_pool
+        return get_worker_pool().queue_position(obj.id)
+
+
+class BlogPostListSerializer(BlogPostSerializer):
+    """
+    Compact post representation for listings.
+
+    Leaves out the large text fields unless they are asked for with `fields`,
+    a list of any BlogPostSerializer field names.
+    """
+    # Left out by default: post body and prompt inputs
+    DETAIL_FIELDS = ('content', 'key_points', 'examples')
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            unknown = sorted(set(fields) - set(self.fields))
+            if unknown:
+                raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(unknown)}"})
+            keep = set(fields)
+        else:
+            keep = set(self.fields) - set(self.DETAIL_FIELDS)
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+    
+    def get_model_fields(self) -> list:
+        """Model columns needed to render the selected fields, for QuerySet.only()."""
+        columns = {'id'}
+        for name in self.fields:
+            if name == 'queue_position':
+                columns.add('status')
+            elif name in BODY_FIELDS:
+                columns.add(f'body__{name}')
+            else:
+                columns.add(name)
+        return sorted(columns)
+    
+    def only(self, queryset, *extra_fields):
+        """
+        Restrict a BlogPost queryset to the columns the selected fields need.
+        
+        Joins the content table only when body fields were asked for.
+        """
+        columns = self.get_model_fields()
+        if any(column.startswith('body__') for column in columns):
+            queryset = queryset.select_related('body')
+        return queryset.only(*columns, *extra_fields)
+
+
+class BlogPostRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogPostRevision
+        fields = ['number', 'source', 'title', 'word_count', 'created_at']
+        read_only_fields = fields
 
 
 class BlogPostCreateSerializer(serializers.Serializer):
@@ -25,6 +98,7 @@ class BlogPostCreateSerializer(serializers.Serializer):
     tone = serializers.ChoiceField(choices=BlogPost.TONE_CHOICES, required=False, default='friendly')
     length = serializers.ChoiceField(choices=[('short', 'Short'), ('medium', 'Medium'), ('long', 'Long')], required=False, default='medium')
     crew_config_id = serializers.IntegerField(required=False, allow_null=True)
+    bypass_cache = serializers.BooleanField(required=False, default=False)
 
 
 class AgentSerializer(serializers.ModelSerializer):
@@ -42,11 +116,34 @@ class AgentSerializer(serializers.ModelSerializer):
 class TaskSerializer(serializers.ModelSerializer):
     agent_name = serializers.CharField(source='agent.name', read_only=True)
     depends_on_name = serializers.CharField(source='depends_on.name', read_only=True, allow_null=True)
+    extra_dependencies = serializers.PrimaryKeyRelatedField(many=True, required=False, queryset=Task.objects.all())
     
     class Meta:
         model = Task
-        fields = ['id', 'name', 'description', 'agent', 'agent_name', 'expected_output', 'depends_on', 'depends_on_name', 'order', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'agent', 'agent_name', 'expected_output', 'depends_on', 'depends_on_name', 'extra_dependencies', 'order', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'agent_name', 'depends_on_name']
+    
+    def validate(self, attrs):
+        """Reject dependencies that would make the task depend on itself, directly or through other tasks."""
+        if self.instance is None:
+            # A new task has no dependents yet, so it cannot close a cycle
+            return attrs
+        
+        depends_on = attrs['depends_on'] if 'depends_on' in attrs else self.instance.depends_on
+        if 'extra_dependencies' in attrs:
+            extra_ids = [task.id for task in attrs['extra_dependencies']]
+        else:
+            extra_ids = list(self.instance.extra_dependencies.values_list('id', flat=True))
+        dependency_ids = ([depends_on.id] if depends_on else []) + extra_ids
+        
+        cycle = find_dependency_cycle(self.instance.id, dependency_ids)
+        if cycle:
+            names = dict(Task.objects.filter(id__in=cycle).values_list('id', 'name'))
+            names[self.instance.id] = attrs.get('name', self.instance.name)
+            path = ' -> '.join(names.get(task_id, str(task_id)) for task_id in cycle)
+            field = 'depends_on' if depends_on and cycle[1] == depends_on.id else 'extra_dependencies'
+            raise serializers.ValidationError({field: f"Circular dependency: {path}"})
+        return attrs
 
 
 class CrewConfigSerializer(serializers.ModelSerializer):
@@ -62,6 +159,13 @@ class CrewConfigSerializer(serializers.ModelSerializer):
 class OllamaSettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = OllamaSettings
-        fields = ['id', 'name', 'base_url', 'model', 'temperature', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'base_url', 'model', 'temperature', 'keep_alive', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+
+
+class OllamaBackendSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OllamaBackend
+        fields = ['id', 'name', 'base_url', 'weight', 'is_enabled', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
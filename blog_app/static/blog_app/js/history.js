@@ -81,6 +81,9 @@ function applyFilters() {
 function removeFilter(filterName) {
     const params = new URLSearchParams(window.location.search);
     params.delete(filterName);
+    // Filters change the result set, so start again from the first page
+    params.delete('after');
+    params.delete('before');
     const queryString = params.toString();
     window.location.href = '/history/' + (queryString ? '?' + queryString : '');
 }
@@ -48,7 +48,7 @@ searchInput?.addEventListener('input', (e) => {
             searchResults.innerHTML = posts.map(post => `
                 <div class="search-result-item" onclick="window.location.href='/edit/${post.id}/'">
                     <div class="search-result-title">${post.topic || post.title || 'Untitled'}</div>
-                    <div class="search-result-preview">${(post.content || '').substring(0, 100)}...</div>
+                    <div class="search-result-preview">${post.snippet || ''}</div>
                 </div>
             `).join('');
         } catch (error) {
@@ -103,9 +103,6 @@ const templates = {
 };
 
 // Templates modal functionality
-const templatesBtn = document.getElementById('templatesBtn');
-const templatesModal = document.getElementById('templatesModal');
-const closeTemplatesModal = document.getElementById('closeTemplatesModal');
 const categoryButtons = document.querySelectorAll('.category-btn');
 const templateCards = document.querySelectorAll('.template-card');
 
@@ -163,55 +160,93 @@ function updateActivePosts() {
         
         fetch(`/api/post/${postId}/`)
             .then(response => response.json())
-            .then(post => {
-                // Update progress bar
-                const progressFill = card.querySelector('.progress-fill');
-                const progressText = card.querySelector('.progress-text');
-                const progressAgent = card.querySelector('.progress-agent');
-                const statusBadge = card.querySelector('.status-badge');
-                
-                if (progressFill && post.progress_percentage !== undefined) {
-                    progressFill.style.width = `${post.progress_percentage}%`;
-                }
-                
-                if (progressText) {
-                    progressText.textContent = `${post.progress_percentage || 0}%`;
-                }
-                
-                if (progressAgent && post.current_agent) {
-                    progressAgent.textContent = post.current_agent;
-                }
-                
-                // Update status badge
-                if (statusBadge && post.status) {
-                    statusBadge.textContent = post.status.charAt(0).toUpperCase() + post.status.slice(1);
-                    statusBadge.className = `status-badge status-${post.status}`;
-                }
-                
-                // If completed, reload page after a delay
-                if (post.status === 'completed') {
-                    setTimeout(() => {
-                        window.location.reload();
-                    }, 2000);
-                }
-                
-                // If failed, update styling
-                if (post.status === 'failed') {
-                    card.style.borderColor = '#ef4444';
-                }
-            })
+            .then(post => applyActivePostUpdate(card, post))
             .catch(error => {
                 console.error('Error updating post:', error);
             });
     });
 }
 
-// Update active posts every 3 seconds
-if (document.querySelectorAll('.active-post-card[data-post-id]').length > 0) {
-    updateActivePosts();
-    setInterval(updateActivePosts, 3000);
+// Apply a progress update to an active post card
+function applyActivePostUpdate(card, post) {
+    const progressFill = card.querySelector('.progress-fill');
+    const progressText = card.querySelector('.progress-text');
+    const progressAgent = card.querySelector('.progress-agent');
+    const statusBadge = card.querySelector('.status-badge');
+    
+    if (progressFill && post.progress_percentage !== undefined) {
+        progressFill.style.width = `${post.progress_percentage}%`;
+    }
+    
+    if (progressText) {
+        progressText.textContent = `${post.progress_percentage || 0}%`;
+    }
+    
+    if (progressAgent && post.current_agent) {
+        progressAgent.textContent = post.current_agent;
+    }
+    
+    // Update status badge
+    if (statusBadge && post.status) {
+        statusBadge.textContent = post.status.charAt(0).toUpperCase() + post.status.slice(1);
+        statusBadge.className = `status-badge status-${post.status}`;
+    }
+    
+    // If completed, reload page after a delay
+    if (post.status === 'completed') {
+        setTimeout(() => {
+            window.location.reload();
+        }, 2000);
+    }
+    
+    // If failed, update styling
+    if (post.status === 'failed') {
+        card.style.borderColor = '#ef4444';
+    }
 }
 
+// Watch all active posts over one Server-Sent Events connection, falling back to polling
+function watchActivePosts() {
+    const activePostCards = document.querySelectorAll('.active-post-card[data-post-id]');
+    if (activePostCards.length === 0) return;
+    
+    const startPollingActivePosts = () => {
+        updateActivePosts();
+        setInterval(updateActivePosts, 3000);
+    };
+    
+    if (!window.EventSource) {
+        startPollingActivePosts();
+        return;
+    }
+    
+    const ids = Array.from(activePostCards).map(card => card.dataset.postId).join(',');
+    let stream = new EventSource(`/api/posts/events/?ids=${ids}`);
+    
+    stream.addEventListener('progress', (event) => {
+        const post = JSON.parse(event.data);
+        const card = document.querySelector(`.active-post-card[data-post-id="${post.id}"]`);
+        if (card) {
+            applyActivePostUpdate(card, post);
+        }
+    });
+    
+    stream.addEventListener('done', () => {
+        stream.close();
+        stream = null;
+    });
+    
+    stream.onerror = () => {
+        if (stream) {
+            stream.close();
+            stream = null;
+            startPollingActivePosts();
+        }
+    };
+}
+
+watchActivePosts();
+
 // Animate stat cards on load
 document.addEventListener('DOMContentLoaded', () => {
     const statCards = document.querySelectorAll('.stat-card');
@@ -39,6 +39,7 @@ const progressPercentage = document.getElementById('progressPercentage');
 const currentAgentName = document.getElementById('currentAgentName');
 const currentTaskDescription = document.getElementById('currentTaskDescription');
 const progressMessageText = document.getElementById('progressMessageText');
+const livePreview = document.getElementById('livePreview');
 
 // Character counters
 const audienceCount = document.getElementById('audienceCount');
@@ -46,6 +47,8 @@ const keyPointsCount = document.getElementById('keyPointsCount');
 const examplesCount = document.getElementById('examplesCount');
 
 let pollInterval = null;
+let progressStream = null;
+let contentStream = null;
 let currentPostId = null;
 let audienceTagList = [];
 let currentContent = '';
@@ -763,7 +766,7 @@ blogForm.addEventListener('submit', async (e) => {
         const data = await response.json();
         currentPostId = data.post_id;
         
-        startPolling(currentPostId);
+        startProgressUpdates(currentPostId);
         updateAgentStatus('researcher', 'active');
         
     } catch (error) {
@@ -774,13 +777,117 @@ blogForm.addEventListener('submit', async (e) => {
 
 // Stop button handler
 stopBtn.addEventListener('click', () => {
+    stopProgressUpdates();
+    resetForm();
+    showError('Generation stopped by user');
+});
+
+// Show the post text while the final task streams it
+function startContentStream(postId) {
+    if (!window.EventSource || !livePreview || contentStream) return;
+    
+    let text = '';
+    contentStream = new EventSource(`/api/post/${postId}/content-stream/`);
+    
+    contentStream.addEventListener('content', (event) => {
+        const data = JSON.parse(event.data);
+        text = text.substring(0, data.offset) + data.text;
+        livePreview.textContent = text;
+        livePreview.classList.remove('hidden');
+        livePreview.scrollTop = livePreview.scrollHeight;
+    });
+    
+    contentStream.addEventListener('reset', () => {
+        text = '';
+        livePreview.textContent = '';
+    });
+    
+    const closeContentStream = () => {
+        if (contentStream) {
+            contentStream.close();
+            contentStream = null;
+        }
+    };
+    contentStream.addEventListener('done', closeContentStream);
+    contentStream.onerror = closeContentStream;
+}
+
+// Stop listening for progress, whether streamed or polled
+function stopProgressUpdates() {
+    if (progressStream) {
+        progressStream.close();
+        progressStream = null;
+    }
+    if (contentStream) {
+        contentStream.close();
+        contentStream = null;
+    }
+    if (livePreview) {
+        livePreview.textContent = '';
+        livePreview.classList.add('hidden');
+    }
     if (pollInterval) {
         clearInterval(pollInterval);
         pollInterval = null;
     }
-    resetForm();
-    showError('Generation stopped by user');
-});
+}
+
+// Follow blog post progress over Server-Sent Events, falling back to polling
+function startProgressUpdates(postId) {
+    stopProgressUpdates();
+    
+    if (!window.EventSource) {
+        startPolling(postId);
+        return;
+    }
+    
+    progressStream = new EventSource(`/api/post/${postId}/events/`);
+    
+    progressStream.addEventListener('progress', async (event) => {
+        const data = JSON.parse(event.data);
+        
+        if (data.status === 'pending') {
+            updateQueueStatus(data.queue_position);
+        } else if (data.status === 'processing') {
+            updateProgressFromData(data);
+            startContentStream(postId);
+        } else if (data.status === 'completed' || data.status === 'failed') {
+            stopProgressUpdates();
+            // Progress events leave out the content; fetch the finished post once
+            try {
+                const response = await fetch(`/api/post/${postId}/`);
+                if (!response.ok) {
+                    throw new Error('Failed to fetch post status');
+                }
+                const post = await response.json();
+                if (post.status === 'completed') {
+                    showResult(post);
+                } else {
+                    showError(post.content || 'Blog post generation failed');
+                }
+            } catch (error) {
+                showError(error.message);
+            }
+            resetForm();
+        }
+    });
+    
+    progressStream.addEventListener('done', () => {
+        if (progressStream) {
+            progressStream.close();
+            progressStream = null;
+        }
+    });
+    
+    progressStream.onerror = () => {
+        // Stream unavailable or dropped: continue with polling
+        if (progressStream) {
+            progressStream.close();
+            progressStream = null;
+            startPolling(postId);
+        }
+    };
+}
 
 // Poll for blog post status
 function startPolling(postId) {
@@ -797,7 +904,10 @@ function startPolling(postId) {
             
             const data = await response.json();
             
-            if (data.status === 'processing') {
+            if (data.status === 'pending') {
+                // Waiting for a free generation worker
+                updateQueueStatus(data.queue_position);
+            } else if (data.status === 'processing') {
                 // Update progress from real data
                 updateProgressFromData(data);
             } else if (data.status === 'completed') {
@@ -818,6 +928,17 @@ function startPolling(postId) {
     }, 2000);
 }
 
+// Show queue position while the post waits for a generation worker
+function updateQueueStatus(queuePosition) {
+    updateProgressBar(0);
+    updateCurrentAgent('Queued', 'Waiting for a free generation worker...');
+    if (queuePosition) {
+        updateProgressMessage(`Position ${queuePosition} in the generation queue`);
+    } else {
+        updateProgressMessage('Waiting in the generation queue...');
+    }
+}
+
 // Update progress from API data
 function updateProgressFromData(data) {
     // Update progress bar
@@ -1174,10 +1295,7 @@ function resetForm() {
     currentPostId = null;
     enableForm();
     
-    if (pollInterval) {
-        clearInterval(pollInterval);
-        pollInterval = null;
-    }
+    stopProgressUpdates();
     
     // Reset progress display
     updateAgentStatus('researcher', 'waiting');
@@ -116,6 +116,7 @@ fetchModelsBtn?.addEventListener('click', async () => {
                         <div class="model-item">
                             <strong>${model.name}</strong>
                             <span class="model-size">${sizeGB} GB</span>
+                            ${model.parameter_size ? `<span class="model-size">${model.parameter_size}${model.quantization_level ? ` · ${model.quantization_level}` : ''}</span>` : ''}
                             ${model.modified_at ? `<span class="model-date">Modified: ${new Date(model.modified_at).toLocaleDateString()}</span>` : ''}
                         </div>
                     `;
@@ -124,6 +125,7 @@ fetchModelsBtn?.addEventListener('click', async () => {
                 testResults.innerHTML = `
                     <div class="test-success">
                         <strong>✓ Found ${data.count} Model(s)</strong><br>
+                        ${data.stale ? `<small>Cached list from ${new Date(data.fetched_at).toLocaleString()}; refreshing in the background.</small><br>` : ''}
                         <div class="models-list">
                             ${modelsList}
                         </div>
@@ -265,6 +267,7 @@ document.getElementById('addOllamaBtn')?.addEventListener('click', () => {
     document.getElementById('ollamaBaseUrl').value = 'http://localhost:11434';
     document.getElementById('ollamaModel').value = 'llama3';
     document.getElementById('ollamaTemperature').value = '0.7';
+    document.getElementById('ollamaKeepAlive').value = '30m';
     ollamaFormModal.classList.remove('hidden');
 });
 
@@ -279,6 +282,7 @@ window.editOllamaSettings = async function(settingsId) {
         document.getElementById('ollamaBaseUrl').value = setting.base_url;
         document.getElementById('ollamaModel').value = setting.model;
         document.getElementById('ollamaTemperature').value = setting.temperature;
+        document.getElementById('ollamaKeepAlive').value = setting.keep_alive;
         document.getElementById('ollamaIsActive').checked = setting.is_active;
         ollamaFormModal.classList.remove('hidden');
     } catch (error) {
@@ -311,6 +315,7 @@ ollamaForm?.addEventListener('submit', async (e) => {
         base_url: document.getElementById('ollamaBaseUrl').value,
         model: document.getElementById('ollamaModel').value,
         temperature: parseFloat(document.getElementById('ollamaTemperature').value),
+        keep_alive: document.getElementById('ollamaKeepAlive').value,
         is_active: document.getElementById('ollamaIsActive').checked,
     };
     
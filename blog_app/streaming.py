@@ -0,0 +1,330 @@
+import asyncio
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from .db_writer import run_write
+from .events import format_sse, TERMINAL_STATUSES
+from .models import PREVIEW_CHARS, BlogPost, BlogPostContent
+
+
+# Marker CrewAI agents put in front of their answer in ReAct-style responses
+FINAL_ANSWER_MARKER = 'Final Answer:'
+REASONING_PREFIX = 'Thought:'
+
+
+class ContentStreamBuffer:
+    """
+    In-memory buffer of the tokens streamed for a post's final task.
+
+    Chunks are appended as Ollama produces them and written to BlogPostContent.content
+    in batches (every ``flush_chars`` characters or ``flush_seconds``) instead of
+    once per token. Readers wait on the buffer for new text.
+
+    Appending is O(chunk): the buffer keeps the raw length and the offset of the
+    answer marker as chunks arrive, so the text is only joined to flush or read it.
+    """
+
+    def __init__(self, blog_post_id: int, flush_chars: int = 500, flush_seconds: float = 2.0):
+        """
+        Initialize the buffer.
+
+        Args:
+            blog_post_id: ID of the BlogPost the streamed content belongs to
+            flush_chars: Flush to the database after this many new characters
+            flush_seconds: Flush to the database at least this often while text arrives
+        """
+        self.blog_post_id = blog_post_id
+        self.flush_chars = flush_chars
+        self.flush_seconds = flush_seconds
+        self.version = 0
+        self.closed = False
+        self._chunks = []
+        self._response_id = None
+        self._length = 0
+        self._head = ''  # Start of the raw text, until it shows whether the model is reasoning
+        self._tail = ''  # End of the raw text, to find a marker split across chunks
+        self._answer_start = None  # Offset of the text after FINAL_ANSWER_MARKER
+        self._flushed_length = 0
+        self._last_flush = time.monotonic()
+        self._condition = threading.Condition()
+
+    def append(self, chunk: str, response_id: str = None):
+        """
+        Add a streamed chunk.
+
+        Args:
+            chunk: Text produced by the LLM
+            response_id: ID of the LLM response; a new ID restarts the buffer (retried call)
+        """
+        if not chunk:
+            return
+        with self._condition:
+            if response_id and response_id != self._response_id:
+                if self._response_id is not None:
+                    self._reset()
+                self._response_id = response_id
+            self._chunks.append(chunk)
+            self._track(chunk)
+            self.version += 1
+            self._condition.notify_all()
+        self._maybe_flush()
+
+    def _reset(self):
+        self._chunks = []
+        self._length = 0
+        self._head = ''
+        self._tail = ''
+        self._answer_start = None
+        self._flushed_length = 0
+
+    def _track(self, chunk: str):
+        """Update the length and marker offset for a chunk appended to the raw text."""
+        if self._answer_start is None:
+            window = self._tail + chunk
+            found = window.find(FINAL_ANSWER_MARKER)
+            if found >= 0:
+                self._answer_start = self._length - len(self._tail) + found + len(FINAL_ANSWER_MARKER)
+            self._tail = window[-(len(FINAL_ANSWER_MARKER) - 1):]
+        if len(self._head.lstrip()) < len(REASONING_PREFIX):
+            self._head += chunk
+        self._length += len(chunk)
+
+    def _reasoning(self) -> bool:
+        """Whether the model is still reasoning; the answer has not started yet."""
+        return self._answer_start is None and self._head.lstrip().startswith(REASONING_PREFIX)
+
+    def _text_length(self) -> int:
+        """Length of text, counting whitespace after the answer marker."""
+        if self._answer_start is not None:
+            return self._length - self._answer_start
+        return 0 if self._reasoning() else self._length
+
+    @property
+    def raw_text(self) -> str:
+        with self._condition:
+            if len(self._chunks) > 1:
+                self._chunks = [''.join(self._chunks)]
+            return self._chunks[0] if self._chunks else ''
+
+    @property
+    def text(self) -> str:
+        """Streamed text meant for readers, without the agent's reasoning preamble."""
+        with self._condition:
+            raw = self.raw_text
+            if self._answer_start is not None:
+                return raw[self._answer_start:].lstrip()
+            return '' if self._reasoning() else raw
+
+    def wait(self, version: int, timeout: float) -> bool:
+        """Block until the buffer changes past version or is closed. Returns True if it did."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.version != version or self.closed, timeout=timeout)
+
+    def _maybe_flush(self, force: bool = False):
+        with self._condition:
+            length = self._text_length()
+            pending = length - self._flushed_length
+            due = time.monotonic() - self._last_flush >= self.flush_seconds
+            if not length or (not force and pending < self.flush_chars and not (pending and due)):
+                return
+            self._flushed_length = length
+            self._last_flush = time.monotonic()
+            text = self.text
+        if not text:
+            return
+        try:
+            run_write(_write_content, self.blog_post_id, text, wait=False)
+        except Exception as e:
+            print(f"Error flushing streamed content: {e}")
+
+    def close(self):
+        """Flush remaining text and wake up readers."""
+        self._maybe_flush(force=True)
+        with self._condition:
+            self.closed = True
+            self.version += 1
+            self._condition.notify_all()
+
+
+def _write_content(blog_post_id: int, text: str):
+    # Only while generating: never overwrite the final content or an error. Only the
+    # body row is written; the word count and search index follow when the result is saved.
+    BlogPostContent.objects.filter(blog_post_id=blog_post_id, blog_post__status='processing').update(
+        content=text, preview=text[:PREVIEW_CHARS]
+    )
+
+
+_buffers = {}  # post id -> ContentStreamBuffer
+_buffers_by_task = {}  # CrewAI task id -> ContentStreamBuffer
+_buffers_lock = threading.Lock()
+_thread_state = threading.local()
+_listener_registered = False
+
+
+def _on_stream_chunk(source, event):
+    """CrewAI event bus handler: route a streamed chunk to the buffer of its task."""
+    buffer = None
+    task_id = getattr(event, 'task_id', None)
+    if task_id:
+        with _buffers_lock:
+            buffer = _buffers_by_task.get(task_id)
+    if buffer is None and not task_id:
+        # Older CrewAI releases don't tag chunks with their task; chunk handlers run
+        # on the thread making the LLM call, so fall back to the thread's active buffer
+        buffer = getattr(_thread_state, 'buffer', None)
+    if buffer is not None:
+        buffer.append(event.chunk, getattr(event, 'response_id', None))
+
+
+def _register_listener() -> bool:
+    """Subscribe to CrewAI stream chunk events once per process."""
+    global _listener_registered
+    with _buffers_lock:
+        if _listener_registered:
+            return True
+        import crewai  # noqa: F401  (initialise the package before its event modules)
+        try:
+            from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError:
+            try:
+                from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+            except ImportError:
+                print("Token streaming unavailable: this CrewAI version has no stream chunk events")
+                return False
+        crewai_event_bus.on(LLMStreamChunkEvent)(_on_stream_chunk)
+        _listener_registered = True
+        return True
+
+
+def start_content_stream(blog_post_id: int, crew_task):
+    """
+    Start capturing streamed tokens of a crew task for a post.
+
+    Args:
+        blog_post_id: ID of the BlogPost being generated
+        crew_task: CrewAI Task whose output becomes the post content
+
+    Returns:
+        The ContentStreamBuffer, or None if streaming is not supported
+    """
+    if not _register_listener():
+        return None
+    buffer = ContentStreamBuffer(blog_post_id)
+    with _buffers_lock:
+        _buffers[blog_post_id] = buffer
+        task_id = getattr(crew_task, 'id', None)
+        if task_id is not None:
+            _buffers_by_task[str(task_id)] = buffer
+    return buffer
+
+
+def activate_content_stream(buffer):
+    """Route chunks emitted on the current thread without a task id to buffer (None to stop)."""
+    _thread_state.buffer = buffer
+
+
+def finish_content_stream(blog_post_id: int):
+    """Stop capturing tokens for a post, flushing what was buffered."""
+    with _buffers_lock:
+        buffer = _buffers.pop(blog_post_id, None)
+        for task_id in [k for k, v in _buffers_by_task.items() if v is buffer]:
+            del _buffers_by_task[task_id]
+    if buffer is not None:
+        buffer.close()
+    if getattr(_thread_state, 'buffer', None) is buffer:
+        _thread_state.buffer = None
+
+
+def get_content_buffer(blog_post_id: int):
+    with _buffers_lock:
+        return _buffers.get(blog_post_id)
+
+
+class ContentStream:
+    """
+    Server-Sent Events stream of a post's content while it is generated.
+
+    Sends `content` events carrying the text appended since the previous event
+    (with its offset), a `reset` event if the model restarted its answer, and a
+    final `done` event with the post status. Text comes from the in-memory
+    buffer when the post is generated in this process, otherwise from the
+    batches flushed to BlogPostContent.content.
+    """
+
+    def __init__(self, blog_post_id: int, poll_interval: float = 1.0, keepalive_interval: float = 15.0):
+        self.blog_post_id = blog_post_id
+        self.poll_interval = poll_interval
+        self.keepalive_interval = keepalive_interval
+        self._sent = ''
+
+    def _messages_for(self, text: str) -> list:
+        messages = []
+        if not text.startswith(self._sent):
+            self._sent = ''
+            messages.append(format_sse('reset', {}))
+        if len(text) > len(self._sent):
+            messages.append(format_sse('content', {'offset': len(self._sent), 'text': text[len(self._sent):]}))
+            self._sent = text
+        return messages
+
+    def _read_database(self):
+        """Return (status, content) from the database, or (None, '') if the post is gone."""
+        row = BlogPost.objects.filter(id=self.blog_post_id).values('status', 'body__content').first()
+        close_old_connections()
+        if not row:
+            return None, ''
+        return row['status'], (row['body__content'] or '') if row['status'] == 'processing' else ''
+
+    def _step(self):
+        """Collect messages for the current state. Returns (messages, finished status or None)."""
+        buffer = get_content_buffer(self.blog_post_id)
+        if buffer is not None and not buffer.closed:
+            return self._messages_for(buffer.text), None
+        status, content = self._read_database()
+        if status is None or status in TERMINAL_STATUSES:
+            return [], status or 'deleted'
+        return self._messages_for(content), None
+
+    def __iter__(self):
+        last_write = time.monotonic()
+        while True:
+            messages, finished = self._step()
+            if finished:
+                yield format_sse('done', {'id': self.blog_post_id, 'status': finished})
+                return
+            now = time.monotonic()
+            if not messages and now - last_write >= self.keepalive_interval:
+                messages = [': keep-alive\n\n']
+            if messages:
+                last_write = now
+                yield from messages
+            buffer = get_content_buffer(self.blog_post_id)
+            if buffer is not None:
+                buffer.wait(buffer.version, timeout=self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+
+    async def __aiter__(self):
+        step = sync_to_async(self._step)
+        last_write = time.monotonic()
+        while True:
+            messages, finished = await step()
+            if finished:
+                yield format_sse('done', {'id': self.blog_post_id, 'status': finished})
+                return
+            now = time.monotonic()
+            if not messages and now - last_write >= self.keepalive_interval:
+                messages = [': keep-alive\n\n']
+            for message in messages:
+                last_write = now
+                yield message
+            buffer = get_content_buffer(self.blog_post_id)
+            if buffer is not None:
+                # Short sleeps keep latency low without parking a thread on the buffer
+                version = buffer.version
+                deadline = time.monotonic() + self.poll_interval
+                while buffer.version == version and time.monotonic() < deadline:
+                    await asyncio.sleep(0.1)
+            else:
+                await asyncio.sleep(self.poll_interval)
@@ -0,0 +1,36 @@
+import time
+from django.test import TransactionTestCase, override_settings
+from blog_app.models import BlogPost
+from blog_app.progress_store import progress_store
+from blog_app.workers import GenerationWorkerPool
+
+FLUSH_INTERVAL = 0.3
+
+
+@override_settings(PROGRESS_FLUSH_INTERVAL=FLUSH_INTERVAL, GENERATION_WORKER_MODE='thread')
+class ProgressFlushTests(TransactionTestCase):
+    """Progress kept in memory reaches the BlogPost row without waiting for another change."""
+
+    def setUp(self):
+        self.post = BlogPost.objects.create(topic='Topic', status='processing')
+        self.pool = GenerationWorkerPool(max_workers=1, max_queue_size=5, poll_interval=60)
+
+    def tearDown(self):
+        self.pool.shutdown(wait=True)
+        progress_store.finish(self.post.id)
+
+    def test_last_update_is_flushed_within_an_interval(self):
+        progress_store.begin(self.post)
+        # Right after begin(), so update() itself doesn't flush it
+        progress_store.update(self.post.id, progress_message='Writing', progress_percentage=40)
+        updated_at = time.monotonic()
+        self.pool.start()
+
+        deadline = updated_at + FLUSH_INTERVAL * 3
+        while time.monotonic() < deadline:
+            row = BlogPost.objects.values('progress_message', 'progress_percentage').get(id=self.post.id)
+            if row['progress_message'] == 'Writing':
+                break
+            time.sleep(0.05)
+        self.assertEqual(row, {'progress_message': 'Writing', 'progress_percentage': 40})
+        self.assertLess(time.monotonic() - updated_at, FLUSH_INTERVAL * 2)
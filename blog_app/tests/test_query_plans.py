@@ -0,0 +1,82 @@
+from django.core.signals import request_started
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from blog_app.models import BlogPost, BlogPostContent
+
+# Pages whose post queries must use an index, covering each filter and sort they offer.
+# Sorting by updated_at scans the table: the column changes on every progress flush,
+# so it is deliberately left unindexed.
+PAGES = [
+    '/',
+    '/history/',
+    '/history/?sort=created_at',
+    '/history/?sort=word_count',
+    '/history/?status=completed',
+    '/history/?saved=true',
+    '/history/?tone=casual',
+    '/history/?status=completed&sort=-word_count',
+    '/api/posts/',
+    '/api/posts/?status=failed',
+    '/api/posts/?saved=true',
+]
+
+TABLES = (BlogPost._meta.db_table, BlogPostContent._meta.db_table)
+
+
+def table_scans(sql: str) -> list:
+    """Steps of the query plan of sql that read the whole posts or post content table."""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            steps = [row[-1] for row in cursor.fetchall()]
+            return [
+                step for step in steps
+                if any(step.startswith(f'SCAN {table}') for table in TABLES) and 'INDEX' not in step
+            ]
+        # With few rows a sequential scan is always cheapest; ask whether an index can be used.
+        # SET LOCAL only lasts until the end of the transaction, so it needs one.
+        with transaction.atomic():
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            steps = [row[0].strip() for row in cursor.fetchall()]
+        return [step for step in steps if any(f'Seq Scan on {table} ' in f'{step} ' for table in TABLES)]
+
+
+class QueryPlanTests(TestCase):
+    """Queries on the posts table use an index instead of scanning the table."""
+
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise cls.failureException(
+                f'Query plans can only be checked on SQLite and PostgreSQL, not {connection.vendor}'
+            )
+        super().setUpClass()
+        # Rendering pages must not start the generation workers
+        request_started.disconnect(dispatch_uid='blog_app_start_worker_pool')
+
+    @classmethod
+    def setUpTestData(cls):
+        for index, (status, tone) in enumerate([
+            ('completed', 'friendly'), ('completed', 'casual'), ('failed', 'formal'), ('pending', 'friendly'),
+        ]):
+            BlogPost.objects.create(
+                topic=f'Topic {index}', title=f'Title {index}', status=status, tone=tone,
+                is_saved=index % 2 == 0, content=f'Content of post {index}',
+            )
+
+    def test_post_queries_use_an_index(self):
+        table = BlogPost._meta.db_table
+        for url in PAGES:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                post_queries = [
+                    query['sql'] for query in queries
+                    if query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+                ]
+                self.assertTrue(post_queries, 'no query on the posts table')
+                for sql in post_queries:
+                    self.assertEqual(table_scans(sql), [], sql)
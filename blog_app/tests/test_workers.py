@@ -0,0 +1,158 @@
+import os
+import signal
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from blog_app.models import BlogPost, GenerationJob
+from blog_app.workers import QueueFull, claim_next_job, enqueue_generation, recover_orphaned_jobs, renew_leases
+
+
+def queue_job(topic: str, **fields) -> GenerationJob:
+    """Create a post with a generation job (queued unless fields say otherwise)."""
+    post = BlogPost.objects.create(topic=topic, status='pending')
+    return GenerationJob.objects.create(blog_post=post, params={'topic': topic}, **fields)
+
+
+class EnqueueGenerationTests(TestCase):
+    """Queue admission never lets the queue grow past max_queue_size."""
+
+    def test_full_queue_rejects_and_rolls_back(self):
+        posts = [BlogPost.objects.create(topic=f'Topic {index}') for index in range(3)]
+        for post in posts[:2]:
+            enqueue_generation(post, {'topic': post.topic}, max_queue_size=2)
+
+        with self.assertRaises(QueueFull):
+            enqueue_generation(posts[2], {'topic': posts[2].topic}, max_queue_size=2)
+        self.assertEqual(GenerationJob.objects.filter(status='queued').count(), 2)
+        self.assertFalse(GenerationJob.objects.filter(blog_post=posts[2]).exists())
+
+
+class ClaimNextJobTests(TestCase):
+    """Jobs are claimed oldest first, and by one worker only."""
+
+    def test_claims_oldest_job_with_a_lease(self):
+        oldest, newer = queue_job('Oldest'), queue_job('Newer')
+
+        job = claim_next_job('worker-a', lease_seconds=60)
+
+        self.assertEqual(job.id, oldest.id)
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.worker_id, 'worker-a')
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.lease_expires_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(GenerationJob.objects.get(id=newer.id).status, 'queued')
+
+    def test_claimers_never_get_the_same_job(self):
+        first, second = queue_job('First'), queue_job('Second')
+        original_first = QuerySet.first
+        claimed = {}
+
+        def read_then_lose_race(queryset):
+            # Worker B claims the job worker A has just read, before A's claim
+            job = original_first(queryset)
+            if 'worker-b' not in claimed:
+                claimed['worker-b'] = None
+                claimed['worker-b'] = claim_next_job('worker-b', lease_seconds=60)
+            return job
+
+        with mock.patch.object(QuerySet, 'first', read_then_lose_race):
+            claimed['worker-a'] = claim_next_job('worker-a', lease_seconds=60)
+
+        self.assertEqual(claimed['worker-b'].id, first.id)
+        self.assertEqual(claimed['worker-a'].id, second.id)
+        self.assertEqual(GenerationJob.objects.get(id=first.id).worker_id, 'worker-b')
+        self.assertEqual(GenerationJob.objects.get(id=second.id).worker_id, 'worker-a')
+        self.assertIsNone(claim_next_job('worker-c', lease_seconds=60))
+
+
+class LeaseTests(TestCase):
+    """Heartbeats keep a lease alive; expired leases are retried, then failed."""
+
+    def running_job(self, topic: str, attempts: int, lease_expires_at) -> GenerationJob:
+        job = queue_job(topic, status='running', worker_id='worker-a', attempts=attempts,
+                        lease_expires_at=lease_expires_at)
+        BlogPost.objects.filter(id=job.blog_post_id).update(status='processing')
+        return job
+
+    def test_heartbeat_extends_lease(self):
+        expires_soon = timezone.now() + timedelta(seconds=1)
+        job = self.running_job('Running', attempts=1, lease_expires_at=expires_soon)
+        queued = queue_job('Queued')
+
+        renewed = renew_leases([job.id, queued.id], lease_seconds=60)
+
+        self.assertEqual(renewed, 1)
+        job.refresh_from_db()
+        self.assertGreater(job.lease_expires_at, expires_soon + timedelta(seconds=50))
+        self.assertIsNotNone(job.heartbeat_at)
+        queued.refresh_from_db()
+        self.assertIsNone(queued.lease_expires_at)
+
+    def test_expired_lease_is_requeued_while_attempts_remain(self):
+        job = self.running_job('Retry', attempts=1, lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(recover_orphaned_jobs(max_attempts=2), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(job.worker_id, '')
+        self.assertIsNone(job.lease_expires_at)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(BlogPost.objects.get(id=job.blog_post_id).status, 'pending')
+
+    def test_expired_lease_fails_after_max_attempts(self):
+        job = self.running_job('Give up', attempts=2, lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(recover_orphaned_jobs(max_attempts=2), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNotNone(job.finished_at)
+        post = BlogPost.objects.get(id=job.blog_post_id)
+        self.assertEqual(post.status, 'failed')
+        self.assertIn('after 2 attempt(s)', post.content)
+
+    def test_live_lease_is_left_alone(self):
+        job = self.running_job('Live', attempts=1, lease_expires_at=timezone.now() + timedelta(seconds=60))
+
+        self.assertEqual(recover_orphaned_jobs(max_attempts=2), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    """manage.py run_workers generates queued posts until it is asked to stop."""
+
+    def setUp(self):
+        handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+        for signum, handler in handlers.items():
+            self.addCleanup(signal.signal, signum, handler)
+
+    def test_generates_queued_job_and_stops_on_sigterm(self):
+        job = queue_job('Queued')
+
+        def stop_when_done():
+            deadline = timezone.now() + timedelta(seconds=10)
+            while timezone.now() < deadline:
+                if GenerationJob.objects.filter(id=job.id, status='completed').exists():
+                    break
+                threading.Event().wait(0.05)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        stopper = threading.Thread(target=stop_when_done)
+        out = StringIO()
+        with mock.patch('blog_app.workers.run_generation', return_value=True) as run_generation:
+            stopper.start()
+            call_command('run_workers', workers=1, poll_interval=0.1, stdout=out)
+        stopper.join()
+
+        run_generation.assert_called_once_with(job.blog_post_id, {'topic': 'Queued'})
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('Generation workers stopped', out.getvalue())
@@ -11,8 +11,14 @@ urlpatterns = [
     path('api/post/<int:post_id>/', views.get_post, name='get_post'),
     path('api/post/<int:post_id>/save/', views.save_post, name='save_post'),
     path('api/post/<int:post_id>/update/', views.update_post, name='update_post'),
+    path('api/post/<int:post_id>/events/', views.post_events, name='post_events'),
+    path('api/post/<int:post_id>/content-stream/', views.post_content_stream, name='post_content_stream'),
+    path('api/post/<int:post_id>/revisions/', views.post_revisions, name='post_revisions'),
+    path('api/post/<int:post_id>/revisions/<int:number>/', views.post_revision_detail, name='post_revision_detail'),
     path('api/posts/', views.list_posts, name='list_posts'),
+    path('api/posts/events/', views.posts_events, name='posts_events'),
     path('api/posts/search/', views.search_posts, name='search_posts'),
+    path('api/generation-cache/', views.generation_cache_detail, name='generation_cache_detail'),
     # Agent endpoints
     path('api/agents/', views.agent_list, name='agent_list'),
     path('api/agents/<int:agent_id>/', views.agent_detail, name='agent_detail'),
@@ -29,5 +35,9 @@ urlpatterns = [
     path('api/ollama-settings/test-connection/', views.test_ollama_connection, name='test_ollama_connection'),
     path('api/ollama-settings/fetch-models/', views.fetch_ollama_models, name='fetch_ollama_models'),
     path('api/ollama-settings/test-model/', views.test_ollama_model, name='test_ollama_model'),
+    # Ollama backend pool endpoints
+    path('api/ollama-backends/', views.ollama_backend_list, name='ollama_backend_list'),
+    path('api/ollama-backends/<int:backend_id>/', views.ollama_backend_detail, name='ollama_backend_detail'),
+    path('api/ollama-backends/status/', views.ollama_backend_status, name='ollama_backend_status'),
 ]
 
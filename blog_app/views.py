@@ -1,16 +1,33 @@
-import threading
-import requests
+import json
+import httpx
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
-from django.db import models
+from django.conf import settings as django_settings
+from django.db import models, transaction
+from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .models import BlogPost, Agent, Task, CrewConfig, OllamaSettings
+from .models import BlogPost, BlogPostRevision, Agent, Task, CrewConfig, OllamaSettings, OllamaBackend
 from .serializers import (
-    BlogPostSerializer, BlogPostCreateSerializer,
-    AgentSerializer, TaskSerializer, CrewConfigSerializer, OllamaSettingsSerializer
+    BlogPostSerializer, BlogPostListSerializer, BlogPostCreateSerializer, BlogPostRevisionSerializer,
+    AgentSerializer, TaskSerializer, CrewConfigSerializer, OllamaSettingsSerializer,
+    OllamaBackendSerializer
 )
-from .agents.crew_setup import generate_blog_post, get_ollama_llm
+from .agents.crew_setup import get_ollama_llm
+from .workers import get_worker_pool, aget_queue_position, get_queue_positions, QueueFull, PoolShutDown
+from .events import ProgressStream
+from . import generation_cache
+from .streaming import ContentStream
+from .crew_plans import get_llm_config
+from .ollama_client import aollama_post
+from .ollama_pool import acheck_ollama, get_backend_pool
+from . import model_catalog
+from . import search
+from .pagination import paginate, get_page_size, InvalidCursor
+from .revisions import get_revision_content, record_revision
 
 
 def index(request):
@@ -18,49 +35,57 @@ def index(request):
     from django.utils import timezone
     from datetime import timedelta
     
-    # Get stats
-    total_posts = BlogPost.objects.count()
-    completed_posts = BlogPost.objects.filter(status='completed').count()
-    processing_posts = BlogPost.objects.filter(status='processing').count()
-    pending_posts = BlogPost.objects.filter(status='pending').count()
-    failed_posts = BlogPost.objects.filter(status='failed').count()
-    saved_posts = BlogPost.objects.filter(is_saved=True).count()
+    week_ago = timezone.now() - timedelta(days=7)
+    completed = models.Q(status='completed')
+    
+    # All counts and the word total in one query
+    totals = BlogPost.objects.aggregate(
+        total_posts=models.Count('id'),
+        completed_posts=models.Count('id', filter=completed),
+        processing_posts=models.Count('id', filter=models.Q(status='processing')),
+        pending_posts=models.Count('id', filter=models.Q(status='pending')),
+        failed_posts=models.Count('id', filter=models.Q(status='failed')),
+        saved_posts=models.Count('id', filter=models.Q(is_saved=True)),
+        posts_last_week=models.Count('id', filter=models.Q(created_at__gte=week_ago)),
+        total_words=models.Sum('word_count', filter=completed, default=0),
+    )
+    total_posts = totals['total_posts']
+    completed_posts = totals['completed_posts']
+    total_words = totals['total_words']
     
     # Recent posts
-    recent_posts = BlogPost.objects.filter(status='completed').order_by('-created_at')[:6]
+    recent_posts = BlogPost.objects.filter(status='completed').defer('task_timings').annotate(
+        preview=models.F('body__preview')
+    ).order_by('-created_at')[:6]
     
     # Processing posts (for activity feed)
-    active_posts = BlogPost.objects.filter(status__in=['processing', 'pending']).order_by('-created_at')[:5]
-    
-    # Calculate total words and average
-    completed_posts_list = BlogPost.objects.filter(status='completed')
-    total_words = sum(post.word_count for post in completed_posts_list)
-    avg_words = int(total_words / completed_posts_list.count()) if completed_posts_list.count() > 0 else 0
+    active_posts = BlogPost.objects.filter(status__in=['processing', 'pending']).only(
+        'id', 'topic', 'status', 'progress_percentage', 'current_agent', 'created_at'
+    ).order_by('-created_at')[:5]
     
-    # Posts created in last 7 days
-    week_ago = timezone.now() - timedelta(days=7)
-    posts_last_week = BlogPost.objects.filter(created_at__gte=week_ago).count()
+    # Average words per completed post
+    avg_words = int(total_words / completed_posts) if completed_posts > 0 else 0
     
     # Success rate
     success_rate = int((completed_posts / total_posts * 100)) if total_posts > 0 else 0
     
     # Most used tone
     tone_counts = {}
-    for post in completed_posts_list:
-        tone = post.tone or 'friendly'
-        tone_counts[tone] = tone_counts.get(tone, 0) + 1
+    for row in BlogPost.objects.filter(completed).values('tone').annotate(count=models.Count('id')).order_by():
+        tone = row['tone'] or 'friendly'
+        tone_counts[tone] = tone_counts.get(tone, 0) + row['count']
     most_used_tone = max(tone_counts.items(), key=lambda x: x[1])[0] if tone_counts else 'friendly'
     
     stats = {
         'total_posts': total_posts,
         'completed_posts': completed_posts,
-        'processing_posts': processing_posts,
-        'pending_posts': pending_posts,
-        'failed_posts': failed_posts,
-        'saved_posts': saved_posts,
+        'processing_posts': totals['processing_posts'],
+        'pending_posts': totals['pending_posts'],
+        'failed_posts': totals['failed_posts'],
+        'saved_posts': totals['saved_posts'],
         'total_words': total_words,
         'avg_words': avg_words,
-        'posts_last_week': posts_last_week,
+        'posts_last_week': totals['posts_last_week'],
         'success_rate': success_rate,
         'most_used_tone': most_used_tone,
         'recent_posts': recent_posts,
@@ -75,15 +100,28 @@ def new_post(request):
     return render(request, 'blog_app/index.html')
 
 
+@ensure_csrf_cookie
 def settings(request):
     """Render the settings page."""
     return render(request, 'blog_app/settings.html')
 
 
+# Sort keys accepted by the history page and the post list API
+POST_SORT_FIELDS = ('-created_at', 'created_at', '-updated_at', 'updated_at', '-word_count', 'word_count')
+
+
+def _page_url(request, **cursor) -> str:
+    """Current URL with the pagination cursor replaced."""
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params.update({key: value for key, value in cursor.items() if value})
+    return f"{request.path}?{params.urlencode()}"
+
+
+@ensure_csrf_cookie
 def history(request):
     """Render the history page with all blog posts."""
-    from django.db.models import Q
-    
     # Get filter parameters
     status_filter = request.GET.get('status', '')
     saved_filter = request.GET.get('saved', '')
@@ -107,52 +145,38 @@ def history(request):
     if tone_filter:
         posts = posts.filter(tone=tone_filter)
     
-    # Apply search
+    # Apply search through the full-text index
     if search_query:
-        posts = posts.filter(
-            Q(topic__icontains=search_query) |
-            Q(title__icontains=search_query) |
-            Q(content__icontains=search_query)
-        )
+        posts = search.filter_posts(posts, search_query)
     
-    # Apply sorting - convert to list first
-    posts_list = list(posts)
-    
-    # Sort based on sort_by parameter
-    if sort_by == '-word_count':
-        posts_list.sort(key=lambda p: p.word_count, reverse=True)
-    elif sort_by == 'word_count':
-        posts_list.sort(key=lambda p: p.word_count, reverse=False)
-    elif sort_by == '-created_at':
-        posts_list.sort(key=lambda p: p.created_at, reverse=True)
-    elif sort_by == 'created_at':
-        posts_list.sort(key=lambda p: p.created_at, reverse=False)
-    elif sort_by == '-updated_at':
-        posts_list.sort(key=lambda p: p.updated_at, reverse=True)
-    elif sort_by == 'updated_at':
-        posts_list.sort(key=lambda p: p.updated_at, reverse=False)
-    else:
-        # Default: newest first
-        posts_list.sort(key=lambda p: p.created_at, reverse=True)
-    
-    posts = posts_list
+    # Sort in the database and fetch one page by keyset, without the post bodies
+    if sort_by not in POST_SORT_FIELDS:
+        sort_by = '-created_at'
+    posts = posts.defer('task_timings').annotate(preview=models.F('body__preview'))
+    page_size = get_page_size(request.GET.get('page_size'), getattr(django_settings, 'HISTORY_PAGE_SIZE', 24))
+    try:
+        page = paginate(posts, sort_by, page_size,
+                        after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        page = paginate(posts, sort_by, page_size)
     
     # Get statistics for filters
-    all_posts = BlogPost.objects.all()
-    stats = {
-        'total': all_posts.count(),
-        'completed': all_posts.filter(status='completed').count(),
-        'processing': all_posts.filter(status='processing').count(),
-        'pending': all_posts.filter(status='pending').count(),
-        'failed': all_posts.filter(status='failed').count(),
-        'saved': all_posts.filter(is_saved=True).count(),
-    }
+    stats = BlogPost.objects.aggregate(
+        total=models.Count('id'),
+        completed=models.Count('id', filter=models.Q(status='completed')),
+        processing=models.Count('id', filter=models.Q(status='processing')),
+        pending=models.Count('id', filter=models.Q(status='pending')),
+        failed=models.Count('id', filter=models.Q(status='failed')),
+        saved=models.Count('id', filter=models.Q(is_saved=True)),
+    )
     
     # Get unique tones for filter
-    tones = BlogPost.objects.exclude(tone='').values_list('tone', flat=True).distinct()
+    tones = BlogPost.objects.exclude(tone='').order_by('tone').values_list('tone', flat=True).distinct()
     
     return render(request, 'blog_app/history.html', {
-        'posts': posts,
+        'posts': page,
+        'next_url': _page_url(request, after=page.next_cursor) if page.has_next else '',
+        'previous_url': _page_url(request, before=page.previous_cursor) if page.has_previous else '',
         'stats': stats,
         'tones': tones,
         'current_filters': {
@@ -167,7 +191,7 @@ def history(request):
 
 def edit_post(request, post_id):
     """Render the edit page for a specific blog post."""
-    post = get_object_or_404(BlogPost, id=post_id)
+    post = get_object_or_404(BlogPost.objects.select_related('body'), id=post_id)
     return render(request, 'blog_app/edit.html', {'post': post})
 
 
@@ -182,9 +206,11 @@ def generate_post(request):
         "target_audience": ["tag1", "tag2"] (optional),
         "key_points": "string" (optional),
         "examples": "string" (optional),
-        "tone": "friendly" (optional)
+        "tone": "friendly" (optional),
+        "bypass_cache": false (optional)
     }
-    Returns: {"post_id": int, "status": "processing"}
+    Returns: {"post_id": int, "status": "pending", "queue_position": int, "cached": false}
+    Responds 429 when the generation queue is full and 503 when workers are unavailable.
     """
     serializer = BlogPostCreateSerializer(data=request.data)
     if not serializer.is_valid():
@@ -192,7 +218,38 @@ def generate_post(request):
     
     validated_data = serializer.validated_data
     
-    # Create blog post record
+    # Serve identical earlier generations without queueing (opt-in)
+    if generation_cache.is_enabled() and not validated_data.get('bypass_cache'):
+        cached = generation_cache.lookup(generation_cache.get_cache_key(validated_data))
+        if cached:
+            with transaction.atomic():
+                blog_post = BlogPost.objects.create(
+                    topic=validated_data['topic'],
+                    subtitle=validated_data.get('subtitle', ''),
+                    target_audience=validated_data.get('target_audience', []),
+                    key_points=validated_data.get('key_points', ''),
+                    examples=validated_data.get('examples', ''),
+                    tone=validated_data.get('tone', 'friendly'),
+                    content=cached.content,
+                    title=cached.title,
+                    status='completed',
+                    progress_message='Served from generation cache',
+                    progress_percentage=100,
+                )
+                record_revision(blog_post, 'generated')
+            return Response({
+                'post_id': blog_post.id,
+                'status': blog_post.status,
+                'queue_position': None,
+                'cached': True,
+            }, status=status.HTTP_201_CREATED)
+    
+    # Admission control: refuse work up front when the generation queue is full
+    pool = get_worker_pool()
+    if not pool.has_capacity():
+        return _queue_rejection_response(pool)
+    
+    # Create blog post record; it stays pending until a worker picks it up
     blog_post = BlogPost.objects.create(
         topic=validated_data['topic'],
         subtitle=validated_data.get('subtitle', ''),
@@ -200,88 +257,88 @@ def generate_post(request):
         key_points=validated_data.get('key_points', ''),
         examples=validated_data.get('examples', ''),
         tone=validated_data.get('tone', 'friendly'),
-        status='processing'
+        status='pending'
     )
     
-    # Start blog post generation in background thread
-    def generate_in_background():
-        try:
-            blog_post.status = 'processing'
-            blog_post.save()
-            
-            # Generate blog post using CrewAI with all parameters
-            content = generate_blog_post(
-                topic=validated_data['topic'],
-                subtitle=validated_data.get('subtitle', ''),
-                target_audience=validated_data.get('target_audience', []),
-                key_points=validated_data.get('key_points', ''),
-                examples=validated_data.get('examples', ''),
-                tone=validated_data.get('tone', 'friendly'),
-                length=validated_data.get('length', 'medium'),
-                crew_config_id=validated_data.get('crew_config_id'),
-                blog_post_id=blog_post.id
-            )
-            
-            # Extract title from content
-            import re
-            title_match = re.search(r'^#\s*(.+)$', content, re.MULTILINE) if content else None
-            title = title_match.group(1).strip() if title_match else validated_data['topic']
-            
-            # Update blog post with generated content
-            blog_post.content = content
-            blog_post.title = title
-            blog_post.status = 'completed'
-            blog_post.save()
-        except Exception as e:
-            # Update status to failed on error
-            blog_post.status = 'failed'
-            blog_post.content = f"Error: {str(e)}"
-            blog_post.progress_message = f"Error occurred: {str(e)}"
-            blog_post.progress_percentage = 0
-            blog_post.save()
-    
-    # Start background thread
-    thread = threading.Thread(target=generate_in_background)
-    thread.daemon = True
-    thread.start()
+    try:
+        queue_position = pool.submit(blog_post, dict(validated_data))
+    except (QueueFull, PoolShutDown):
+        # Lost the race for the last queue slot
+        blog_post.delete()
+        return _queue_rejection_response(pool)
     
     return Response({
         'post_id': blog_post.id,
-        'status': blog_post.status
+        'status': blog_post.status,
+        'queue_position': queue_position,
+        'cached': False,
     }, status=status.HTTP_201_CREATED)
 
 
 @api_view(['GET', 'DELETE'])
-def get_post(request, post_id):
+def generation_cache_detail(request):
+    """Get generation cache statistics, or clear the cache."""
+    if request.method == 'DELETE':
+        deleted = generation_cache.clear()
+        return Response({'deleted': deleted})
+    return Response(generation_cache.stats())
+
+
+def _queue_rejection_response(pool):
+    """Build the 429/503 response returned when a generation request is not admitted."""
+    pool_stats = pool.stats()
+    if not pool_stats['accepting']:
+        return Response(
+            {'error': 'Blog post generation is temporarily unavailable. Please try again later.'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={'Retry-After': '60'}
+        )
+    return Response(
+        {
+            'error': 'Too many blog posts are waiting to be generated. Please try again shortly.',
+            'queued': pool_stats['queued'],
+            'max_queue_size': pool_stats['max_queue_size'],
+        },
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': '30'}
+    )
+
+
+# Async views: polled often and wait on the database or Ollama, so under ASGI they
+# run on the event loop instead of holding a worker thread each. DRF's @api_view
+# does not support async views. Unlike DRF views they go through CsrfViewMiddleware,
+# so DELETE and POST requests need the X-CSRFToken header; the history and
+# settings pages set the csrftoken cookie the scripts read it from.
+async def get_post(request, post_id):
     """
     Get blog post by ID, or delete it.
     
     Returns: Blog post data with status and content
     """
+    if request.method not in ('GET', 'DELETE'):
+        return HttpResponseNotAllowed(['GET', 'DELETE'])
     try:
-        blog_post = BlogPost.objects.get(id=post_id)
-        
-        if request.method == 'DELETE':
-            blog_post.delete()
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        
-        serializer = BlogPostSerializer(blog_post)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        blog_post = await BlogPost.objects.select_related('body').aget(id=post_id)
     except BlogPost.DoesNotExist:
-        return Response(
-            {'error': 'Blog post not found'},
-            status=status.HTTP_404_NOT_FOUND
-        )
+        return JsonResponse({'error': 'Blog post not found'}, status=404)
+    
+    if request.method == 'DELETE':
+        await blog_post.adelete()
+        return HttpResponse(status=204)
+    
+    queue_position = await aget_queue_position(post_id) if blog_post.status == 'pending' else None
+    serializer = BlogPostSerializer(blog_post, context={'queue_position': queue_position})
+    return JsonResponse(serializer.data)
 
 
 @api_view(['POST'])
 def save_post(request, post_id):
     """Save a blog post."""
-    post = get_object_or_404(BlogPost, id=post_id)
+    post = get_object_or_404(BlogPost.objects.select_related('body'), id=post_id)
     post.is_saved = True
     if 'title' in request.data:
         post.title = request.data['title']
-    post.save()
+    post.save(update_fields=['is_saved', 'title', 'updated_at'])
     serializer = BlogPostSerializer(post)
     return Response(serializer.data)
 
@@ -289,54 +346,179 @@ def save_post(request, post_id):
 @api_view(['PUT'])
 def update_post(request, post_id):
     """Update a blog post's content."""
-    post = get_object_or_404(BlogPost, id=post_id)
-    
-    if 'content' in request.data:
-        post.content = request.data['content']
-    if 'title' in request.data:
-        post.title = request.data['title']
-    if 'topic' in request.data:
-        post.topic = request.data['topic']
-    
-    post.save()
+    post = get_object_or_404(BlogPost.objects.select_related('body'), id=post_id)
+    
+    # Only write the fields sent; word count and reading time follow content
+    update_fields = ['updated_at']
+    for field in ('content', 'title', 'topic'):
+        if field in request.data:
+            setattr(post, field, request.data[field])
+            update_fields.append(field)
+    
+    with transaction.atomic():
+        post.save(update_fields=update_fields)
+        if 'content' in update_fields or 'title' in update_fields:
+            record_revision(post, 'edited')
     serializer = BlogPostSerializer(post)
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+def post_revisions(request, post_id):
+    """List the revisions of a blog post's content, newest first, without their content."""
+    get_object_or_404(BlogPost.objects.only('id'), id=post_id)
+    revisions = BlogPostRevision.objects.filter(blog_post_id=post_id).defer('data').order_by('-number')
+    serializer = BlogPostRevisionSerializer(revisions, many=True)
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+def post_revision_detail(request, post_id, number):
+    """Get one revision of a blog post with its content."""
+    revision = get_object_or_404(BlogPostRevision, blog_post_id=post_id, number=number)
+    data = BlogPostRevisionSerializer(revision).data
+    data['content'] = get_revision_content(revision)
+    return Response(data)
+
+
+def _list_context(serializer, posts) -> dict:
+    """Serializer context for a page of posts: their queue positions, read in one query."""
+    if 'queue_position' not in serializer.fields:
+        return {}
+    return {'queue_positions': get_queue_positions(post.id for post in posts if post.status == 'pending')}
+
+
 @api_view(['GET'])
 def list_posts(request):
-    """List all blog posts with optional filters."""
+    """
+    List blog posts with optional filters, one page at a time.
+    
+    Query parameters: status, saved, sort (see POST_SORT_FIELDS), page_size,
+    after/before (cursors from the previous response) and fields (comma-separated).
+    """
     status_filter = request.GET.get('status', None)
     saved_filter = request.GET.get('saved', None)
+    sort_by = request.GET.get('sort', '-created_at')
+    if sort_by not in POST_SORT_FIELDS:
+        return Response(
+            {'error': f"Invalid sort. Use one of: {', '.join(POST_SORT_FIELDS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    posts = BlogPost.objects.all()
+    fields = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    serializer = BlogPostListSerializer(fields=fields)
+    
+    # Only read the columns the selected fields need
+    posts = serializer.only(BlogPost.objects.all(), sort_by.lstrip('-'))
     
     if status_filter:
         posts = posts.filter(status=status_filter)
     if saved_filter == 'true':
         posts = posts.filter(is_saved=True)
     
-    posts = posts.order_by('-created_at')
-    serializer = BlogPostSerializer(posts, many=True)
-    return Response(serializer.data)
+    page_size = get_page_size(request.GET.get('page_size'), getattr(django_settings, 'API_PAGE_SIZE', 20))
+    try:
+        page = paginate(posts, sort_by, page_size,
+                        after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    context = _list_context(serializer, page.items)
+    return Response({
+        'results': BlogPostListSerializer(page.items, many=True, fields=fields, context=context).data,
+        'next': request.build_absolute_uri(_page_url(request, after=page.next_cursor)) if page.has_next else None,
+        'previous': request.build_absolute_uri(_page_url(request, before=page.previous_cursor)) if page.has_previous else None,
+    })
 
 
 @api_view(['GET'])
 def search_posts(request):
-    """Search blog posts by topic or content."""
+    """
+    Search blog posts by topic, title or content through the full-text index.
+    
+    Returns the best matches first, each with an HTML snippet of the matching text.
+    """
     query = request.GET.get('q', '').strip()
     
-    if not query:
+    if not search.get_terms(query):
         return Response({'error': 'Query parameter required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    posts = BlogPost.objects.filter(
-        models.Q(topic__icontains=query) | 
-        models.Q(content__icontains=query) |
-        models.Q(title__icontains=query)
-    ).order_by('-created_at')
+    fields = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    serializer = BlogPostListSerializer(fields=fields)
+    limit = get_page_size(request.GET.get('limit'), getattr(django_settings, 'API_PAGE_SIZE', 20))
     
-    serializer = BlogPostSerializer(posts, many=True)
-    return Response(serializer.data)
+    hits = search.search(query, limit)
+    posts = serializer.only(BlogPost.objects.all()).in_bulk([hit.post_id for hit in hits])
+    hits = [hit for hit in hits if hit.post_id in posts]
+    posts = [posts[hit.post_id] for hit in hits]
+    results = BlogPostListSerializer(posts, many=True, fields=fields, context=_list_context(serializer, posts)).data
+    for data, hit in zip(results, hits):
+        data['rank'] = hit.rank
+        data['snippet'] = hit.snippet
+    return Response(results)
+
+
+def _event_stream_response(request, stream):
+    """Build a Server-Sent Events response for a ProgressStream or ContentStream."""
+    # Under ASGI stream asynchronously so idle connections don't hold a worker thread
+    streaming_content = stream.__aiter__() if isinstance(request, ASGIRequest) else iter(stream)
+    response = StreamingHttpResponse(streaming_content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering (nginx)
+    return response
+
+
+def _progress_stream(post_ids) -> ProgressStream:
+    """Build a ProgressStream that polls often enough to follow external workers."""
+    if getattr(django_settings, 'GENERATION_WORKER_MODE', 'thread') == 'external':
+        # Progress only arrives through the database, written every PROGRESS_EXTERNAL_INTERVAL seconds
+        return ProgressStream(post_ids, poll_interval=getattr(django_settings, 'PROGRESS_EXTERNAL_INTERVAL', 1))
+    return ProgressStream(post_ids)
+
+
+def post_events(request, post_id):
+    """
+    Stream progress and status changes of a blog post as Server-Sent Events.
+    
+    Sends a `progress` event with the current state, then one per change, and a
+    final `done` event once the post is completed or failed.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    get_object_or_404(BlogPost.objects.only('id'), id=post_id)
+    return _event_stream_response(request, _progress_stream([post_id]))
+
+
+def posts_events(request):
+    """
+    Stream progress of several blog posts over one Server-Sent Events connection.
+    
+    Query params: ids=1,2,3 (at most 50 posts)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        post_ids = [int(post_id) for post_id in request.GET.get('ids', '').split(',') if post_id.strip()]
+    except ValueError:
+        return JsonResponse({'error': 'ids must be a comma-separated list of post IDs'}, status=400)
+    if not post_ids:
+        return JsonResponse({'error': 'ids parameter required'}, status=400)
+    if len(post_ids) > 50:
+        return JsonResponse({'error': 'At most 50 posts can be watched per stream'}, status=400)
+    return _event_stream_response(request, _progress_stream(post_ids))
+
+
+def post_content_stream(request, post_id):
+    """
+    Stream a blog post's content as Server-Sent Events while it is being written.
+    
+    Sends `content` events with the text appended since the last event, a `reset`
+    event if the model restarted its answer, and a final `done` event.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    get_object_or_404(BlogPost.objects.only('id'), id=post_id)
+    return _event_stream_response(request, ContentStream(post_id))
 
 
 # Agent API endpoints
@@ -453,6 +635,59 @@ def crew_config_detail(request, config_id):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# Ollama backend endpoints
+@api_view(['GET', 'POST'])
+def ollama_backend_list(request):
+    """List all additional Ollama servers or add a new one."""
+    if request.method == 'GET':
+        backends = OllamaBackend.objects.all().order_by('name')
+        serializer = OllamaBackendSerializer(backends, many=True)
+        return Response(serializer.data)
+    
+    elif request.method == 'POST':
+        serializer = OllamaBackendSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+def ollama_backend_detail(request, backend_id):
+    """Get, update, or delete a specific Ollama server."""
+    backend = get_object_or_404(OllamaBackend, id=backend_id)
+    
+    if request.method == 'GET':
+        serializer = OllamaBackendSerializer(backend)
+        return Response(serializer.data)
+    
+    elif request.method == 'PUT':
+        serializer = OllamaBackendSerializer(backend, data=request.data)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    elif request.method == 'DELETE':
+        backend.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(['GET'])
+def ollama_backend_status(request):
+    """
+    Get health, in-flight requests and latency of every Ollama server in the pool.
+    
+    Pass ?refresh=true to probe every server now instead of reporting the last periodic probe.
+    """
+    config = get_llm_config()
+    pool = get_backend_pool()
+    pool.configure(config['backends'], model=config['model'], keep_alive=config['keep_alive'])
+    if request.query_params.get('refresh', '').lower() in ('1', 'true', 'yes'):
+        pool.check_health()
+    return Response(pool.stats())
+
+
 # Ollama Settings API endpoints
 @api_view(['GET', 'POST'])
 def ollama_settings_list(request):
@@ -505,27 +740,33 @@ def get_active_ollama_settings(request):
         )
 
 
-@api_view(['POST'])
-def test_ollama_connection(request):
+async def _aget_active_ollama_settings():
+    try:
+        return await OllamaSettings.objects.aget(is_active=True)
+    except OllamaSettings.DoesNotExist:
+        return None
+
+
+async def test_ollama_connection(request):
     """Test the connection to Ollama with the active settings."""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
     try:
         # Get active Ollama settings
-        try:
-            ollama_settings = OllamaSettings.objects.get(is_active=True)
-        except OllamaSettings.DoesNotExist:
-            return Response(
+        ollama_settings = await _aget_active_ollama_settings()
+        if ollama_settings is None:
+            return JsonResponse(
                 {'success': False, 'error': 'No active Ollama settings found. Please create one in settings.'},
-                status=status.HTTP_400_BAD_REQUEST
+                status=400
             )
         
         # Test connection by making a simple request to Ollama
         try:
             # Test if Ollama server is reachable
-            test_url = f"{ollama_settings.base_url}/api/tags"
-            response = requests.get(test_url, timeout=5)
+            response = await acheck_ollama(ollama_settings.base_url, timeout=5)
             
             if response.status_code == 200:
-                return Response({
+                return JsonResponse({
                     'success': True,
                     'message': f'Successfully connected to Ollama at {ollama_settings.base_url}',
                     'settings': {
@@ -535,151 +776,159 @@ def test_ollama_connection(request):
                     }
                 })
             else:
-                return Response({
+                return JsonResponse({
                     'success': False,
                     'error': f'Ollama server returned status code {response.status_code}',
                     'base_url': ollama_settings.base_url
-                }, status=status.HTTP_400_BAD_REQUEST)
+                }, status=400)
                 
-        except requests.exceptions.ConnectionError:
-            return Response({
+        except httpx.ConnectError:
+            return JsonResponse({
                 'success': False,
                 'error': f'Cannot connect to Ollama server at {ollama_settings.base_url}. Make sure Ollama is running.',
                 'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
-        except requests.exceptions.Timeout:
-            return Response({
+            }, status=400)
+        except httpx.TimeoutException:
+            return JsonResponse({
                 'success': False,
                 'error': f'Connection timeout to Ollama server at {ollama_settings.base_url}',
                 'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=400)
         except Exception as e:
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'error': f'Error testing connection: {str(e)}',
                 'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=400)
             
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': f'Unexpected error: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        }, status=500)
 
 
-@api_view(['GET'])
-def fetch_ollama_models(request):
-    """Fetch available models from Ollama."""
+async def fetch_ollama_models(request):
+    """
+    Fetch available models from Ollama.
+    
+    Model lists are cached per server and refreshed in the background once
+    older than OLLAMA_MODEL_CATALOG_TTL, so the settings page gets an answer
+    right away even if Ollama is slow or down. Responses carry an ETag; a
+    request with a matching If-None-Match gets 304 Not Modified.
+    
+    Query params:
+        base_url: One of the configured Ollama servers (defaults to the active settings)
+        refresh: 'true' to fetch the list from Ollama now
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
     try:
         # Get active Ollama settings
-        try:
-            ollama_settings = OllamaSettings.objects.get(is_active=True)
-        except OllamaSettings.DoesNotExist:
-            return Response(
+        ollama_settings = await _aget_active_ollama_settings()
+        if ollama_settings is None:
+            return JsonResponse(
                 {'error': 'No active Ollama settings found. Please create one in settings.'},
-                status=status.HTTP_400_BAD_REQUEST
+                status=400
             )
         
-        # Fetch models from Ollama
+        base_url = request.GET.get('base_url', ollama_settings.base_url)
+        if base_url != ollama_settings.base_url:
+            configured = {url for url, weight in (await sync_to_async(get_llm_config)())['backends']}
+            if base_url.rstrip('/') not in configured:
+                return JsonResponse({
+                    'success': False,
+                    'error': f'{base_url} is not a configured Ollama server',
+                }, status=400)
+        refresh = request.GET.get('refresh', '').lower() in ('1', 'true', 'yes')
+        
+        # Fetch models from Ollama, or the cache
         try:
-            models_url = f"{ollama_settings.base_url}/api/tags"
-            response = requests.get(models_url, timeout=10)
+            entry, stale = await model_catalog.aget_models(base_url, refresh=refresh)
+            headers = {'ETag': entry.etag, 'Cache-Control': 'no-cache'}
+            if request.headers.get('If-None-Match') == entry.etag:
+                return HttpResponseNotModified(headers=headers)
             
-            if response.status_code == 200:
-                data = response.json()
-                models = []
-                if 'models' in data:
-                    for model in data['models']:
-                        models.append({
-                            'name': model.get('name', ''),
-                            'size': model.get('size', 0),
-                            'modified_at': model.get('modified_at', ''),
-                            'digest': model.get('digest', ''),
-                        })
-                
-                return Response({
-                    'success': True,
-                    'models': models,
-                    'base_url': ollama_settings.base_url,
-                    'count': len(models)
-                })
-            else:
-                return Response({
-                    'success': False,
-                    'error': f'Ollama server returned status code {response.status_code}',
-                    'base_url': ollama_settings.base_url
-                }, status=status.HTTP_400_BAD_REQUEST)
-                
-        except requests.exceptions.ConnectionError:
-            return Response({
+            return JsonResponse({
+                'success': True,
+                'models': entry.models,
+                'base_url': base_url,
+                'count': len(entry.models),
+                'fetched_at': entry.fetched_at.isoformat(),
+                'stale': stale,
+                'refresh_error': entry.error,
+            }, headers=headers)
+        
+        except httpx.HTTPStatusError as e:
+            return JsonResponse({
                 'success': False,
-                'error': f'Cannot connect to Ollama server at {ollama_settings.base_url}. Make sure Ollama is running.',
-                'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
-        except requests.exceptions.Timeout:
-            return Response({
+                'error': f'Ollama server returned status code {e.response.status_code}',
+                'base_url': base_url
+            }, status=400)
+        except httpx.ConnectError:
+            return JsonResponse({
                 'success': False,
-                'error': f'Connection timeout to Ollama server at {ollama_settings.base_url}',
-                'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
+                'error': f'Cannot connect to Ollama server at {base_url}. Make sure Ollama is running.',
+                'base_url': base_url
+            }, status=400)
+        except httpx.TimeoutException:
+            return JsonResponse({
+                'success': False,
+                'error': f'Connection timeout to Ollama server at {base_url}',
+                'base_url': base_url
+            }, status=400)
         except Exception as e:
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'error': f'Error fetching models: {str(e)}',
-                'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
+                'base_url': base_url
+            }, status=400)
             
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': f'Unexpected error: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        }, status=500)
 
 
-@api_view(['POST'])
-def test_ollama_model(request):
+async def test_ollama_model(request):
     """Test a specific Ollama model with a simple prompt."""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Request body must be JSON'}, status=400)
     try:
         # Get active Ollama settings
-        try:
-            ollama_settings = OllamaSettings.objects.get(is_active=True)
-        except OllamaSettings.DoesNotExist:
-            return Response(
+        ollama_settings = await _aget_active_ollama_settings()
+        if ollama_settings is None:
+            return JsonResponse(
                 {'success': False, 'error': 'No active Ollama settings found. Please create one in settings.'},
-                status=status.HTTP_400_BAD_REQUEST
+                status=400
             )
         
-        model_name = request.data.get('model', ollama_settings.model)
+        model_name = data.get('model') or ollama_settings.model
         
         # Test the model with a simple prompt
         try:
-            from crewai import LLM
-            
-            # Use CrewAI's LLM class for testing
-            # Ensure model name has ollama/ prefix
+            # Ollama's native chat API, without the "ollama/" prefix CrewAI needs
             test_model = model_name
-            if not test_model.startswith('ollama/'):
-                test_model = f"ollama/{test_model}"
-            
-            llm = LLM(
-                model=test_model,
-                base_url=ollama_settings.base_url,
-                temperature=ollama_settings.temperature,
-            )
+            if test_model.startswith('ollama/'):
+                test_model = test_model[len('ollama/'):]
             
             # Simple test prompt
             test_prompt = "Say 'Hello, Ollama is working!' in one sentence."
-            # CrewAI LLM uses different interface - use litellm directly for testing
-            import litellm
-            result = litellm.completion(
-                model=f"ollama/{model_name}",
-                messages=[{"role": "user", "content": test_prompt}],
-                api_base=ollama_settings.base_url,
-                temperature=ollama_settings.temperature,
-            )
-            result_text = result.choices[0].message.content if result.choices else "No response"
+            response = await aollama_post(ollama_settings.base_url, '/api/chat', {
+                'model': test_model,
+                'messages': [{'role': 'user', 'content': test_prompt}],
+                'stream': False,
+                'options': {'temperature': ollama_settings.temperature},
+            }, timeout=120)
+            response.raise_for_status()
+            result_text = response.json().get('message', {}).get('content') or "No response"
             
-            return Response({
+            return JsonResponse({
                 'success': True,
                 'message': 'Model test successful',
                 'model': model_name,
@@ -688,16 +937,16 @@ def test_ollama_model(request):
             })
             
         except Exception as e:
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'error': f'Error testing model: {str(e)}',
                 'model': model_name,
                 'base_url': ollama_settings.base_url
-            }, status=status.HTTP_400_BAD_REQUEST)
+            }, status=400)
             
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': f'Unexpected error: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        }, status=500)
 
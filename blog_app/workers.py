@@ -0,0 +1,547 @@
+import os
+import re
+import socket
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import BlogPost, GenerationJob, update_content
+from .events import publish_progress
+from .progress_store import progress_store
+from .db_writer import run_write
+from .revisions import record_revision
+from . import generation_cache
+
+
+class QueueFull(Exception):
+    """Raised when the generation queue cannot accept more jobs."""
+
+
+class PoolShutDown(Exception):
+    """Raised when the worker pool is no longer accepting jobs."""
+
+
+def run_generation(post_id: int, params: dict) -> bool:
+    """
+    Generate a blog post and store the result on its BlogPost record.
+
+    Args:
+        post_id: ID of the BlogPost to generate content for
+        params: Validated BlogPostCreateSerializer data
+
+    Returns:
+        True if the post was generated, False if generation failed
+    """
+    from .agents.crew_setup import generate_blog_post
+
+    try:
+        blog_post = BlogPost.objects.get(id=post_id)
+    except BlogPost.DoesNotExist:
+        # Post was deleted while it was waiting in the queue
+        return False
+
+    try:
+        blog_post.status = 'processing'
+        run_write(blog_post.save, update_fields=['status', 'updated_at'])
+        # Progress is kept in memory until the result is saved
+        progress_store.begin(blog_post)
+
+        # Key on the crew config and model in effect when generation starts
+        cache_key = generation_cache.get_cache_key(params) if generation_cache.is_enabled() else None
+
+        # Generate blog post using CrewAI with all parameters
+        content = generate_blog_post(
+            topic=params['topic'],
+            subtitle=params.get('subtitle', ''),
+            target_audience=params.get('target_audience', []),
+            key_points=params.get('key_points', ''),
+            examples=params.get('examples', ''),
+            tone=params.get('tone', 'friendly'),
+            length=params.get('length', 'medium'),
+            crew_config_id=params.get('crew_config_id'),
+            blog_post_id=blog_post.id,
+            reuse_stages=not params.get('bypass_cache', False)
+        )
+
+        # Extract title from content
+        title_match = re.search(r'^#\s*(.+)$', content, re.MULTILINE) if content else None
+        title = title_match.group(1).strip() if title_match else params['topic']
+
+        # Update blog post with generated content and its final progress
+        for field, value in progress_store.finish(blog_post.id).items():
+            setattr(blog_post, field, value)
+        blog_post.content = content
+        blog_post.title = title
+        blog_post.status = 'completed'
+        run_write(_save_result, blog_post)
+        publish_progress(blog_post)
+
+        if cache_key:
+            generation_cache.store(cache_key, content, title)
+        return True
+    except Exception as e:
+        # Update status to failed on error
+        for field, value in progress_store.finish(blog_post.id).items():
+            setattr(blog_post, field, value)
+        blog_post.status = 'failed'
+        blog_post.content = f"Error: {str(e)}"
+        blog_post.progress_message = f"Error occurred: {str(e)}"
+        blog_post.progress_percentage = 0
+        run_write(blog_post.save)
+        publish_progress(blog_post)
+        return False
+
+
+def _save_result(blog_post: BlogPost):
+    # The generated post and its revision are saved together
+    with transaction.atomic():
+        blog_post.save()
+        record_revision(blog_post, 'generated')
+
+
+def enqueue_generation(blog_post: BlogPost, params: dict, max_queue_size: int) -> GenerationJob:
+    """
+    Create a queued GenerationJob for a post.
+
+    Args:
+        blog_post: BlogPost to generate, with status 'pending'
+        params: Validated BlogPostCreateSerializer data
+        max_queue_size: Maximum number of queued jobs allowed
+
+    Returns:
+        The created GenerationJob
+
+    Raises:
+        QueueFull: If max_queue_size jobs are already queued
+    """
+    with transaction.atomic():
+        _lock_queue_admission()
+        # Counted after the insert, so the count includes any admission committed before
+        # this one; raising here rolls the new job back
+        job = GenerationJob.objects.create(blog_post=blog_post, params=params)
+        if GenerationJob.objects.filter(status='queued').count() > max_queue_size:
+            raise QueueFull(f'Generation queue is full ({max_queue_size} posts waiting)')
+        return job
+
+
+# Key of the PostgreSQL advisory lock serializing queue admission
+QUEUE_ADMISSION_LOCK = 0x626C6F67
+
+
+def _lock_queue_admission():
+    # Hold admissions to one at a time until the transaction ends. On PostgreSQL
+    # (READ COMMITTED) concurrent transactions would otherwise each count without
+    # seeing the other's job; on SQLite the insert that follows takes the database's
+    # write lock, which already does this.
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [QUEUE_ADMISSION_LOCK])
+
+
+def get_queue_position(post_id: int):
+    """
+    Get the 1-based queue position of a waiting post.
+
+    Returns:
+        Position in the queue, 0 if the post is being generated, or None if it has no active job
+    """
+    job = GenerationJob.objects.filter(
+        blog_post_id=post_id
+    ).values('id', 'status', 'created_at').first()
+    if not job:
+        return None
+    if job['status'] == 'running':
+        return 0
+    if job['status'] != 'queued':
+        return None
+    ahead = GenerationJob.objects.filter(status='queued').filter(
+        Q(created_at__lt=job['created_at']) | Q(created_at=job['created_at'], id__lt=job['id'])
+    ).count()
+    return ahead + 1
+
+
+def get_queue_positions(post_ids) -> dict:
+    """
+    Get the queue positions of several posts in one query.
+
+    Returns:
+        Dictionary mapping each post ID to its position as get_queue_position() returns it
+    """
+    post_ids = set(post_ids)
+    positions = dict.fromkeys(post_ids)
+    if not post_ids:
+        return positions
+    # The queue is bounded by GENERATION_QUEUE_SIZE, so reading all of it is cheap
+    jobs = GenerationJob.objects.filter(
+        Q(status='queued') | Q(status='running', blog_post_id__in=post_ids)
+    ).order_by('created_at', 'id').values_list('blog_post_id', 'status')
+    ahead = 0
+    for post_id, status in jobs:
+        if status == 'running':
+            positions[post_id] = 0
+            continue
+        ahead += 1
+        if post_id in post_ids:
+            positions[post_id] = ahead
+    return positions
+
+
+async def aget_queue_position(post_id: int):
+    """Async version of get_queue_position()."""
+    job = await GenerationJob.objects.filter(
+        blog_post_id=post_id
+    ).values('id', 'status', 'created_at').afirst()
+    if not job:
+        return None
+    if job['status'] == 'running':
+        return 0
+    if job['status'] != 'queued':
+        return None
+    ahead = await GenerationJob.objects.filter(status='queued').filter(
+        Q(created_at__lt=job['created_at']) | Q(created_at=job['created_at'], id__lt=job['id'])
+    ).acount()
+    return ahead + 1
+
+
+def claim_next_job(worker_id: int, lease_seconds: int):
+    """
+    Atomically claim the oldest queued job.
+
+    The claim is a conditional UPDATE on the job's status, so several worker
+    processes can poll the same table without handing out a job twice.
+
+    Args:
+        worker_id: Identifier stored on the job while this worker holds it
+        lease_seconds: How long the claim is valid without a heartbeat
+
+    Returns:
+        Claimed GenerationJob, or None if nothing is queued
+    """
+    while True:
+        job = GenerationJob.objects.filter(status='queued').order_by('created_at', 'id').first()
+        if job is None:
+            return None
+        now = timezone.now()
+        claimed = GenerationJob.objects.filter(id=job.id, status='queued').update(
+            status='running',
+            worker_id=worker_id,
+            attempts=job.attempts + 1,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+            heartbeat_at=now,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Another worker claimed it first; try the next one
+
+
+def renew_leases(job_ids, lease_seconds: int) -> int:
+    """
+    Record a heartbeat for running jobs and extend their leases.
+
+    Args:
+        job_ids: IDs of the jobs held by the calling pool
+        lease_seconds: How long the renewed claims are valid without another heartbeat
+
+    Returns:
+        Number of leases renewed
+    """
+    if not job_ids:
+        return 0
+    now = timezone.now()
+    return GenerationJob.objects.filter(id__in=job_ids, status='running').update(
+        heartbeat_at=now,
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+    )
+
+
+def recover_orphaned_jobs(max_attempts: int) -> int:
+    """
+    Re-queue or fail jobs whose worker stopped heartbeating.
+
+    A running job whose lease has expired belonged to a worker that crashed or
+    was restarted. It is queued again until it has used max_attempts, then the
+    job and its post are marked failed. Posts left in 'processing' or 'pending'
+    without any job (from before jobs were tracked) are failed as well.
+
+    Returns:
+        Number of jobs and posts recovered
+    """
+    now = timezone.now()
+    recovered = 0
+
+    expired = GenerationJob.objects.filter(status='running', lease_expires_at__lt=now)
+    for job in expired:
+        if job.attempts < max_attempts:
+            updated = GenerationJob.objects.filter(
+                id=job.id, status='running', lease_expires_at__lt=now
+            ).update(status='queued', worker_id='', lease_expires_at=None, updated_at=now)
+            if updated:
+                BlogPost.objects.filter(id=job.blog_post_id).update(
+                    status='pending',
+                    current_agent='',
+                    current_task='',
+                    progress_message='Worker stopped unexpectedly. Waiting to retry...',
+                    progress_percentage=0,
+                    updated_at=now,
+                )
+        else:
+            updated = GenerationJob.objects.filter(
+                id=job.id, status='running', lease_expires_at__lt=now
+            ).update(status='failed', lease_expires_at=None, finished_at=now, updated_at=now)
+            if updated:
+                message = f'Generation worker stopped unexpectedly after {job.attempts} attempt(s)'
+                update_content(
+                    BlogPost.objects.filter(id=job.blog_post_id),
+                    f'Error: {message}',
+                    status='failed',
+                    progress_message=f'Error occurred: {message}',
+                    progress_percentage=0,
+                    updated_at=now,
+                )
+        recovered += updated
+
+    # Posts orphaned before they had a job record can never be picked up
+    stale_before = now - timedelta(seconds=getattr(settings, 'GENERATION_LEASE_SECONDS', 60))
+    message = 'Generation was interrupted by a server restart'
+    recovered += update_content(
+        BlogPost.objects.filter(
+            status__in=['pending', 'processing'],
+            generation_job__isnull=True,
+            updated_at__lt=stale_before,
+        ),
+        f'Error: {message}',
+        status='failed',
+        progress_message=f'Error occurred: {message}',
+        progress_percentage=0,
+        updated_at=now,
+    )
+
+    return recovered
+
+
+class GenerationWorkerPool:
+    """
+    Fixed-size pool of worker threads that generate blog posts from the job table.
+
+    Posts wait as queued GenerationJob rows (post status 'pending') until a worker
+    claims them, so at most ``max_workers`` generations per pool hit Ollama and
+    the database at once. Claimed jobs carry a lease that a single heartbeat
+    thread renews; if the process dies the lease expires and any pool re-queues
+    the job. Pools can run inside the web process or via ``manage.py run_workers``.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, lease_seconds: int = 60,
+                 max_attempts: int = 2, poll_interval: float = 2.0, run_workers: bool = True):
+        """
+        Initialize the worker pool.
+
+        Args:
+            max_workers: Number of generations allowed to run concurrently
+            max_queue_size: Maximum number of posts allowed to wait in the queue
+            lease_seconds: How long a claimed job survives without a heartbeat
+            max_attempts: How many times a job is retried after its worker died
+            poll_interval: Seconds between checks for jobs queued by other processes
+            run_workers: If False, the pool only enqueues jobs for external workers
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(0, max_queue_size)
+        self.lease_seconds = max(5, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.poll_interval = poll_interval
+        self.run_workers = run_workers
+        self.pool_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._running = {}  # job id -> post id
+        self._condition = threading.Condition()
+        self._threads = []
+        self._accepting = True
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Recover orphaned jobs and start the worker and heartbeat threads (idempotent)."""
+        if not self.run_workers:
+            return
+        with self._condition:
+            if self._threads:
+                return
+            try:
+                recovered = recover_orphaned_jobs(self.max_attempts)
+                if recovered:
+                    print(f"Recovered {recovered} orphaned generation job(s)")
+            except Exception as e:
+                print(f"Error recovering orphaned generation jobs: {e}")
+            finally:
+                close_old_connections()
+            for index in range(self.max_workers):
+                thread = threading.Thread(target=self._worker_loop, args=(index,),
+                                          name=f'blog-generation-{index}')
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+            heartbeat = threading.Thread(target=self._heartbeat_loop, name='blog-generation-heartbeat')
+            heartbeat.daemon = True
+            heartbeat.start()
+            self._threads.append(heartbeat)
+            if progress_store.flush_interval() > 0:
+                flusher = threading.Thread(target=self._progress_flush_loop, name='blog-generation-progress')
+                flusher.daemon = True
+                flusher.start()
+                self._threads.append(flusher)
+
+    def has_capacity(self) -> bool:
+        """Return True if a new post would be admitted to the queue."""
+        with self._condition:
+            if not self._accepting:
+                return False
+        return GenerationJob.objects.filter(status='queued').count() < self.max_queue_size
+
+    def submit(self, blog_post: BlogPost, params: dict) -> int:
+        """
+        Queue a post for generation.
+
+        Args:
+            blog_post: BlogPost to generate, with status 'pending'
+            params: Validated BlogPostCreateSerializer data
+
+        Returns:
+            1-based position of the post in the queue
+
+        Raises:
+            PoolShutDown: If the pool is no longer accepting jobs
+            QueueFull: If the queue already holds max_queue_size posts
+        """
+        with self._condition:
+            if not self._accepting:
+                raise PoolShutDown('Generation workers are shutting down')
+        enqueue_generation(blog_post, params, self.max_queue_size)
+        self.start()
+        with self._condition:
+            self._condition.notify()
+        return get_queue_position(blog_post.id)
+
+    def queue_position(self, post_id: int):
+        """Get the 1-based queue position of a waiting post (0 once it is running)."""
+        return get_queue_position(post_id)
+
+    def stats(self) -> dict:
+        """Get current pool utilisation."""
+        with self._condition:
+            running = len(self._running)
+            accepting = self._accepting
+        return {
+            'max_workers': self.max_workers,
+            'max_queue_size': self.max_queue_size,
+            'running': running,
+            'queued': GenerationJob.objects.filter(status='queued').count(),
+            'accepting': accepting,
+        }
+
+    def shutdown(self, wait: bool = False):
+        """
+        Stop accepting and claiming jobs. Running generations are allowed to finish.
+
+        Args:
+            wait: Block until running generations have finished
+        """
+        with self._condition:
+            self._accepting = False
+            self._condition.notify_all()
+        self._stopped.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _worker_loop(self, index: int):
+        """Claim jobs one at a time and generate them."""
+        worker_id = f"{self.pool_id}-{index}"
+        while not self._stopped.is_set():
+            try:
+                job = claim_next_job(worker_id, self.lease_seconds)
+            except Exception as e:
+                print(f"Error claiming generation job: {e}")
+                job = None
+            finally:
+                close_old_connections()
+
+            if job is None:
+                # Woken early by submit() in this process; the timeout picks up jobs from other processes
+                with self._condition:
+                    if not self._stopped.is_set():
+                        self._condition.wait(timeout=self.poll_interval)
+                continue
+
+            with self._condition:
+                self._running[job.id] = job.blog_post_id
+            try:
+                succeeded = run_generation(job.blog_post_id, job.params)
+            except Exception as e:
+                print(f"Error in generation worker for post {job.blog_post_id}: {e}")
+                succeeded = False
+            finally:
+                with self._condition:
+                    self._running.pop(job.id, None)
+            try:
+                now = timezone.now()
+                GenerationJob.objects.filter(id=job.id, worker_id=worker_id).update(
+                    status='completed' if succeeded else 'failed',
+                    lease_expires_at=None,
+                    finished_at=now,
+                    updated_at=now,
+                )
+            except Exception as e:
+                print(f"Error finishing generation job {job.id}: {e}")
+            finally:
+                close_old_connections()
+
+    def _heartbeat_loop(self):
+        """Renew leases of running jobs and reap jobs orphaned by dead workers."""
+        interval = self.lease_seconds / 3
+        while not self._stopped.wait(timeout=interval):
+            try:
+                with self._condition:
+                    job_ids = list(self._running)
+                renew_leases(job_ids, self.lease_seconds)
+                # Write progress that hasn't been flushed since its last change
+                progress_store.flush()
+                recovered = recover_orphaned_jobs(self.max_attempts)
+                if recovered:
+                    print(f"Recovered {recovered} orphaned generation job(s)")
+                    with self._condition:
+                        self._condition.notify_all()
+            except Exception as e:
+                print(f"Error in generation heartbeat: {e}")
+            finally:
+                close_old_connections()
+
+    def _progress_flush_loop(self):
+        """Write changed progress every flush interval, so a post's last change isn't held back."""
+        while not self._stopped.wait(timeout=progress_store.flush_interval()):
+            try:
+                progress_store.flush()
+            except Exception as e:
+                print(f"Error flushing generation progress: {e}")
+            finally:
+                close_old_connections()
+
+
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> GenerationWorkerPool:
+    """Get the process-wide generation worker pool, creating it from settings on first use."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = GenerationWorkerPool(
+                max_workers=getattr(settings, 'GENERATION_MAX_WORKERS', 2),
+                max_queue_size=getattr(settings, 'GENERATION_QUEUE_SIZE', 50),
+                lease_seconds=getattr(settings, 'GENERATION_LEASE_SECONDS', 60),
+                max_attempts=getattr(settings, 'GENERATION_MAX_ATTEMPTS', 2),
+                run_workers=getattr(settings, 'GENERATION_WORKER_MODE', 'thread') == 'thread',
+            )
+        return _worker_pool
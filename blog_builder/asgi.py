@@ -3,6 +3,11 @@ ASGI config for blog_builder project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through ASGI (e.g. ``uvicorn blog_builder.asgi:application``) lets the
+progress event streams (``/api/post/<id>/events/`` and ``/api/posts/events/``)
+run as async iterators, so idle connections don't each hold a worker thread.
+The post status and Ollama probe endpoints are async views for the same reason.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -15,3 +20,8 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_builder.settings')
 
 application = get_asgi_application()
 
+# This process's event loop outlives requests, so async Ollama clients can stay open
+from blog_app.ollama_client import share_async_clients  # noqa: E402
+
+share_async_clients()
+
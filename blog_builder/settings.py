@@ -4,6 +4,7 @@ Django settings for blog_builder project.
 
 from pathlib import Path
 import os
+import django
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -79,6 +80,33 @@ DATABASES = {
     }
 }
 
+# SQLite concurrency mode (opt-in, for production on SQLite): WAL journal and tuned PRAGMAs on
+# every connection, write transactions that take the lock up front, and generation writes
+# (progress, streamed content, results) serialized through a single writer thread
+SQLITE_CONCURRENCY_MODE = os.getenv('SQLITE_CONCURRENCY_MODE', 'False') == 'True'
+# Milliseconds a connection waits for the write lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))
+# OFF, NORMAL or FULL; NORMAL is durable against application crashes in WAL mode
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+# Bytes of the database file memory-mapped for reads
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+if SQLITE_CONCURRENCY_MODE:
+    DATABASES['default']['OPTIONS'] = {'timeout': SQLITE_BUSY_TIMEOUT / 1000}
+    if django.VERSION >= (5, 1):
+        # Take the write lock when a transaction starts instead of failing to upgrade a read lock
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# PostgreSQL instead of SQLite when POSTGRES_DB is set (requires psycopg)
+if os.getenv('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB'),
+        'USER': os.getenv('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,3 +159,59 @@ REST_FRAMEWORK = {
     ],
 }
 
+
+# Blog generation worker pool
+# Number of blog posts generated concurrently; further requests wait in a FIFO queue
+GENERATION_MAX_WORKERS = int(os.getenv('GENERATION_MAX_WORKERS', '2'))
+# Maximum number of posts allowed to wait; requests beyond this are rejected with HTTP 429
+GENERATION_QUEUE_SIZE = int(os.getenv('GENERATION_QUEUE_SIZE', '50'))
+# 'thread' runs workers inside the web process; 'external' only queues jobs for `manage.py run_workers`
+GENERATION_WORKER_MODE = os.getenv('GENERATION_WORKER_MODE', 'thread')
+# Seconds a running job survives without a worker heartbeat before it is re-queued
+GENERATION_LEASE_SECONDS = int(os.getenv('GENERATION_LEASE_SECONDS', '60'))
+# Attempts per job before a post whose worker keeps dying is marked failed
+GENERATION_MAX_ATTEMPTS = int(os.getenv('GENERATION_MAX_ATTEMPTS', '2'))
+# Seconds between database writes of a generating post's progress; changes in between are
+# kept in memory and published to progress streams at once. 0 only saves the final state
+PROGRESS_FLUSH_INTERVAL = float(os.getenv('PROGRESS_FLUSH_INTERVAL', '10'))
+# With GENERATION_WORKER_MODE=external the web server only sees progress through the database:
+# workers write it this often instead of PROGRESS_FLUSH_INTERVAL, and progress streams poll this often
+PROGRESS_EXTERNAL_INTERVAL = float(os.getenv('PROGRESS_EXTERNAL_INTERVAL', '1'))
+# Stream the final task's tokens from Ollama into the post while it is generated
+GENERATION_STREAM_CONTENT = os.getenv('GENERATION_STREAM_CONTENT', 'True') == 'True'
+
+# Generation result cache (opt-in): reuse posts generated from identical inputs, crew config and model
+GENERATION_CACHE_ENABLED = os.getenv('GENERATION_CACHE_ENABLED', 'False') == 'True'
+# Seconds a cached generation stays valid
+GENERATION_CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', str(7 * 24 * 3600)))
+# Maximum cached generations; least recently used entries are evicted first
+GENERATION_CACHE_MAX_ENTRIES = int(os.getenv('GENERATION_CACHE_MAX_ENTRIES', '500'))
+# Seconds a compiled crew plan (agents, tasks, Ollama settings) is reused before it is
+# reloaded; saves in this process invalidate it immediately, other processes see them after this
+GENERATION_PLAN_CACHE_TTL = int(os.getenv('GENERATION_PLAN_CACHE_TTL', '60'))
+# Maximum tasks of one parallel crew running at the same time
+GENERATION_PARALLEL_TASKS = int(os.getenv('GENERATION_PARALLEL_TASKS', '3'))
+
+# Posts per page on the history page (at most 100; ?page_size= overrides it per request)
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '24'))
+# Default posts per page of GET /api/posts/ (at most 100; ?page_size= overrides it per request)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', '20'))
+# Every Nth revision of a post stores its full content, the others a delta against the
+# previous revision; reading a revision applies at most N - 1 deltas
+REVISION_SNAPSHOT_INTERVAL = int(os.getenv('REVISION_SNAPSHOT_INTERVAL', '20'))
+
+# Seconds between health probes (GET /api/tags) of every Ollama server; 0 disables periodic probes
+OLLAMA_HEALTH_CHECK_INTERVAL = int(os.getenv('OLLAMA_HEALTH_CHECK_INTERVAL', '30'))
+# Open connections kept per Ollama server by the shared HTTP session; further requests wait
+OLLAMA_HTTP_POOL_SIZE = int(os.getenv('OLLAMA_HTTP_POOL_SIZE', '10'))
+# Seconds to wait for a TCP connection to an Ollama server
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv('OLLAMA_CONNECT_TIMEOUT', '3'))
+# Seconds to wait for an LLM response from Ollama once connected
+OLLAMA_REQUEST_TIMEOUT = float(os.getenv('OLLAMA_REQUEST_TIMEOUT', '600'))
+# Seconds a fetched Ollama model list is served before it is refreshed in the background
+OLLAMA_MODEL_CATALOG_TTL = int(os.getenv('OLLAMA_MODEL_CATALOG_TTL', '300'))
+# Keep the active model loaded on every Ollama server: warm it up when settings are saved
+# and whenever a health probe finds it unloaded
+OLLAMA_WARMUP_ENABLED = os.getenv('OLLAMA_WARMUP_ENABLED', 'True') == 'True'
+# Default Ollama keep_alive for warmed-up models when settings come from the environment
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '30m')